@@ -1,3 +1,4 @@
+@api
 Feature: API Integration
   As a developer
   I want to test API endpoints
@@ -25,11 +26,53 @@ Feature: API Integration
     And the response should contain the created user data
     And the user should have an ID
 
+  Scenario: Create users in bulk from a fixture file
+    When I POST the users from "fixtures/users.csv" to "/api/users" in batches of 5
+    Then the response status should be 201
+    And the API should have created 18 users
+
+  Scenario: Skip users repeated in a later fixture batch
+    When I POST the users from "fixtures/users_repeated.csv" to "/api/users" in batches of 2
+    Then the response status should be 201
+    And the API should have created 4 users
+    And 2 fixture rows should have been rejected
+
+  Scenario: Send a batch of requests concurrently
+    When I send the following requests concurrently:
+      | method | endpoint          | body                                                       |
+      | GET    | /api/users        |                                                            |
+      | GET    | /api/users/1      |                                                            |
+      | POST   | /api/users        | {"email": "concurrent.one@example.com", "name": "One"}     |
+      | POST   | /api/users        | {"email": "concurrent.two@example.com", "name": "Two"}     |
+      | PUT    | /api/users/123    | {"name": "Concurrent Update"}                              |
+      | GET    | /api/users/999999 |                                                            |
+    Then 3 responses should have status 200
+    And 2 responses should have status 201
+    And 1 responses should have status 404
+    And every request should complete within 5000 ms
+
+  Scenario: Send requests from a fixture file with bounded concurrency
+    When I send the requests from "fixtures/requests.jsonl" concurrently
+    Then 5 responses should have status 200
+    And 3 responses should have status 201
+    And 2 responses should have status 404
+    And the p95 request latency should be below 2000 ms
+
+  Scenario: Reject a concurrent batch without a valid API key
+    Given I have an invalid API key
+    When I send the following requests with at most 2 in flight:
+      | method | endpoint       |
+      | GET    | /api/users     |
+      | GET    | /api/users/1   |
+      | GET    | /api/users/2   |
+      | GET    | /api/users/123 |
+    Then all 4 responses should have status 401
+
   Scenario: Update user via API
     Given a user with ID "123" exists
     When I send a PUT request to "/api/users/123" with updated name "Updated User"
     Then the response status should be 200
-    And the user's name should be updated to "Updated User"
+    And the response should contain the updated name "Updated User"
 
   Scenario: Delete user via API
     Given a user with ID "123" exists
@@ -5,8 +5,20 @@ This file handles setup and teardown for test scenarios.
 
 import os
 import sys
+import time
 from datetime import datetime
 
+# Add project root to Python path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Everything else in testkit is imported in the hook or branch that needs it
+from testkit import background_cache, feature_cache
+
+# Loaded before behave parses the feature files, so parsing and step matching use the cache
+feature_cache.install()
+
 def before_all(context):
     """Setup before all tests run"""
     print("=" * 60)
@@ -14,78 +26,261 @@ def before_all(context):
     print(f"Timestamp: {datetime.now().isoformat()}")
     print("=" * 60)
     
-    # Add project root to Python path
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    sys.path.insert(0, project_root)
+    from testkit.audit_log import AuditLog
+    from testkit.scenario_profiler import ScenarioProfiler
+    from testkit.step_timing import StepTimer
+    from testkit.stub_server import VALID_API_KEY
+    from testkit.user_store import UserStore
+    from testkit.watchdog import RetryTracker, Watchdog
     
     # Initialize test context
-    context.test_start_time = datetime.now()
+    context.test_start_ns = time.perf_counter_ns()
     context.test_results = {
         "passed": 0,
         "failed": 0,
         "skipped": 0
     }
+    context.scenario_timings = []
+    # Parallel shards each write their step profile and retry report to their own directory
+    context.reports_dir = os.environ.get("BEHAVE_REPORTS_DIR", os.path.join(PROJECT_ROOT, "test-reports"))
+    context.step_timer = StepTimer(context._runner.step_registry)
+    context.profile_all = os.environ.get("BEHAVE_PROFILE") == "1"
+    context.scenario_profiler = ScenarioProfiler(os.path.join(PROJECT_ROOT, "test-reports", "profiles"))
     
     # Set up test configuration
     context.config = {
-        "api_base_url": "http://localhost:8000",
+        "api_base_url": os.environ.get("API_BASE_URL", "http://localhost:8000"),
+        "api_key": os.environ.get("API_KEY", VALID_API_KEY),
         "test_timeout": 30,
         "retry_attempts": 3
     }
     
+    # Per-scenario timeouts (@slow, @timeout=N) and retries with backoff
+    context.watchdog = Watchdog()
+    context.retries = RetryTracker(context.config["retry_attempts"])
+    
+    # "live", or "record"/"replay" HTTP calls to/from a cassette (run_tests.py --record/--replay)
+    context.http_mode = os.environ.get("BEHAVE_HTTP_MODE", "live")
+    
+    # The local API stub is started by the first @api feature (see before_feature)
+    context.stub_server = None
+    
+    # One pooled HTTP session shared by all scenarios
+    if context.http_mode == "live":
+        from testkit.http_session import LazySession
+        
+        # requests is only imported once a scenario sends a request
+        context.http = LazySession()
+    else:
+        from testkit.cassette import DEFAULT_CASSETTE, RecordingSession, ReplaySession
+        from testkit.http_session import new_session
+        
+        cassette_path = os.environ.get("BEHAVE_CASSETTE", os.path.join(PROJECT_ROOT, DEFAULT_CASSETTE))
+        if context.http_mode == "replay":
+            context.http = ReplaySession(cassette_path, context.config["api_key"])
+            print(f"Replaying HTTP calls from {cassette_path}")
+        else:
+            context.http = RecordingSession(new_session(), cassette_path, context.config["api_key"])
+            print(f"Recording HTTP calls to {cassette_path}")
+    
+    # Shared user store; every scenario is rolled back to this empty state
+    context.user_store = UserStore()
+    context.user_store_baseline = context.user_store.snapshot()
+    
+    # Background steps run once; later scenarios get a snapshot (@fresh_background opts out)
+    http_state = context.http if context.http_mode != "live" else None
+    context.background_cache = background_cache.BackgroundCache(
+        [context.user_store, http_state], active=background_cache.enabled()
+    )
+    
+    # Bounded audit trail; older events spill to test-reports/audit/
+    context.audit_log = AuditLog(os.path.join(PROJECT_ROOT, "test-reports", "audit"))
+    
+    # Scenario output only reaches the console for failures (run_tests.py --capture)
+    from testkit import output_capture
+    
+    context.output_capture = None
+    if output_capture.enabled():
+        context.output_capture = output_capture.OutputCapture(
+            os.environ.get("BEHAVE_EVENT_LOG", os.path.join(PROJECT_ROOT, output_capture.DEFAULT_EVENT_LOG))
+        )
+        context._runner.config.stdout_capture = False
+        context._runner.config.stderr_capture = False
+    
+    # OpenMetrics counters and histograms; BEHAVE_METRICS_PORT also serves them over HTTP
+    from testkit import metrics
+    
+    context.metrics = metrics.SuiteMetrics(
+        os.environ.get("BEHAVE_METRICS_FILE", os.path.join(PROJECT_ROOT, metrics.DEFAULT_METRICS_FILE))
+    )
+    context.metrics_server = None
+    if os.environ.get("BEHAVE_METRICS_PORT"):
+        context.metrics_server = metrics.MetricsServer(context.metrics.registry, int(os.environ["BEHAVE_METRICS_PORT"]))
+        print(f"Serving metrics at {context.metrics_server.start()}")
+    
     print("Test environment initialized")
 
+def start_stub_server(context):
+    """Start the local API stub, which later @api features share"""
+    from testkit.stub_server import StubApiServer
+    
+    context.stub_server = StubApiServer.from_url(context.config["api_base_url"])
+    context.config["api_base_url"] = context.stub_server.start()
+    context.stub_server.request_observer = context.metrics.stub_request
+    context.background_cache.add_provider(context.stub_server)
+    print(f"Stub API server listening on {context.config['api_base_url']}")
+
 def before_feature(context, feature):
     """Setup before each feature"""
     print(f"\n--- Starting Feature: {feature.name} ---")
-    context.feature_start_time = datetime.now()
+    context.feature_start_ns = time.perf_counter_ns()
+    
+    # Unless tests are pointed at a real server or replay a cassette
+    if "api" in feature.tags and context.stub_server is None \
+            and "API_BASE_URL" not in os.environ and context.http_mode != "replay":
+        start_stub_server(context)
     
     # Reset feature-specific context
     context.feature_data = {}
     context.api_responses = []
+    
+    for scenario in feature.walk_scenarios():
+        context.retries.patch(scenario)
 
 def before_scenario(context, scenario):
     """Setup before each scenario"""
+    from testkit.watchdog import scenario_timeout
+    
     print(f"\n  Scenario: {scenario.name}")
-    context.scenario_start_time = datetime.now()
+    context.scenario_start_ns = time.perf_counter_ns()
+    context.scenario_started_at = datetime.now().isoformat()
+    context.scenario_location = f"{scenario.filename}:{scenario.line}"
     
     # Reset scenario-specific context
     context.scenario_data = {}
     context.current_user = None
     context.api_response = None
+    context.http_scope = f"{scenario.filename}:{scenario.name}"
+    restored = context.background_cache.restore(context, scenario)
+    if not restored:
+        context.user_store.restore(context.user_store_baseline)
+        if context.stub_server is not None:
+            context.stub_server.reset()
+        if context.http_mode != "live":
+            context.http.new_scenario()
+    if context.http_mode != "live":
+        # Background requests are keyed by the Background, the rest by the scenario
+        signature = background_cache.background_signature(scenario)
+        context.http.enter(context.http_scope if restored or signature is None else repr(signature))
+    
+    if context.profile_all or "profile" in scenario.effective_tags:
+        context.scenario_profiler.start(scenario)
+    
+    timeout = scenario_timeout(scenario.effective_tags, context.config["test_timeout"])
+    context.watchdog.start(timeout, f"Scenario '{scenario.name}'")
+    
+    if context.output_capture is not None:
+        context.output_capture.start()
 
 def after_scenario(context, scenario):
     """Cleanup after each scenario"""
-    scenario_duration = datetime.now() - context.scenario_start_time
+    scenario_duration_ns = time.perf_counter_ns() - context.scenario_start_ns
+    timed_out = context.watchdog.cancel()
+    if context.output_capture is not None:
+        context.output_capture.finish(scenario, context.scenario_location, scenario_duration_ns / 1e9)
+    profile_base = context.scenario_profiler.stop()
+    if profile_base is not None:
+        print(f"    Profile written to {profile_base}.pstats")
+    scenario_seconds = scenario_duration_ns / 1e9
+    if timed_out:
+        print(f"    ⏱ TIMED OUT after {context.watchdog.seconds:g}s")
+    
+    # Failed attempts that will be retried are not counted
+    outcome = context.retries.record(scenario, context.scenario_location, timed_out)
+    if outcome == "retry":
+        print(f"    ✗ FAILED ({scenario_seconds:.2f}s), attempt {scenario.attempt}")
+        return
+    context.scenario_timings.append(
+        (scenario.feature.filename, scenario.name, scenario_seconds)
+    )
+    context.step_timer.record_scenario(context.scenario_location, scenario.name, scenario_duration_ns)
+    context.metrics.scenario(scenario, scenario.status.name, scenario_seconds)
     
     if scenario.status == "passed":
         context.test_results["passed"] += 1
-        print(f"    ✓ PASSED ({scenario_duration.total_seconds():.2f}s)")
+        if outcome == "flaky":
+            print(f"    ✓ PASSED ({scenario_seconds:.2f}s), flaky: attempt {scenario.attempt}")
+        else:
+            print(f"    ✓ PASSED ({scenario_seconds:.2f}s)")
     elif scenario.status == "failed":
         context.test_results["failed"] += 1
-        print(f"    ✗ FAILED ({scenario_duration.total_seconds():.2f}s)")
+        print(f"    ✗ FAILED ({scenario_seconds:.2f}s)")
     else:
         context.test_results["skipped"] += 1
-        print(f"    - SKIPPED ({scenario_duration.total_seconds():.2f}s)")
+        print(f"    - SKIPPED ({scenario_seconds:.2f}s)")
+
+def before_step(context, step):
+    """Start the high-resolution step clock; the watchdog may interrupt the step from here on"""
+    context.step_timer.start_step()
+    context.watchdog.step_started()
+
+def after_step(context, step):
+    """Record step latency against its step definition"""
+    context.watchdog.step_finished()
+    duration_ns = context.step_timer.stop_step(step, context.scenario_location)
+    context.metrics.step(context.scenario, step, duration_ns / 1e9)
+    context.background_cache.after_step(context, step)
+    if context.http_mode != "live" and context.scenario.background_steps \
+            and step is context.scenario.background_steps[-1]:
+        context.http.enter(context.http_scope)
 
 def after_feature(context, feature):
     """Cleanup after each feature"""
-    feature_duration = datetime.now() - context.feature_start_time
-    print(f"\n--- Completed Feature: {feature.name} ({feature_duration.total_seconds():.2f}s) ---")
+    feature_seconds = (time.perf_counter_ns() - context.feature_start_ns) / 1e9
+    print(f"\n--- Completed Feature: {feature.name} ({feature_seconds:.2f}s) ---")
+    context.metrics.feature(feature, feature_seconds)
+    context.metrics.write()
 
 def after_all(context):
     """Cleanup after all tests complete"""
-    total_duration = datetime.now() - context.test_start_time
+    total_seconds = (time.perf_counter_ns() - context.test_start_ns) / 1e9
     
     print("\n" + "=" * 60)
     print("Integration Test Suite Results")
     print("=" * 60)
-    print(f"Total Duration: {total_duration.total_seconds():.2f} seconds")
+    print(f"Total Duration: {total_seconds:.2f} seconds")
     print(f"Passed: {context.test_results['passed']}")
     print(f"Failed: {context.test_results['failed']}")
     print(f"Skipped: {context.test_results['skipped']}")
     print(f"Total: {sum(context.test_results.values())}")
     
+    context.http.close()
+    context.audit_log.close()
+    if context.output_capture is not None:
+        print(context.output_capture.close())
+    if context.stub_server is not None:
+        context.stub_server.stop()
+    print(f"Metrics written to {context.metrics.write()}")
+    if context.metrics_server is not None:
+        context.metrics_server.stop()
+    
+    # Persist scenario durations for duration-balanced parallel runs
+    from testkit.timings import DEFAULT_DB_PATH, TimingDatabase
+    
+    timing_db = TimingDatabase(os.path.join(PROJECT_ROOT, DEFAULT_DB_PATH))
+    try:
+        timing_db.record_many(context.scenario_timings)
+    finally:
+        timing_db.close()
+    
+    # Step latency profile and slowest-N table
+    print("\n" + context.step_timer.write(context.reports_dir))
+    
+    print("\n" + context.background_cache.summary())
+    
+    # Flaky versus hard failures
+    print("\n" + context.retries.write(context.reports_dir))
+    
     if context.test_results['failed'] > 0:
         print("\n❌ Some tests failed!")
         sys.exit(1)
@@ -103,6 +298,8 @@ def before_tag(context, tag):
         print("  [API TEST] Testing external API integration")
     elif tag == "database":
         print("  [DATABASE TEST] Testing database operations")
+    elif tag == "profile":
+        print("  [PROFILE] Recording cProfile and tracemalloc data for this scenario")
 
 def after_tag(context, tag):
     """Cleanup after specific tags if needed"""
@@ -1,29 +1,32 @@
 from behave import given, when, then
-import requests
-import json
-from unittest.mock import Mock, patch
-
-# Mock API responses for testing
-mock_api_responses = {
-    "users": [
-        {"id": 1, "email": "user1@example.com", "name": "User One", "role": "user"},
-        {"id": 2, "email": "user2@example.com", "name": "User Two", "role": "admin"}
-    ],
-    "user_123": {"id": 123, "email": "test@example.com", "name": "Test User", "role": "user"},
-    "created_user": {"id": 456, "email": "api.user@example.com", "name": "API User", "role": "user"}
-}
+
+# testkit helpers (fixtures, concurrent batches) are imported inside the steps that
+# use them, so runs that never reach those steps skip their import cost
+
+def send_api_request(context, method, endpoint, json=None):
+    """Send a request to the API through the shared pooled session"""
+    context.response = context.http.request(
+        method,
+        context.base_url + endpoint,
+        headers=context.headers,
+        json=json,
+        timeout=context.config["test_timeout"]
+    )
+    return context.response
 
 @given('the API server is running on "{base_url}"')
 def step_api_server_running(context, base_url):
-    """Mock that the API server is running"""
-    context.base_url = base_url
+    """Point the steps at the configured API server (the local stub by default)"""
+    context.base_url = context.config["api_base_url"]
     context.api_server_running = True
-    print(f"API server running on {base_url}")
+    if context.base_url != base_url:
+        print(f"API server configured on {context.base_url} (feature default {base_url})")
+    print(f"API server running on {context.base_url}")
 
 @given('I have a valid API key')
 def step_have_valid_api_key(context):
-    """Mock valid API key"""
-    context.api_key = "valid-api-key-12345"
+    """Use the configured API key"""
+    context.api_key = context.config["api_key"]
     context.headers = {"Authorization": f"Bearer {context.api_key}", "Content-Type": "application/json"}
     print("Have valid API key")
 
@@ -67,16 +70,7 @@ def step_send_get_request(context, endpoint):
     context.endpoint = endpoint
     context.request_type = "GET"
     
-    # Mock the response based on endpoint
-    if endpoint == "/api/users":
-        context.response = Mock()
-        context.response.status_code = 200
-        context.response.json.return_value = mock_api_responses["users"]
-        context.response.headers = {"Content-Type": "application/json"}
-    elif endpoint == "/api/users/999999":
-        context.response = Mock()
-        context.response.status_code = 404
-        context.response.json.return_value = {"error": "User not found"}
+    send_api_request(context, "GET", endpoint)
     
     print(f"Sent GET request to {endpoint}")
 
@@ -92,27 +86,41 @@ def step_send_post_request(context, endpoint):
         request_data[row['Field']] = row['Value']
     
     context.request_data = request_data
-    
-    # Mock successful creation
-    context.response = Mock()
-    context.response.status_code = 201
-    context.response.json.return_value = mock_api_responses["created_user"]
+    send_api_request(context, "POST", endpoint, json=request_data)
     
     print(f"Sent POST request to {endpoint} with data: {request_data}")
 
+@when('I POST the users from "{path}" to "{endpoint}" in batches of {size:d}')
+def step_post_users_in_batches(context, path, endpoint, size):
+    """Stream a fixture file to the API, one bulk POST per batch"""
+    from testkit.fixtures import LoadStats, iter_valid_user_batches, resolve_fixture_path
+
+    stats = LoadStats()
+    context.created_count = 0
+    # Emails of earlier batches, so a user repeated later in the file is rejected, not posted twice
+    posted = set()
+    batches = iter_valid_user_batches(resolve_fixture_path(path), stats, batch_size=size, exists=posted.__contains__)
+    for batch in batches:
+        response = send_api_request(context, "POST", endpoint, json=batch)
+        assert response.status_code == 201, f"Batch POST failed with status {response.status_code}"
+        context.created_count += response.json()["created"]
+        posted.update(user["email"] for user in batch)
+    context.fixture_load_stats = stats
+    print(f"Posted {stats.loaded} users to {endpoint} in {stats.batches} batches")
+
+@then('the API should have created {count:d} users')
+def step_api_created_users(context, count):
+    """Verify the total reported by the bulk POSTs"""
+    assert context.created_count == count, f"Expected {count} users created, got {context.created_count}"
+    print(f"API created {count} users")
+
 @when('I send a PUT request to "{endpoint}" with updated name "{new_name}"')
 def step_send_put_request(context, endpoint, new_name):
     """Send PUT request to update user"""
     context.endpoint = endpoint
     context.request_type = "PUT"
     context.new_name = new_name
-    
-    # Mock successful update
-    context.response = Mock()
-    context.response.status_code = 200
-    updated_user = mock_api_responses["user_123"].copy()
-    updated_user["name"] = new_name
-    context.response.json.return_value = updated_user
+    send_api_request(context, "PUT", endpoint, json={"name": new_name})
     
     print(f"Sent PUT request to {endpoint} with new name: {new_name}")
 
@@ -121,11 +129,7 @@ def step_send_delete_request(context, endpoint):
     """Send DELETE request"""
     context.endpoint = endpoint
     context.request_type = "DELETE"
-    
-    # Mock successful deletion
-    context.response = Mock()
-    context.response.status_code = 204
-    context.response.content = b""
+    send_api_request(context, "DELETE", endpoint)
     
     print(f"Sent DELETE request to {endpoint}")
 
@@ -168,7 +172,7 @@ def step_user_has_id(context):
     assert response_data["id"] is not None, "User ID should not be None"
     print(f"User has ID: {response_data['id']}")
 
-@then('the user\'s name should be updated to "{expected_name}"')
+@then('the response should contain the updated name "{expected_name}"')
 def step_user_name_updated_via_api(context, expected_name):
     """Verify user name was updated via API"""
     response_data = context.response.json()
@@ -189,21 +193,69 @@ def step_response_contains_error(context):
     assert "error" in response_data, "Response should contain error message"
     print(f"Response contains error: {response_data['error']}")
 
-# Helper function to simulate API calls
-def mock_api_call(method, url, headers=None, json=None):
-    """Mock API call function"""
-    mock_response = Mock()
-    
-    if "invalid-api-key" in str(headers):
-        mock_response.status_code = 401
-        mock_response.json.return_value = {"error": "Invalid API key"}
-    elif method == "GET" and "/api/users" in url:
-        if "999999" in url:
-            mock_response.status_code = 404
-            mock_response.json.return_value = {"error": "User not found"}
-        else:
-            mock_response.status_code = 200
-            mock_response.json.return_value = mock_api_responses["users"]
-            mock_response.headers = {"Content-Type": "application/json"}
-    
-    return mock_response 
\ No newline at end of file
+def send_request_batch(context, batch, concurrency=None):
+    """Send a batch concurrently and keep the results for the aggregate Then-steps"""
+    from testkit.concurrent_requests import DEFAULT_CONCURRENCY, send_concurrently
+
+    concurrency = concurrency or DEFAULT_CONCURRENCY
+    context.batch_results = send_concurrently(
+        context.http, context.base_url, context.headers, batch,
+        concurrency=concurrency, timeout=context.config["test_timeout"]
+    )
+    failed = [result for result in context.batch_results if result.error]
+    print(f"Sent {len(batch)} requests with at most {concurrency} in flight, {len(failed)} errors")
+    return context.batch_results
+
+@when('I send the following requests concurrently')
+def step_send_requests_concurrently(context):
+    """Send method/endpoint/body table rows in parallel"""
+    from testkit.concurrent_requests import parse_request_rows
+
+    send_request_batch(context, parse_request_rows(context.table))
+
+@when('I send the following requests with at most {concurrency:d} in flight')
+def step_send_requests_bounded(context, concurrency):
+    """Send method/endpoint/body table rows with an explicit concurrency limit"""
+    from testkit.concurrent_requests import parse_request_rows
+
+    send_request_batch(context, parse_request_rows(context.table), concurrency)
+
+@when('I send the requests from "{path}" concurrently')
+def step_send_fixture_requests_concurrently(context, path):
+    """Send the method/endpoint/body records of a fixture file in parallel"""
+    from testkit.concurrent_requests import parse_request_rows
+    from testkit.fixtures import iter_fixture_records, resolve_fixture_path
+
+    send_request_batch(context, parse_request_rows(iter_fixture_records(resolve_fixture_path(path))))
+
+@then('all {count:d} responses should have status {status_code:d}')
+def step_all_batch_statuses(context, count, status_code):
+    """Verify every request of the batch got the same status"""
+    statuses = [result.status_code for result in context.batch_results]
+    assert len(statuses) == count, f"Expected {count} responses, got {len(statuses)}"
+    unexpected = [result for result in context.batch_results if result.status_code != status_code]
+    assert not unexpected, f"Expected status {status_code} for every request, got {unexpected}"
+    print(f"All {count} responses have status {status_code}")
+
+@then('{count:d} responses should have status {status_code:d}')
+def step_batch_status_count(context, count, status_code):
+    """Verify how many requests of the batch got a status"""
+    matching = sum(1 for result in context.batch_results if result.status_code == status_code)
+    assert matching == count, f"Expected {count} responses with status {status_code}, got {matching}: {context.batch_results}"
+    print(f"{count} responses have status {status_code}")
+
+@then('the p{quantile:d} request latency should be below {limit_ms:d} ms')
+def step_batch_latency_percentile(context, quantile, limit_ms):
+    """Verify a latency percentile of the batch"""
+    from testkit.load import percentile
+
+    latency_ms = percentile(sorted(result.latency for result in context.batch_results), quantile / 100) * 1000
+    assert latency_ms < limit_ms, f"p{quantile} latency {latency_ms:.1f} ms is not below {limit_ms} ms"
+    print(f"p{quantile} request latency {latency_ms:.1f} ms")
+
+@then('every request should complete within {limit_ms:d} ms')
+def step_batch_max_latency(context, limit_ms):
+    """Verify the slowest request of the batch"""
+    slowest = max(context.batch_results, key=lambda result: result.latency)
+    assert slowest.latency * 1000 <= limit_ms, f"Slowest request took longer than {limit_ms} ms: {slowest}"
+    print(f"Slowest request took {slowest.latency * 1000:.1f} ms")
@@ -1,11 +1,10 @@
 from behave import given, when, then
-import json
-import re
-from datetime import datetime
+import time
 
-# Mock data storage for testing
-users_db = {}
-audit_log = []
+# testkit.email_validation and testkit.fixtures are imported inside the steps that
+# use them, so runs that never reach those steps skip their import cost
+
+# Users live in context.user_store and audit events in context.audit_log (see environment.py)
 
 @given('the user management system is running')
 def step_user_management_system_running(context):
@@ -28,12 +27,11 @@ def step_have_user_details(context, email):
 @given('a user "{email}" exists in the system')
 def step_user_exists(context, email):
     """Mock that a user exists in the system"""
-    users_db[email] = {
-        "email": email,
-        "name": "John Doe",
-        "role": "user",
-        "created_at": datetime.now().isoformat()
-    }
+    if email in context.user_store:
+        context.user_store.update(email, name="John Doe", role="user")
+    else:
+        context.user_store.add({"email": email, "name": "John Doe", "role": "user"})
+    context.user_details = {"email": email}
     print(f"User {email} exists in the system")
 
 @when('I create a new user with the following details')
@@ -44,37 +42,36 @@ def step_create_new_user(context):
         user_data[row['Field']] = row['Value']
     
     # Mock user creation
-    users_db[user_data['email']] = {
+    context.created_user = context.user_store.add({
         "email": user_data['email'],
         "name": user_data['name'],
-        "role": user_data['role'],
-        "created_at": datetime.now().isoformat()
-    }
-    context.created_user = users_db[user_data['email']]
+        "role": user_data['role']
+    })
+    context.audit_log.append("create_user", context.current_user['email'], target=user_data['email'])
     print(f"Created user: {user_data['email']}")
 
 @when('I update the user\'s name to "{new_name}"')
 def step_update_user_name(context, new_name):
     """Update user's name"""
     email = context.user_details['email']
-    if email in users_db:
-        users_db[email]['name'] = new_name
-        context.updated_user = users_db[email]
+    if email in context.user_store:
+        context.updated_user = context.user_store.update(email, name=new_name)
+        context.audit_log.append("update_user", context.current_user['email'], target=email)
         print(f"Updated user {email} name to {new_name}")
 
 @when('I delete the user "{email}"')
 def step_delete_user(context, email):
     """Delete a user from the system"""
-    if email in users_db:
-        deleted_user = users_db.pop(email)
-        context.deleted_user = deleted_user
+    if email in context.user_store:
+        context.deleted_user = context.user_store.delete(email)
+        context.audit_log.append("delete_user", context.current_user['email'], target=email)
         print(f"Deleted user: {email}")
 
 @then('the user should be created successfully')
 def step_user_created_successfully(context):
     """Verify user was created successfully"""
     assert context.created_user is not None
-    assert context.created_user['email'] in users_db
+    assert context.created_user['email'] in context.user_store
     print("User created successfully")
 
 @then('the user should receive a welcome email')
@@ -87,7 +84,7 @@ def step_user_receives_welcome_email(context):
 def step_user_in_list(context):
     """Verify user appears in user list"""
     email = context.created_user['email']
-    assert email in users_db
+    assert email in context.user_store
     print(f"User {email} appears in user list")
 
 @then('the user\'s name should be updated to "{expected_name}"')
@@ -98,38 +95,92 @@ def step_user_name_updated(context, expected_name):
 
 @then('the change should be logged in the audit trail')
 def step_change_logged(context):
-    """Mock audit trail logging"""
-    audit_log.append({
-        "action": "update_user",
-        "timestamp": datetime.now().isoformat(),
-        "user": context.current_user['email']
-    })
+    """Verify the update was recorded in the audit trail"""
+    entries = list(context.audit_log.query(action="update_user", start=context.scenario_started_at))
+    assert any(entry["target"] == context.updated_user['email'] for entry in entries), \
+        "Expected an update_user entry in the audit trail"
     print("Change logged in audit trail")
 
 @then('the user should be removed from the system')
 def step_user_removed(context):
     """Verify user was removed"""
     email = context.deleted_user['email']
-    assert email not in users_db
+    assert email not in context.user_store
     print(f"User {email} removed from system")
 
 @then('the user should not appear in the user list')
 def step_user_not_in_list(context):
     """Verify user is not in user list"""
     email = context.deleted_user['email']
-    assert email not in users_db
+    assert email not in context.user_store
     print(f"User {email} not in user list")
 
 @then('the deletion should be logged in the audit trail')
 def step_deletion_logged(context):
-    """Mock deletion audit logging"""
-    audit_log.append({
-        "action": "delete_user",
-        "timestamp": datetime.now().isoformat(),
-        "user": context.current_user['email']
-    })
+    """Verify the deletion was recorded in the audit trail"""
+    entries = list(context.audit_log.query(action="delete_user", start=context.scenario_started_at))
+    assert any(entry["target"] == context.deleted_user['email'] for entry in entries), \
+        "Expected a delete_user entry in the audit trail"
     print("Deletion logged in audit trail")
 
+@given('{count:d} users with role "{role}" exist in the system')
+def step_seed_users(context, count, role):
+    """Seed a large number of generated users in one bulk insert"""
+    offset = context.user_store.count_by_role(role)
+    context.user_store.bulk_add(
+        {"email": f"seed-{role}-{offset + i}@example.com", "name": f"Seed {role.title()} {offset + i}", "role": role}
+        for i in range(count)
+    )
+    print(f"Seeded {count} users with role {role}")
+
+@then('the user list should contain {count:d} users')
+def step_user_list_count(context, count):
+    """Verify the total number of users"""
+    assert len(context.user_store) == count, \
+        f"Expected {count} users, got {len(context.user_store)}"
+    print(f"User list contains {count} users")
+
+@then('the user list filtered by role "{role}" should contain {count:d} users')
+def step_user_list_by_role(context, role, count):
+    """Verify filtering the user list by role"""
+    users = context.user_store.by_role(role)
+    assert len(users) == count, f"Expected {count} users with role {role}, got {len(users)}"
+    assert all(user["role"] == role for user in users)
+    print(f"User list filtered by role {role} contains {count} users")
+
+# Fixture file steps
+@given('a fixture file "{path}" with {count:d} generated users')
+def step_generate_fixture_file(context, path, count):
+    """Write a production-sized fixture file without holding it in memory"""
+    from testkit.fixtures import resolve_fixture_path, write_generated_fixture
+
+    write_generated_fixture(resolve_fixture_path(path), count)
+    print(f"Generated fixture {path} with {count} users")
+
+@given('users are loaded from "{path}"')
+def step_load_users_from_fixture(context, path):
+    """Stream a CSV/JSONL fixture file into the user store in validated batches"""
+    from testkit.fixtures import LoadStats, iter_valid_user_batches, resolve_fixture_path
+
+    stats = LoadStats()
+    store = context.user_store
+    for batch in iter_valid_user_batches(resolve_fixture_path(path), stats, exists=store.__contains__):
+        store.bulk_add(batch)
+    context.fixture_load_stats = stats
+    print(f"Loaded {stats.loaded} users from {path} in {stats.batches} batches ({stats.rejected} rejected)")
+
+@then('{count:d} users should have been loaded')
+def step_users_loaded(context, count):
+    """Verify the number of fixture rows accepted"""
+    loaded = context.fixture_load_stats.loaded
+    assert loaded == count, f"Expected {count} users loaded, got {loaded}"
+
+@then('{count:d} fixture rows should have been rejected')
+def step_fixture_rows_rejected(context, count):
+    """Verify the number of invalid or duplicate fixture rows"""
+    rejected = context.fixture_load_stats.rejected
+    assert rejected == count, f"Expected {count} rejected rows, got {rejected}"
+
 # Email validation steps
 @given('I have user details with email "{email}"')
 def step_have_email_details(context, email):
@@ -139,10 +190,9 @@ def step_have_email_details(context, email):
 @when('I attempt to create a user with the email')
 def step_attempt_create_with_email(context):
     """Attempt to create user with email"""
-    email = context.test_email
-    # Simple email validation
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    context.email_valid = bool(re.match(email_pattern, email))
+    from testkit.email_validation import is_valid_email
+
+    context.email_valid = is_valid_email(context.test_email)
 
 @then('the system should "{result}"')
 def step_system_should_result(context, result):
@@ -151,4 +201,40 @@ def step_system_should_result(context, result):
         assert context.email_valid, f"Email should be valid: {context.test_email}"
     elif result == "reject the email":
         assert not context.email_valid, f"Email should be invalid: {context.test_email}"
-    print(f"System {result} for email: {context.test_email}") 
\ No newline at end of file
+    print(f"System {result} for email: {context.test_email}")
+
+@given('{count:d} generated email addresses with {percent:d} percent invalid')
+def step_generate_emails(context, count, percent):
+    """Synthesize a large column of valid and invalid addresses"""
+    from testkit.email_validation import generate_emails
+
+    pairs = list(generate_emails(count, invalid_ratio=percent / 100))
+    context.generated_emails = [email for email, _ in pairs]
+    context.expected_valid = [valid for _, valid in pairs]
+    print(f"Generated {count} email addresses ({percent}% invalid)")
+
+@when('I validate the generated emails in one batch')
+def step_validate_generated_emails(context):
+    """Validate the whole column in one call"""
+    from testkit.email_validation import validate_emails
+
+    started = time.perf_counter()
+    context.validation_results = validate_emails(context.generated_emails)
+    context.validation_seconds = time.perf_counter() - started
+
+@then('every generated email should be classified correctly')
+def step_generated_emails_classified(context):
+    """Compare batch results with the generator's expectations"""
+    mismatches = [
+        email for email, expected, actual
+        in zip(context.generated_emails, context.expected_valid, context.validation_results)
+        if expected != actual
+    ]
+    assert not mismatches, f"{len(mismatches)} emails misclassified, e.g. {mismatches[:5]}"
+    print(f"All {len(context.generated_emails)} emails classified correctly")
+
+@then('the email validation throughput should be reported')
+def step_report_validation_throughput(context):
+    """Report emails validated per second"""
+    rate = len(context.generated_emails) / context.validation_seconds if context.validation_seconds else 0.0
+    print(f"Validated {len(context.generated_emails)} emails in {context.validation_seconds:.3f}s ({rate:,.0f} emails/s)")
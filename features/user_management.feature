@@ -31,6 +31,24 @@ Feature: User Management
     And the user should not appear in the user list
     And the deletion should be logged in the audit trail
 
+  Scenario: Filter a large user list by role
+    Given 10000 users with role "user" exist in the system
+    And 500 users with role "admin" exist in the system
+    Then the user list should contain 10500 users
+    And the user list filtered by role "admin" should contain 500 users
+
+  Scenario: Load users from a fixture file
+    Given users are loaded from "fixtures/users.jsonl"
+    Then 18 users should have been loaded
+    And 2 fixture rows should have been rejected
+    And the user list should contain 18 users
+
+  Scenario: Seed a production-sized tenant from a generated fixture
+    Given a fixture file "fixtures/generated/tenant.csv" with 200000 generated users
+    And users are loaded from "fixtures/generated/tenant.csv"
+    Then 200000 users should have been loaded
+    And the user list should contain 200000 users
+
   Scenario Outline: Validate user email format
     Given I have user details with email "<email>"
     When I attempt to create a user with the email
@@ -41,4 +59,10 @@ Feature: User Management
       | valid@example.com        | accept the email |
       | invalid-email            | reject the email |
       | @example.com             | reject the email |
-      | test@                   | reject the email | 
\ No newline at end of file
+      | test@                   | reject the email |
+
+  Scenario: Validate a large generated batch of emails
+    Given 100000 generated email addresses with 30 percent invalid
+    When I validate the generated emails in one batch
+    Then every generated email should be classified correctly
+    And the email validation throughput should be reported
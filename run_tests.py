@@ -8,8 +8,15 @@ import os
 import sys
 import subprocess
 import argparse
+import re
 from pathlib import Path
 
+# testkit modules are imported by the commands that use them: help and install must work
+# before behave is installed, and every command only pays for the imports it needs
+# (checked by `python run_tests.py imports`)
+
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
 def run_command(command, description):
     """Run a command and handle errors"""
     print(f"\n{'='*60}")
@@ -88,6 +95,290 @@ def run_dry_run():
         "Running dry run (showing all steps)"
     )
 
+def run_parallel(workers, split, schedule="round-robin"):
+    """Run tests in parallel shards and merge their reports"""
+    from testkit import metrics, reports, sharding
+
+    mode = "longest-first by recorded duration" if schedule == "duration" else f"split by {split}"
+    print(f"\n{'='*60}")
+    print(f"Running: tests in parallel ({workers} workers, {mode})")
+    print(f"{'='*60}\n")
+
+    shards = sharding.build_shards(workers, split, schedule=schedule)
+    if not shards:
+        print("❌ No feature files found")
+        return False
+
+    results = sharding.run_shards(shards, workers)
+    shard_dirs = [shard_dir for _, _, shard_dir in results]
+    reports.merge_text_reports(shard_dirs, "test-reports/behave-report.txt")
+    merged = reports.merge_junit_reports(shard_dirs, "test-reports")
+    metrics.merge_files([Path(shard_dir) / "metrics.txt" for shard_dir in shard_dirs], metrics.DEFAULT_METRICS_FILE)
+    reports.merge_step_profiles(shard_dirs, "test-reports")
+    reports.merge_retry_reports(shard_dirs, "test-reports")
+    print(f"\n✅ Merged {len(shard_dirs)} shard(s) into test-reports/behave-report.txt, "
+          f"{metrics.DEFAULT_METRICS_FILE}, step-profile.json, retries.json and {len(merged)} JUnit file(s)")
+
+    failed = [index for index, returncode, _ in results if returncode != 0]
+    if failed:
+        print(f"\n❌ Parallel run failed in shard(s): {', '.join(str(index) for index in failed)}")
+        return False
+    print("\n✅ Parallel run completed successfully!")
+    return True
+
+def run_single_pass_report(results_file, report_name, render_only=False):
+    """Run tests once, then render pretty, JUnit and HTML reports from the recorded results"""
+    from testkit import render
+
+    behave_ok = True
+    if not render_only:
+        behave_ok = run_command(
+            [sys.executable, "-m", "behave", "--format=testkit.record:JsonLinesFormatter", f"--outfile={results_file}"],
+            "Running tests once and recording results"
+        )
+
+    if not Path(results_file).exists():
+        print(f"\n❌ No recorded results found at {results_file}")
+        return False
+
+    counts = render.render_all(results_file, "test-reports", report_name)
+    print(f"\n✅ Rendered test-reports/{report_name}.txt, test-reports/{report_name}.html and JUnit XML from {results_file}")
+    print(f"   {counts['passed']} passed ({counts['flaky']} flaky), {counts['failed']} failed, {counts['skipped']} skipped")
+    return behave_ok and counts["failed"] == 0
+
+def run_affected_tests():
+    """Re-run only scenarios whose feature text or step code changed since they last passed"""
+    from testkit import affected
+
+    print(f"\n{'='*60}")
+    print("Running: changed-only test selection")
+    print(f"{'='*60}\n")
+
+    fingerprints, selected = affected.select()
+    print(f"{len(selected)} of {len(fingerprints)} scenario(s) changed since the last green run")
+    if not selected:
+        print("\n✅ Nothing to re-run")
+        return True
+
+    results_file = str(affected.RESULTS_PATH)
+    Path(results_file).unlink(missing_ok=True)
+    behave_ok = run_command(
+        [sys.executable, "-m", "behave", "--format=pretty",
+         "--format=testkit.record:JsonLinesFormatter", "--outfile=test-reports/affected-tests.txt",
+         f"--outfile={results_file}", *selected],
+        "Running affected scenarios"
+    )
+    passed = affected.update_cache(fingerprints, results_file)
+    print(f"   {passed} of {len(selected)} re-run scenario(s) passed; cache updated in {affected.CACHE_PATH}")
+    return behave_ok
+
+def run_watch():
+    """Keep a warm behave runner and re-run affected features on every save"""
+    from testkit import watch
+
+    print(f"\n{'='*60}")
+    print("Running: watch mode")
+    print(f"{'='*60}\n")
+    try:
+        watch.watch()
+    except KeyboardInterrupt:
+        print("\n✅ Stopped watching")
+    return True
+
+def run_summarize(report_dirs, summary_file):
+    """Summarize JUnit reports (per Python version for CI artifacts) as bounded markdown"""
+    from testkit import summary
+
+    print(f"\n{'='*60}")
+    print(f"Running: JUnit summary of {', '.join(report_dirs)}")
+    print(f"{'='*60}\n")
+
+    summaries = summary.write_summary(report_dirs, summary_file)
+    if not any(version.files for version in summaries):
+        print(f"❌ No JUnit XML reports found in {', '.join(report_dirs)}")
+        return False
+    for version in summaries:
+        counts = version.counts
+        print(f"  Python {version.version}: {counts['passed']} passed, {counts['failed']} failed, "
+              f"{counts['skipped']} skipped in {version.seconds:.2f}s ({version.files} file(s))")
+    print(f"\n✅ Summary written to {summary_file}")
+    return True
+
+def run_perf_check(runs=None, baseline_file=None, threshold=None, min_delta_ms=None, update_baseline=False):
+    """Compare scenario and step timings over repeated runs with the committed baseline"""
+    from testkit import perf
+
+    runs = runs or perf.DEFAULT_RUNS
+    baseline_file = baseline_file or str(perf.DEFAULT_BASELINE)
+    threshold = perf.DEFAULT_THRESHOLD if threshold is None else threshold
+    min_delta_ms = perf.DEFAULT_MIN_DELTA * 1000 if min_delta_ms is None else min_delta_ms
+    print(f"\n{'='*60}")
+    print(f"Running: performance check ({runs} runs against {baseline_file})")
+    print(f"{'='*60}\n")
+
+    record_paths = perf.record_runs(runs)
+    samples, failed = perf.collect_samples(record_paths)
+    if not samples["scenarios"]:
+        print("\n❌ No passed scenarios were recorded")
+        return False
+    if failed:
+        print(f"\n⚠️  {len(failed)} scenario(s) failed and were left out of the comparison")
+    current = perf.summarize_samples(samples)
+
+    if update_baseline:
+        perf.write_baseline(current, len(record_paths), baseline_file)
+        print(f"\n✅ Baseline of {len(current['scenarios'])} scenarios and {len(current['steps'])} steps written to {baseline_file}")
+        return True
+    if not Path(baseline_file).exists():
+        print(f"\n❌ No baseline at {baseline_file}; create one with --update-baseline")
+        return False
+
+    result = perf.compare(perf.load_baseline(baseline_file), current, threshold, min_delta_ms / 1000)
+    print("\n" + perf.format_comparison(result))
+    print(f"\nDetails written to {perf.write_report(result)}")
+    if result["regressions"]:
+        print(f"\n❌ {len(result['regressions'])} timing regression(s) beyond {threshold:.0%} (and {min_delta_ms:g} ms)")
+        return False
+    print("\n✅ No timing regressions")
+    return True
+
+def run_import_check(budget_ms=None, runner_budget_ms=None, runs=None):
+    """Measure the start-up import cost of run_tests.py and of a behave process against their budgets"""
+    from testkit import import_budget
+
+    budget_ms = budget_ms or import_budget.DEFAULT_BUDGET_MS
+    runner_budget_ms = runner_budget_ms or import_budget.DEFAULT_RUNNER_BUDGET_MS
+    runs = runs or import_budget.DEFAULT_RUNS
+    print(f"\n{'='*60}")
+    print(f"Running: start-up import check (behave {budget_ms:g} ms, runner {runner_budget_ms:g} ms, best of {runs})")
+    print(f"{'='*60}\n")
+
+    checks = [
+        ("behave", "behave start-up imports", import_budget.behave_command(), budget_ms),
+        ("runner", "run_tests.py start-up imports", import_budget.runner_command(__file__), runner_budget_ms),
+    ]
+    results = {}
+    over = []
+    for name, title, command, budget in checks:
+        entries = import_budget.measure(command, runs=runs)
+        if not entries:
+            print(f"❌ No import timings were reported for {title}")
+            return False
+        result = results[name] = dict(import_budget.summarize(entries), budget_ms=budget)
+        print(import_budget.format_summary(result, budget, title) + "\n")
+        if result["total_ms"] > budget:
+            over.append(f"{title} take {result['total_ms']:.1f} ms, over the {budget:g} ms budget")
+    print(f"Details written to {import_budget.write_report(results)}")
+    for message in over:
+        print(f"\n❌ {message[0].upper()}{message[1:]}")
+    if over:
+        return False
+    print("\n✅ Start-up imports within budget")
+    return True
+
+def run_load_test(feature_file, users, duration, iterations, base_url=None):
+    """Replay API scenario requests with concurrent virtual users"""
+    from testkit import load
+    from testkit.stub_server import VALID_API_KEY, StubApiServer
+
+    feature_file = feature_file or load.DEFAULT_FEATURE
+    profile = load.build_profile(feature_file)
+    if not profile:
+        print(f"❌ No API requests found in {feature_file}")
+        return False
+
+    base_url = base_url or os.environ.get("API_BASE_URL")
+    stub_server = None
+    if base_url is None:
+        stub_server = StubApiServer(port=0)
+        base_url = stub_server.start()
+
+    if duration is None and iterations is None:
+        duration = 10
+    limit = f"{duration}s" if duration is not None else f"{iterations} iteration(s)"
+    print(f"\n{'='*60}")
+    print(f"Running: load test with {users} virtual user(s) for {limit}")
+    print(f"Profile: {len(profile)} request(s) from {feature_file}")
+    print(f"Target: {base_url}")
+    print(f"{'='*60}\n")
+
+    try:
+        report = load.run_load(profile, base_url, os.environ.get("API_KEY", VALID_API_KEY),
+                               users=users, duration=duration, iterations=iterations)
+    finally:
+        if stub_server is not None:
+            stub_server.stop()
+
+    print(load.write_report(report))
+    print("✅ Load report written to test-reports/load-report.json and test-reports/load-report.txt")
+    if report["error_rate"] > 0:
+        print(f"\n❌ Load test saw an error rate of {report['error_rate']:.2%}")
+        return False
+    suspect = load.suspect_endpoints(report)
+    if suspect:
+        print(f"\n❌ Mostly unexpected statuses from {', '.join(suspect)}; their latencies are not the endpoint's")
+        return False
+    return True
+
+def run_soak(duration=None, interval=None, feature=None, iterations=None):
+    """Loop the features in one process and watch memory, gc and step latency for drift"""
+    from testkit import soak
+
+    duration = duration or soak.DEFAULT_DURATION
+    interval = soak.DEFAULT_INTERVAL if interval is None else interval
+    paths = [feature] if feature else []
+    print(f"\n{'='*60}")
+    print(f"Running: soak test of {feature or 'all features'} for {duration:g}s, sampling every {interval:g}s")
+    print(f"{'='*60}\n")
+
+    sampler = soak.soak(duration, interval, paths, iterations)
+    last = sampler.samples[-1]
+    print(f"\n{last['iteration']} iteration(s), {last['scenarios']} scenario(s), {last['failed']} failed")
+    print(f"Samples written to {sampler.csv_path} and {sampler.json_path}")
+
+    trends = sampler.trends()
+    if trends["rss_kb"].get("unconfirmed"):
+        print(f"\nℹ️  rss_kb grew {trends['rss_kb']['growth']:.1%} without traced memory or gc objects "
+              f"growing; not flagged")
+    growing = {metric: trend for metric, trend in trends.items() if trend["flagged"]}
+    for metric, trend in growing.items():
+        print(f"\n⚠️  {metric} grew {trend['growth']:.1%} ({trend['first']} -> {trend['last']}), "
+              f"rising in {trend['increasing']:.0%} of {trend['samples']} samples")
+    if growing:
+        print("\nLargest allocation growth:")
+        for entry in sampler.allocation_growth()[:5]:
+            print(f"  {entry['size_diff_kb']:+10.1f} KiB  {entry['site']}")
+    if last["failed"]:
+        print(f"\n❌ {last['failed']} scenario run(s) failed during the soak")
+        return False
+    if growing:
+        print(f"\n❌ Monotonic growth in {', '.join(growing)}")
+        return False
+    print("\n✅ No monotonic growth detected")
+    return True
+
+def run_benchmarks(names):
+    """Run microbenchmarks and write test-reports/benchmarks.json"""
+    from testkit import benchmarks
+
+    unknown = sorted(set(names or ()) - set(benchmarks.BENCHMARKS))
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)} (choose from {', '.join(benchmarks.BENCHMARKS)})")
+        return False
+    print(f"\n{'='*60}")
+    print(f"Running: benchmarks ({', '.join(names or benchmarks.BENCHMARKS)})")
+    print(f"{'='*60}\n")
+    benchmarks.run_benchmarks(names)
+    print("\n✅ Benchmark results written to test-reports/benchmarks.json")
+    return True
+
+def parse_duration(text):
+    """Seconds in "90", "90s", "15m" or "2h" (argparse type for --duration and --interval)"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", text.lower())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"not a duration: {text!r}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
 def create_test_reports_dir():
     """Create test reports directory"""
     reports_dir = Path("test-reports")
@@ -112,6 +403,21 @@ Commands:
     junit            Run tests with JUnit XML report
     verbose          Run tests with verbose output
     dry-run          Show all test steps without running
+    parallel         Run tests in parallel shards with merged reports
+    affected         Re-run only scenarios changed since their last green run
+    watch            Re-run affected features in a warm process on every save
+    report           Run tests once and render pretty, JUnit and HTML reports
+    summarize        Summarize JUnit reports as markdown (failures and
+                     slowest scenarios per Python version)
+    perf-check       Fail when scenario or step timings regress against
+                     the committed baseline (perf-baseline.json)
+    imports          Fail when a behave process or run_tests.py spends more
+                     than its budget importing modules at start-up
+    load             Replay API scenarios with concurrent virtual users
+    soak             Loop features in one process for --duration and flag
+                     steady growth of memory, objects or step latency
+    bench            Run microbenchmarks (email validation, response fakes,
+                     cassette replay)
     help             Show this help message
 
 Examples:
@@ -119,10 +425,79 @@ Examples:
     python run_tests.py all
     python run_tests.py user-mgmt
     python run_tests.py api --verbose
+    python run_tests.py api --profile
+    python run_tests.py api --record
+    python run_tests.py api --replay
+    python run_tests.py all --capture
+    python run_tests.py soak --duration 2h --metrics-port 9464
     python run_tests.py html
+    python run_tests.py parallel --workers 8 --split scenario
+    python run_tests.py parallel --workers 8 --schedule duration
+    python run_tests.py affected
+    python run_tests.py watch
+    python run_tests.py report
+    python run_tests.py report --render-only --results test-reports/results.jsonl
+    python run_tests.py summarize --reports all-test-results --summary-file test-summary.md
+    python run_tests.py perf-check --runs 5 --threshold 0.5
+    python run_tests.py perf-check --update-baseline
+    python run_tests.py imports --budget-ms 300
+    python run_tests.py load --users 50 --duration 60
+    python run_tests.py soak --duration 2h --interval 5m
+    python run_tests.py bench --bench email
 
 Options:
     --verbose        Enable verbose output for any command
+    --profile        Profile every scenario with cProfile and tracemalloc
+                     (output in test-reports/profiles/; tag a scenario with
+                     @profile to profile just that one)
+    --record         Run against the live API and record every HTTP call
+                     to the cassette (not with parallel)
+    --replay         Answer HTTP calls from the cassette; no server or
+                     network needed
+    --cassette FILE  Cassette file (default: features/cassettes/api.cassette)
+    --capture        Buffer scenario output and print it only for failed
+                     scenarios; writes test-reports/events.jsonl
+    --metrics-port N Serve the OpenMetrics of the running suite at
+                     http://localhost:N/metrics (not with parallel; the
+                     file test-reports/metrics.txt is always written)
+    --workers N      Number of parallel workers (default: CPU count)
+    --split MODE     Shard by "feature" or "scenario" (default: feature)
+    --schedule MODE  "round-robin" or "duration" to balance scenarios
+                     longest-first using .behave-timings.db history
+    --results FILE   JSON lines record used by the report command
+                     (default: test-reports/results.jsonl)
+    --render-only    Re-render reports from --results without running tests
+    --report-name N  Base name of the rendered reports (default: behave-report)
+    --reports DIR    JUnit report directory, or a directory of downloaded
+                     test-results-<version> artifacts (repeatable;
+                     default: test-reports)
+    --summary-file F Markdown written by summarize
+                     (default: test-reports/summary.md)
+    --runs N         Suite runs whose medians perf-check compares (default: 5);
+                     for imports, start-ups measured, best kept (default: 3)
+    --threshold F    Allowed slowdown as a fraction of the baseline median
+                     (default: 0.5, i.e. 50%)
+    --min-delta-ms M Ignore slowdowns smaller than M ms (default: 10)
+    --baseline FILE  Timing baseline (default: perf-baseline.json)
+    --update-baseline
+                     Write the measured timings as the new baseline
+    --budget-ms M    Start-up import budget of a behave process for imports
+                     (default: 400)
+    --runner-budget-ms M
+                     Start-up import budget of run_tests.py itself
+                     (default: 100)
+    --users N        Concurrent virtual users for load tests (default: 10)
+    --duration S     Load or soak test duration: seconds, or with an s/m/h
+                     suffix (load default: 10s, soak default: 1h)
+    --interval S     Time between soak samples (default: 60s)
+    --iterations N   Profile iterations per virtual user instead of a duration;
+                     for soak, stop after N runs of the features
+    --base-url URL   API server for load tests (default: $API_BASE_URL,
+                     otherwise a local stub server)
+    --feature FILE   Feature file used as the load profile
+                     (default: features/api_integration.feature) or looped
+                     by soak (default: all features)
+    --bench NAME     Benchmark to run (repeatable; default: all)
     --help           Show help message
     """
     print(help_text)
@@ -131,15 +506,61 @@ def main():
     """Main function"""
     parser = argparse.ArgumentParser(description="Python Behave Integration Test Runner")
     parser.add_argument("command", nargs="?", default="help", 
-                       choices=["install", "all", "user-mgmt", "api", "smoke", "html", "junit", "verbose", "dry-run", "help"],
+                       choices=["install", "all", "user-mgmt", "api", "smoke", "html", "junit", "verbose", "dry-run", "parallel", "affected", "watch", "report", "summarize", "perf-check", "imports", "load", "soak", "bench", "help"],
                        help="Command to run")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose output")
+    parser.add_argument("--profile", action="store_true", help="Profile every scenario with cProfile and tracemalloc")
+    http_mode = parser.add_mutually_exclusive_group()
+    http_mode.add_argument("--record", action="store_true", help="Record HTTP calls to the cassette")
+    http_mode.add_argument("--replay", action="store_true", help="Replay HTTP calls from the cassette")
+    parser.add_argument("--cassette", help="Cassette file for --record/--replay")
+    parser.add_argument("--capture", action="store_true", help="Show scenario output only for failed scenarios")
+    parser.add_argument("--metrics-port", type=int, help="Serve suite metrics over HTTP on this port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of parallel workers")
+    parser.add_argument("--split", choices=["feature", "scenario"], default="feature", help="How to shard tests for parallel runs")
+    parser.add_argument("--schedule", choices=["round-robin", "duration"], default="round-robin", help="How to assign shards to workers")
+    parser.add_argument("--results", default="test-reports/results.jsonl", help="JSON lines record of a test run")
+    parser.add_argument("--render-only", action="store_true", help="Render reports from --results without running tests")
+    parser.add_argument("--report-name", default="behave-report", help="Base name of rendered reports")
+    parser.add_argument("--reports", action="append", help="JUnit report directory for summarize")
+    parser.add_argument("--summary-file", default="test-reports/summary.md", help="Markdown summary written by summarize")
+    parser.add_argument("--runs", type=int, help="Suite runs for perf-check, start-ups measured by imports")
+    parser.add_argument("--threshold", type=float, help="Allowed slowdown fraction for perf-check")
+    parser.add_argument("--min-delta-ms", type=float, help="Smallest slowdown perf-check reports")
+    parser.add_argument("--baseline", help="Timing baseline for perf-check")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the measured timings as the new baseline")
+    parser.add_argument("--budget-ms", type=float, help="Start-up import budget of a behave process for imports")
+    parser.add_argument("--runner-budget-ms", type=float, help="Start-up import budget of run_tests.py for imports")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users for load tests")
+    parser.add_argument("--duration", type=parse_duration, help="Load or soak test duration (e.g. 90, 15m, 2h)")
+    parser.add_argument("--interval", type=parse_duration, help="Time between soak samples")
+    parser.add_argument("--iterations", type=int, help="Profile iterations per virtual user")
+    parser.add_argument("--base-url", help="API server for load tests")
+    parser.add_argument("--feature", help="Feature file used as the load profile or looped by soak")
+    parser.add_argument("--bench", action="append", help="Benchmark to run")
     
     args = parser.parse_args()
     
     # Create test reports directory
     create_test_reports_dir()
     
+    # Picked up by features/environment.py in every behave subprocess
+    if args.profile:
+        os.environ["BEHAVE_PROFILE"] = "1"
+    if args.capture:
+        os.environ["BEHAVE_CAPTURE"] = "1"
+    if args.metrics_port:
+        os.environ["BEHAVE_METRICS_PORT"] = str(args.metrics_port)
+    if args.record or args.replay:
+        if args.record and args.command == "parallel":
+            print("❌ --record cannot be combined with parallel shards")
+            sys.exit(1)
+        os.environ["BEHAVE_HTTP_MODE"] = "record" if args.record else "replay"
+        if args.cassette is None:
+            from testkit.cassette import DEFAULT_CASSETTE
+            args.cassette = str(DEFAULT_CASSETTE)
+        os.environ["BEHAVE_CASSETTE"] = os.path.abspath(args.cassette)
+    
     # Handle commands
     if args.command == "help":
         show_help()
@@ -165,6 +586,26 @@ def main():
         success = run_verbose()
     elif args.command == "dry-run":
         success = run_dry_run()
+    elif args.command == "parallel":
+        success = run_parallel(args.workers, args.split, args.schedule)
+    elif args.command == "affected":
+        success = run_affected_tests()
+    elif args.command == "watch":
+        success = run_watch()
+    elif args.command == "report":
+        success = run_single_pass_report(args.results, args.report_name, args.render_only)
+    elif args.command == "summarize":
+        success = run_summarize(args.reports or ["test-reports"], args.summary_file)
+    elif args.command == "perf-check":
+        success = run_perf_check(args.runs, args.baseline, args.threshold, args.min_delta_ms, args.update_baseline)
+    elif args.command == "imports":
+        success = run_import_check(args.budget_ms, args.runner_budget_ms, args.runs)
+    elif args.command == "load":
+        success = run_load_test(args.feature, args.users, args.duration, args.iterations, args.base_url)
+    elif args.command == "soak":
+        success = run_soak(args.duration, args.interval, args.feature, args.iterations)
+    elif args.command == "bench":
+        success = run_benchmarks(args.bench)
     
     # Exit with appropriate code
     if success:
@@ -0,0 +1,3 @@
+"""
+Shared helpers for the Behave integration test runner and environment hooks.
+"""
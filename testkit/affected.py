@@ -0,0 +1,157 @@
+"""
+Changed-only test selection for `python run_tests.py affected`.
+
+A behave dry run maps every scenario to the step definitions its steps
+match. Each scenario then gets a fingerprint made of:
+    - its feature file, name, tags and step text (background steps included)
+    - the source of every step function it uses, plus the module-level code
+      of the step files (helpers, imports)
+    - the files every scenario depends on: environment.py, behave.ini,
+      testkit/ and the fixture and cassette files
+Sources are hashed from their AST, so comments, blank lines and code moving
+to another line do not count as changes. Fingerprints of passed scenarios
+are kept in .behave-affected.json; the next run only selects scenarios whose
+fingerprint is not in that cache (new, changed or not yet green).
+"""
+
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from testkit.record import read_records
+from testkit.render import FAILED_STATUSES
+
+CACHE_PATH = Path(".behave-affected.json")
+DRY_RUN_PATH = Path("test-reports") / "affected-dry-run.json"
+RESULTS_PATH = Path("test-reports") / "affected.jsonl"
+SHARED_INPUTS = (
+    "behave.ini",
+    "features/environment.py",
+    "testkit/*.py",
+    "features/fixtures/*.*",
+    "features/cassettes/*",
+)
+STEP_DECORATORS = frozenset(("given", "when", "then", "step", "Given", "When", "Then", "Step"))
+
+
+def _digest(*parts):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def shared_inputs_hash(root="."):
+    """Hash of the files every scenario depends on"""
+    root = Path(root)
+    parts = []
+    for pattern in SHARED_INPUTS:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                content = path.read_bytes()
+                if path.suffix == ".py":
+                    content = ast.dump(ast.parse(content)).encode("utf-8")
+                parts.extend((str(path.relative_to(root)), content))
+    return _digest(*parts)
+
+
+def _is_step_function(node):
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return False
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if isinstance(target, ast.Name) and target.id in STEP_DECORATORS:
+            return True
+    return False
+
+
+def step_function_hashes(step_file):
+    """Map "<file>:<line>" of every line a step function's decorators and def
+    span to the hash of that function and its module's shared code"""
+    tree = ast.parse(Path(step_file).read_bytes())
+    step_nodes = [node for node in tree.body if _is_step_function(node)]
+    shared = _digest(*(ast.dump(node) for node in tree.body if node not in step_nodes))
+    hashes = {}
+    for node in step_nodes:
+        function_hash = _digest(shared, ast.dump(node))
+        first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        for line in range(first_line, node.lineno + 1):
+            hashes[f"{step_file}:{line}"] = function_hash
+    return hashes
+
+
+def dry_run(paths=("features",), output=DRY_RUN_PATH):
+    """Run behave --dry-run and return its JSON description of every feature"""
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, "-m", "behave", "--dry-run", "--no-summary", "--no-snippets",
+               "--format=json", f"--outfile={output}", *paths]
+    subprocess.run(command, check=False, stdout=subprocess.DEVNULL)
+    if not output.exists() or not output.stat().st_size:
+        raise RuntimeError("behave --dry-run produced no output")
+    return json.loads(output.read_text(encoding="utf-8"))
+
+
+def _step_text(step):
+    return [step["keyword"], step["name"], step.get("text"), step.get("table")]
+
+
+def scenario_fingerprints(features, shared_hash):
+    """Map scenario location to fingerprint for the dry-run JSON of features"""
+    function_hashes = {}
+    fingerprints = {}
+    for feature in features:
+        for element in feature.get("elements", []):
+            if element.get("type") != "scenario":
+                continue
+            parts = [shared_hash, feature["location"].rsplit(":", 1)[0], element["name"],
+                     json.dumps(sorted(element.get("tags", [])))]
+            for step in element.get("steps", []):
+                parts.append(json.dumps(_step_text(step)))
+                location = step.get("match", {}).get("location")
+                if location is None:
+                    parts.append("undefined")
+                    continue
+                step_file = location.rsplit(":", 1)[0]
+                if step_file not in function_hashes:
+                    function_hashes[step_file] = step_function_hashes(step_file) if Path(step_file).exists() else {}
+                parts.append(function_hashes[step_file].get(location, location))
+            fingerprints[element["location"]] = _digest(*parts)
+    return fingerprints
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        return set(json.loads(Path(path).read_text(encoding="utf-8"))["passed"])
+    except (OSError, ValueError, KeyError):
+        return set()
+
+
+def select(paths=("features",), cache_path=CACHE_PATH):
+    """Return (fingerprints of all scenarios, locations to re-run)"""
+    fingerprints = scenario_fingerprints(dry_run(paths), shared_inputs_hash())
+    passed = load_cache(cache_path)
+    return fingerprints, [location for location, fingerprint in fingerprints.items() if fingerprint not in passed]
+
+
+def update_cache(fingerprints, results_path=RESULTS_PATH, cache_path=CACHE_PATH):
+    """Add the scenarios that passed in results_path to the cache and drop stale entries.
+    Returns the number of scenarios that passed."""
+    current = set(fingerprints.values())
+    passed = load_cache(cache_path) & current
+    newly_passed = 0
+    if Path(results_path).exists():
+        for record in read_records(results_path):
+            fingerprint = fingerprints.get(record["location"])
+            if fingerprint is not None and record["status"] == "passed":
+                passed.add(fingerprint)
+                newly_passed += 1
+            elif fingerprint is not None and record["status"] in FAILED_STATUSES:
+                # Unselected scenarios of the same feature are recorded as skipped
+                passed.discard(fingerprint)
+    Path(cache_path).write_text(json.dumps({"passed": sorted(passed)}, indent=0), encoding="utf-8")
+    return newly_passed
@@ -0,0 +1,160 @@
+"""
+Bounded audit log for the user management steps.
+
+Recent entries live in a fixed-size ring buffer. Every entry is also queued
+and written in batches to JSON lines segment files, which rotate after a
+fixed number of entries. Each segment keeps a small in-memory summary
+(time range, actions, sequence range) so queries only open segments that
+can contain matches, and queries served entirely by the ring buffer never
+touch the disk. Memory use is bounded by the ring capacity and batch size,
+however many events a run produces. The segments only back queries during
+the run: a leftover of an earlier process with the same pid is removed when
+the log starts, and the log's own segments when it is closed.
+"""
+
+import json
+import os
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SEGMENT_ENTRIES = 100000
+
+
+def _timestamp(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class AuditSegment:
+    """Summary of one on-disk JSON lines segment"""
+
+    __slots__ = ("path", "entries", "first_seq", "last_seq", "min_timestamp", "max_timestamp", "actions")
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = 0
+        self.first_seq = None
+        self.last_seq = None
+        self.min_timestamp = None
+        self.max_timestamp = None
+        self.actions = set()
+
+    def add(self, entry):
+        if self.first_seq is None:
+            self.first_seq = entry["seq"]
+            self.min_timestamp = entry["timestamp"]
+        self.entries += 1
+        self.last_seq = entry["seq"]
+        self.max_timestamp = entry["timestamp"]
+        self.actions.add(entry["action"])
+
+    def may_contain(self, action, start, end):
+        if action is not None and action not in self.actions:
+            return False
+        if start is not None and self.max_timestamp < start:
+            return False
+        if end is not None and self.min_timestamp >= end:
+            return False
+        return True
+
+
+class AuditLog:
+    """Ring-buffered audit log with batched spill to JSON lines segments"""
+
+    def __init__(self, directory, capacity=DEFAULT_CAPACITY, batch_size=DEFAULT_BATCH_SIZE,
+                 segment_entries=DEFAULT_SEGMENT_ENTRIES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Parallel shards share the directory, so segment names include the pid
+        self.prefix = f"audit-{os.getpid()}"
+        for stale in self.directory.glob(f"{self.prefix}-*.jsonl"):
+            stale.unlink()
+        self.ring = deque(maxlen=capacity)
+        self.batch_size = batch_size
+        self.segment_entries = segment_entries
+        self.pending = []
+        self.segments = []
+        self.counts = {}
+        self.next_seq = 0
+
+    def __len__(self):
+        return self.next_seq
+
+    def append(self, action, user, **details):
+        """Record an audit event and return it"""
+        entry = {"seq": self.next_seq, "action": action, "timestamp": datetime.now().isoformat(), "user": user}
+        entry.update(details)
+        self.next_seq += 1
+        self.ring.append(entry)
+        self.pending.append(entry)
+        self.counts[action] = self.counts.get(action, 0) + 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return entry
+
+    def count(self, action=None):
+        """Total number of events, or of one action, over the whole run"""
+        if action is None:
+            return self.next_seq
+        return self.counts.get(action, 0)
+
+    def flush(self):
+        """Write pending entries to the current segment, rotating when it is full"""
+        pending = self.pending
+        while pending:
+            if not self.segments or self.segments[-1].entries >= self.segment_entries:
+                path = self.directory / f"{self.prefix}-{len(self.segments):05d}.jsonl"
+                path.write_text("", encoding="utf-8")
+                self.segments.append(AuditSegment(path))
+            segment = self.segments[-1]
+            room = self.segment_entries - segment.entries
+            batch, pending = pending[:room], pending[room:]
+            with open(segment.path, "a", encoding="utf-8") as segment_file:
+                segment_file.write("".join(json.dumps(entry) + "\n" for entry in batch))
+            for entry in batch:
+                segment.add(entry)
+        self.pending = []
+
+    def query(self, action=None, start=None, end=None):
+        """Yield events matching action and start <= timestamp < end, oldest first"""
+        start, end = _timestamp(start), _timestamp(end)
+        ring_first_seq = self.ring[0]["seq"] if self.ring else self.next_seq
+        ring_covers_window = bool(self.ring) and start is not None and self.ring[0]["timestamp"] <= start
+
+        if ring_first_seq > 0 and not ring_covers_window:
+            self.flush()
+            for segment in self.segments:
+                if segment.first_seq >= ring_first_seq:
+                    break
+                if not segment.may_contain(action, start, end):
+                    continue
+                with open(segment.path, encoding="utf-8") as segment_file:
+                    for line in segment_file:
+                        entry = json.loads(line)
+                        if entry["seq"] >= ring_first_seq:
+                            break
+                        if self._matches(entry, action, start, end):
+                            yield entry
+
+        for entry in list(self.ring):
+            if self._matches(entry, action, start, end):
+                yield entry
+
+    @staticmethod
+    def _matches(entry, action, start, end):
+        if action is not None and entry["action"] != action:
+            return False
+        if start is not None and entry["timestamp"] < start:
+            return False
+        if end is not None and entry["timestamp"] >= end:
+            return False
+        return True
+
+    def close(self):
+        """Drop the segment files; counts and the ring stay available"""
+        self.pending = []
+        for segment in self.segments:
+            segment.path.unlink(missing_ok=True)
+        self.segments = []
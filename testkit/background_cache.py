@@ -0,0 +1,164 @@
+"""
+Run a feature's Background once and hand every scenario a snapshot of it.
+
+The first scenario runs the Background steps normally. When the last of
+them has passed, the cache remembers:
+    - the context attributes the Background steps set, copied so scenarios
+      cannot change each other's (strings, numbers and other immutable
+      values are shared, not copied)
+    - a snapshot token from every registered state provider (the user
+      store, the stub server, the cassette session); these roll back to
+      the token in O(changes), so they behave like copy-on-write
+Later scenarios with the same Background steps (the rest of the feature,
+and following features with an identical Background) restore that state
+in before_scenario and replay the Background steps as passed without
+running them. A scenario that cannot use the cache drops it.
+
+Opt out with the @fresh_background tag on a feature or scenario, or for a
+whole run with BEHAVE_BACKGROUND_CACHE=0.
+"""
+
+import copy
+import functools
+import os
+import time
+
+from behave.model_core import Status
+
+FRESH_TAG = "fresh_background"
+IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None), frozenset)
+# Set on the scenario layer by behave itself (output capture, step text/table)
+BEHAVE_ATTRIBUTES = frozenset(("stdout_capture", "stderr_capture", "log_capture", "text", "table"))
+
+
+def enabled():
+    return os.environ.get("BEHAVE_BACKGROUND_CACHE", "1") != "0"
+
+
+def background_signature(scenario):
+    """Identity of a scenario's Background: the text of its steps, or None without one"""
+    steps = scenario.background_steps
+    if not steps:
+        return None
+    return tuple(
+        (step.keyword, step.name, step.text, None if step.table is None else repr(list(step.table)))
+        for step in steps
+    )
+
+
+def _is_immutable(value):
+    if isinstance(value, tuple):
+        return all(_is_immutable(item) for item in value)
+    return isinstance(value, IMMUTABLE_TYPES)
+
+
+def _fresh_copy(value):
+    return value if _is_immutable(value) else copy.deepcopy(value)
+
+
+def _replay_step(step, runner, quiet=False, capture=True):
+    """Stand-in for Step.run that reports the step as passed without running it"""
+    step.reset()
+    match = runner.step_registry.find_match(step)
+    step.status = Status.passed
+    step.duration = 0.0
+    if not quiet:
+        for formatter in runner.formatters:
+            formatter.match(match)
+            formatter.result(step)
+    return True
+
+
+class BackgroundCache:
+    """Captures the state a Background leaves behind and restores it for later scenarios"""
+
+    def __init__(self, providers=(), active=True):
+        self.providers = [provider for provider in providers if provider is not None]
+        self.active = active
+        self.signature = None
+        self.attributes = None
+        self.tokens = None
+        self.setup_seconds = 0.0
+        self.pending = None
+        self.builds = 0
+        self.replays = 0
+        self.restore_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def _usable(self, scenario):
+        return self.active and FRESH_TAG not in scenario.effective_tags
+
+    def restore(self, context, scenario):
+        """Called from before_scenario. Restores the cached Background state and returns
+        True, or returns False when the caller has to reset state and run the Background"""
+        self.pending = None
+        for step in scenario.background_steps:
+            step.__dict__.pop("run", None)
+        signature = background_signature(scenario)
+        if signature is None or not self._usable(scenario):
+            self.drop()
+            return False
+        if signature != self.signature:
+            self.drop()
+            self.pending = (signature, dict(context._stack[0]))
+            return False
+
+        # Rolling the providers back replaces the reset before_scenario does anyway,
+        # so only the attribute copies count against the time saved
+        for provider, token in zip(self.providers, self.tokens):
+            provider.restore(token)
+        started = time.perf_counter()
+        for name, value in self.attributes.items():
+            setattr(context, name, _fresh_copy(value))
+        for step in scenario.background_steps:
+            step.run = functools.partial(_replay_step, step)
+        restore_seconds = time.perf_counter() - started
+        self.replays += 1
+        self.restore_seconds += restore_seconds
+        self.saved_seconds += self.setup_seconds - restore_seconds
+        return True
+
+    def after_step(self, context, step):
+        """Called from after_step: captures the state once the Background has passed"""
+        if self.pending is None:
+            return
+        scenario = context.scenario
+        background_steps = scenario.background_steps
+        if step.status != Status.passed:
+            self.pending = None
+            return
+        if step is not background_steps[-1]:
+            return
+
+        signature, before = self.pending
+        self.pending = None
+        layer = context._stack[0]
+        changed = {name: value for name, value in layer.items()
+                   if name not in BEHAVE_ATTRIBUTES and (name not in before or before[name] is not value)}
+        try:
+            attributes = {name: _fresh_copy(value) for name, value in changed.items()}
+        except Exception:
+            # Something the Background created cannot be copied; keep running it every time
+            return
+        self.signature = signature
+        self.attributes = attributes
+        self.tokens = [provider.snapshot() for provider in self.providers]
+        self.setup_seconds = sum(background_step.duration for background_step in background_steps)
+        self.builds += 1
+
+    def add_provider(self, provider):
+        """Register a provider started mid-run; snapshots taken without it are dropped"""
+        self.providers.append(provider)
+        self.drop()
+
+    def drop(self):
+        self.signature = None
+        self.attributes = None
+        self.tokens = None
+
+    def summary(self):
+        if not self.active:
+            return "Background cache: disabled"
+        return (f"Background cache: {self.builds} Background(s) set up, {self.replays} replayed "
+                f"from snapshots, {self.saved_seconds:.3f}s of setup saved "
+                f"({self.restore_seconds * 1000:.1f} ms spent copying state)")
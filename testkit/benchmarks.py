@@ -0,0 +1,37 @@
+"""
+Microbenchmarks run by `python run_tests.py bench`.
+Each benchmark returns {variant: {"seconds": ..., <rate>: ...}}.
+"""
+
+import importlib
+import json
+import time
+from pathlib import Path
+
+# Benchmark name -> module with a benchmark() function, imported only when that benchmark runs
+BENCHMARKS = {
+    "email": "testkit.email_validation",
+    "responses": "testkit.responses",
+    "cassette": "testkit.cassette",
+    "startup": "testkit.feature_cache",
+}
+
+
+def timed(run):
+    """Seconds one call of run() takes"""
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(names=None, reports_dir="test-reports"):
+    """Run the selected benchmarks (all by default) and write benchmarks.json"""
+    results = {}
+    for name in names or BENCHMARKS:
+        print(f"  Running benchmark: {name}")
+        results[name] = importlib.import_module(BENCHMARKS[name]).benchmark()
+        for variant, stats in results[name].items():
+            rates = ", ".join(f"{key}={value:,.0f}" for key, value in stats.items() if key != "seconds")
+            print(f"    {variant:<12} {stats['seconds'] * 1000:>10.2f} ms  {rates}")
+    Path(reports_dir, "benchmarks.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return results
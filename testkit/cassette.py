@@ -0,0 +1,274 @@
+"""
+Record/replay of the HTTP calls made by the API steps.
+
+`python run_tests.py api --record` runs the steps against the live API (the
+stub server, or API_BASE_URL) and stores every request/response pair in a
+cassette file; `--replay` answers the same requests from the cassette with
+no server and no network.
+
+Cassette layout (all integers little-endian):
+    header   magic (8 bytes), slot count (u64), index offset (u64)
+    records  status (u16), headers length (u32), body length (u32),
+             headers as JSON, body bytes
+    index    slot count x (16-byte key, u64 record offset)
+
+The index is an open-addressing hash table with at most 50% load, so a
+replayed request costs one hash and usually a single slot probe on the
+memory-mapped file; nothing is parsed up front.
+
+Requests are keyed by a BLAKE2b hash of where they were made, the method,
+path and query, JSON body, whether the configured API key was sent, and
+how many identical requests were already made there (a GET before and after
+a DELETE are different responses). "Where" is the scenario (feature file
+and name), or for Background steps the Background's own steps, so the same
+request in two scenarios gets two records while a Background shared by
+several scenarios replays whether it ran or came from the Background cache.
+A key recorded twice (a retried scenario, a Background run for every
+scenario) keeps its last response. The host is left out so a cassette
+recorded against one server replays against any base URL.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from testkit.responses import FakeResponse
+
+DEFAULT_CASSETTE = Path("features") / "cassettes" / "api.cassette"
+MAGIC = b"BHVCAS1\n"
+HEADER = struct.Struct("<8sQQ")
+RECORD = struct.Struct("<HII")
+SLOT = struct.Struct("<16sQ")
+EMPTY_KEY = bytes(16)
+KEEP_HEADERS = ("Content-Type",)
+
+
+class CassetteMiss(LookupError):
+    """Raised when replaying a request that was never recorded"""
+
+
+def request_key(method, url, body, authorized, occurrence, scope=""):
+    """16-byte key identifying one request of a scenario"""
+    parts = urlsplit(url)
+    target = parts.path + ("?" + parts.query if parts.query else "")
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (scope, method.upper(), target, str(bool(authorized)), str(occurrence)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(body or b"")
+    key = digest.digest()
+    return key if key != EMPTY_KEY else b"\1" + key[1:]
+
+
+def _encode_body(json_body):
+    return None if json_body is None else json.dumps(json_body, sort_keys=True).encode("utf-8")
+
+
+def _slot_count(entries):
+    slots = 8
+    while slots < entries * 2:
+        slots *= 2
+    return slots
+
+
+class CassetteWriter:
+    """Streams records to disk and writes the hash index on close"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+        self.offsets = {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, key, status_code, headers, content):
+        headers_bytes = json.dumps(headers, sort_keys=True).encode("utf-8")
+        self.offsets[key] = self.file.tell()
+        self.file.write(RECORD.pack(status_code, len(headers_bytes), len(content)))
+        self.file.write(headers_bytes)
+        self.file.write(content)
+
+    def close(self):
+        """Write the index and header, then move the cassette into place"""
+        if self.file.closed:
+            return
+        slots = _slot_count(len(self.offsets))
+        mask = slots - 1
+        table = [None] * slots
+        for key, offset in self.offsets.items():
+            slot = int.from_bytes(key[:8], "little") & mask
+            while table[slot] is not None:
+                slot = (slot + 1) & mask
+            table[slot] = (key, offset)
+        index_offset = self.file.tell()
+        self.file.write(b"".join(SLOT.pack(*(entry or (EMPTY_KEY, 0))) for entry in table))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, slots, index_offset))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class Cassette:
+    """Read-only, memory-mapped cassette"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as cassette_file:
+            self.map = mmap.mmap(cassette_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slots, self.index_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"Not a cassette file: {path}")
+        self.mask = self.slots - 1
+
+    def __len__(self):
+        return sum(1 for slot in range(self.slots) if self._slot(slot)[0] != EMPTY_KEY)
+
+    def _slot(self, slot):
+        return SLOT.unpack_from(self.map, self.index_offset + slot * SLOT.size)
+
+    def lookup(self, key):
+        """Return (status_code, headers, content) for key, or None"""
+        slot = int.from_bytes(key[:8], "little") & self.mask
+        for _ in range(self.slots):
+            slot_key, offset = self._slot(slot)
+            if slot_key == key:
+                status_code, headers_length, body_length = RECORD.unpack_from(self.map, offset)
+                start = offset + RECORD.size
+                headers = json.loads(self.map[start:start + headers_length])
+                start += headers_length
+                return status_code, headers, self.map[start:start + body_length]
+            if slot_key == EMPTY_KEY:
+                return None
+            slot = (slot + 1) & self.mask
+        return None
+
+    def close(self):
+        self.map.close()
+
+
+class _CassetteSession:
+    """Shared request bookkeeping of the recording and replaying sessions"""
+
+    def __init__(self, api_key):
+        self.authorization = f"Bearer {api_key}"
+        self.scope = ""
+        self.seen = {}
+        # Concurrent request steps share one session between threads
+        self.lock = threading.Lock()
+
+    def new_scenario(self):
+        """Restart the per-scenario occurrence counts"""
+        self.seen = {}
+
+    def enter(self, scope):
+        """Key the following requests under scope (see the module docstring)"""
+        self.scope = scope
+
+    def snapshot(self):
+        return dict(self.seen)
+
+    def restore(self, token):
+        self.seen = dict(token)
+
+    def _key(self, method, url, headers, body):
+        authorized = (headers or {}).get("Authorization") == self.authorization
+        with self.lock:
+            scope = self.scope
+            identity = (scope, method.upper(), url, authorized, body)
+            occurrence = self.seen.get(identity, 0)
+            self.seen[identity] = occurrence + 1
+        return request_key(method, url, body, authorized, occurrence, scope)
+
+
+class RecordingSession(_CassetteSession):
+    """Sends requests through a real session and records every response"""
+
+    def __init__(self, session, path, api_key):
+        super().__init__(api_key)
+        self.session = session
+        self.writer = CassetteWriter(path)
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        body = _encode_body(json)
+        key = self._key(method, url, headers, body)
+        response = self.session.request(method, url, headers=headers, json=json, timeout=timeout)
+        kept = {name: response.headers[name] for name in KEEP_HEADERS if name in response.headers}
+        with self.lock:
+            self.writer.add(key, response.status_code, kept, response.content)
+        return response
+
+    def close(self):
+        self.writer.close()
+        self.session.close()
+
+
+class ReplaySession(_CassetteSession):
+    """Answers requests from a cassette without touching the network"""
+
+    def __init__(self, path, api_key):
+        super().__init__(api_key)
+        self.cassette = Cassette(path)
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        body = _encode_body(json)
+        found = self.cassette.lookup(self._key(method, url, headers, body))
+        if found is None:
+            raise CassetteMiss(f"No recorded response for {method} {url}; re-record with --record")
+        status_code, response_headers, content = found
+        return FakeResponse(status_code, content, response_headers, url)
+
+    def close(self):
+        self.cassette.close()
+
+
+def benchmark(count=2000, repeat=3):
+    """Compare live requests to the stub server with replaying them from a cassette"""
+    import requests
+
+    from testkit.benchmarks import timed
+    from testkit.stub_server import VALID_API_KEY, StubApiServer
+
+    server = StubApiServer("127.0.0.1", 0)
+    base_url = server.start()
+    headers = {"Authorization": f"Bearer {VALID_API_KEY}"}
+    urls = [f"{base_url}/api/users/{(1, 2, 123)[i % 3]}" for i in range(count)]
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.cassette"
+            recorder = RecordingSession(requests.Session(), path, VALID_API_KEY)
+            for url in urls:
+                recorder.request("GET", url, headers=headers)
+            recorder.close()
+
+            live = requests.Session()
+            replay = ReplaySession(path, VALID_API_KEY)
+
+            def run_live():
+                for url in urls:
+                    live.request("GET", url, headers=headers).json()
+
+            def run_replay():
+                replay.new_scenario()
+                for url in urls:
+                    replay.request("GET", url, headers=headers).json()
+
+            for name, run in (("live", run_live), ("replay", run_replay)):
+                best = min(timed(run) for _ in range(repeat))
+                results[name] = {"seconds": best, "requests_per_second": count / best if best else 0.0}
+            live.close()
+            replay.close()
+    finally:
+        server.stop()
+    return results
@@ -0,0 +1,65 @@
+"""
+Concurrent batches of API requests for the table-driven API steps.
+
+A batch is a list of (method, endpoint, body) rows, from a Gherkin table or
+a fixture file. Rows are sent through the scenario's shared HTTP session
+from a thread pool, so at most `concurrency` requests are in flight and
+connections are reused from the session's pool (10 per host, see
+environment.py). Every request is timed on its own; results come back in
+row order.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 10
+REQUEST_FIELDS = ("method", "endpoint", "body")
+
+
+class RequestResult:
+    """Outcome of one request of a batch"""
+
+    __slots__ = ("index", "method", "endpoint", "status_code", "latency", "error")
+
+    def __init__(self, index, method, endpoint, status_code=None, latency=0.0, error=None):
+        self.index = index
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.latency = latency
+        self.error = error
+
+    def __repr__(self):
+        outcome = self.error or self.status_code
+        return f"<{self.method} {self.endpoint} -> {outcome} in {self.latency * 1000:.1f} ms>"
+
+
+def parse_request_rows(rows):
+    """Normalize table rows or fixture records to (method, endpoint, body) tuples.
+    A body may be JSON text (table cells, CSV) or already decoded (JSON lines)."""
+    batch = []
+    for row in rows:
+        body = row.get("body") or None
+        if isinstance(body, str):
+            body = json.loads(body)
+        batch.append((row["method"].strip().upper(), row["endpoint"].strip(), body))
+    return batch
+
+
+def send_concurrently(session, base_url, headers, batch, concurrency=DEFAULT_CONCURRENCY, timeout=None):
+    """Send every (method, endpoint, body) of batch with at most `concurrency` in flight"""
+
+    def send(item):
+        index, (method, endpoint, body) = item
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + endpoint, headers=headers, json=body, timeout=timeout)
+            return RequestResult(index, method, endpoint, response.status_code, time.perf_counter() - started)
+        except Exception as error:
+            return RequestResult(index, method, endpoint, latency=time.perf_counter() - started,
+                                 error=f"{type(error).__name__}: {error}")
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="api-batch") as pool:
+        return list(pool.map(send, enumerate(batch)))
+
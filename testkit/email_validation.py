@@ -0,0 +1,81 @@
+"""
+Email address validation with a precompiled pattern, plus a generator of
+synthetic valid/invalid addresses for volume tests.
+"""
+
+import random
+import re
+import string
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# The anchored pattern string the steps used to pass to re.match, kept for benchmarking
+LEGACY_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+
+_LOCAL_CHARS = string.ascii_lowercase + string.digits + "._%+-"
+_DOMAIN_CHARS = string.ascii_lowercase + string.digits + "-"
+
+
+def is_valid_email(email):
+    """Validate a single address"""
+    return EMAIL_PATTERN.fullmatch(email) is not None
+
+
+def validate_emails(emails):
+    """is_valid_email for every address of a column, returning a list of bools.
+
+    Not deduplicated: on columns of mostly distinct addresses (fixtures,
+    generated data) hashing each address into a dict costs more than the
+    match it would save."""
+    fullmatch = EMAIL_PATTERN.fullmatch
+    return [fullmatch(email) is not None for email in emails]
+
+
+def _random_word(rng, chars, low, high):
+    return "".join(rng.choice(chars) for _ in range(rng.randint(low, high)))
+
+
+def _valid_email(rng):
+    local = rng.choice(string.ascii_lowercase) + _random_word(rng, _LOCAL_CHARS, 0, 12)
+    domain = rng.choice(string.ascii_lowercase) + _random_word(rng, _DOMAIN_CHARS, 1, 10)
+    tld = _random_word(rng, string.ascii_lowercase, 2, 6)
+    return f"{local}@{domain}.{tld}"
+
+
+# Each mutation turns a valid address into an invalid one
+_INVALID_MUTATIONS = (
+    lambda email, rng: email.replace("@", ""),
+    lambda email, rng: email[email.index("@"):],
+    lambda email, rng: email[:email.index("@") + 1],
+    lambda email, rng: email.rsplit(".", 1)[0] + "." + rng.choice(string.ascii_lowercase),
+    lambda email, rng: email.replace("@", " @", 1),
+    lambda email, rng: email.replace("@", "@@", 1),
+    lambda email, rng: email + "\n",
+    lambda email, rng: email.rsplit(".", 1)[0] + ".c0m",
+)
+
+
+def generate_emails(count, invalid_ratio=0.5, seed=0):
+    """Yield (email, expected_valid) pairs; deterministic for a given seed"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        email = _valid_email(rng)
+        if rng.random() < invalid_ratio:
+            yield rng.choice(_INVALID_MUTATIONS)(email, rng), False
+        else:
+            yield email, True
+
+
+def benchmark(count=100000, repeat=3, seed=0):
+    """Measure emails per second for the legacy, per-address and column validation (best of repeat)"""
+    from testkit.benchmarks import timed
+
+    emails = [email for email, _ in generate_emails(count, seed=seed)]
+    results = {}
+    for name, run in (
+        ("legacy", lambda: [bool(re.match(LEGACY_PATTERN, email)) for email in emails]),
+        ("single", lambda: [is_valid_email(email) for email in emails]),
+        ("column", lambda: validate_emails(emails)),
+    ):
+        best = min(timed(run) for _ in range(repeat))
+        results[name] = {"seconds": best, "emails_per_second": count / best if best else 0.0}
+    return results
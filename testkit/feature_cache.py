@@ -0,0 +1,300 @@
+"""
+Cache of parsed feature files and resolved step matches.
+
+features/environment.py calls install() when behave loads it, which is
+before behave parses the feature files, so every behave process (normal
+runs, shards, dry runs) picks the cache up:
+
+    - behave.parser.parse_file is wrapped so parsed Feature models are
+      pickled under .behave-cache/features/. An entry is reused while the
+      file's mtime and size are unchanged; otherwise the content hash decides,
+      so touching or checking out a file does not force a re-parse.
+    - StepRegistry.find_match remembers which step definition matched
+      each (step type, step text) pair. A cached definition is still matched
+      against the step (cheap) instead of scanning every definition. The
+      match cache is tied to a signature of all registered step patterns and
+      is written back when the process exits.
+
+Set BEHAVE_FEATURE_CACHE=0 to disable it, and BEHAVE_CACHE_DIR to move it.
+`python run_tests.py bench --bench startup` compares time-to-first-scenario
+without the cache, with a cold cache and with a warm one.
+"""
+
+import atexit
+import copyreg
+import hashlib
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from behave.formatter.base import Formatter
+from behave.model import Tag
+
+CACHE_DIR = Path(".behave-cache")
+CACHE_VERSION = 1
+
+
+def _reduce_tag(tag):
+    return tag.__class__, (str(tag), tag.line)
+
+
+# behave's Tag is a str subclass whose __new__ also takes the line; the default
+# pickling calls __new__ without it, so tagged features could be stored but not loaded
+copyreg.pickle(Tag, _reduce_tag)
+
+
+def cache_dir():
+    return Path(os.environ.get("BEHAVE_CACHE_DIR", CACHE_DIR))
+
+
+def _entry_path(directory, filename):
+    key = hashlib.blake2b(os.path.abspath(filename).encode("utf-8"), digest_size=12).hexdigest()
+    return directory / "features" / f"{key}.pickle"
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp, path)
+
+
+class FeatureCache:
+    """Parsed Feature models pickled per file"""
+
+    def __init__(self, directory=None, parse=None):
+        from behave import parser
+
+        self.directory = Path(directory) if directory else cache_dir()
+        self.parse = parse or parser.parse_file
+        self.hits = 0
+        self.misses = 0
+
+    def parse_file(self, filename, language=None):
+        """Drop-in replacement for behave.parser.parse_file"""
+        stat = os.stat(filename)
+        entry_path = _entry_path(self.directory, filename)
+        entry = None
+        try:
+            with open(entry_path, "rb") as entry_file:
+                entry = pickle.load(entry_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+            pass
+
+        content_hash = None
+        if entry is not None and entry["version"] == CACHE_VERSION and entry["language"] == language:
+            if (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                self.hits += 1
+                return entry["feature"]
+            content_hash = self._hash(filename)
+            if content_hash == entry["sha"]:
+                self.hits += 1
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_atomic(entry_path, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+                return entry["feature"]
+
+        self.misses += 1
+        feature = self.parse(filename, language=language)
+        entry = {
+            "version": CACHE_VERSION,
+            "language": language,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha": content_hash or self._hash(filename),
+            "feature": feature,
+        }
+        try:
+            _write_atomic(entry_path, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        except (OSError, pickle.PicklingError, TypeError):
+            pass
+        return feature
+
+    @staticmethod
+    def _hash(filename):
+        with open(filename, "rb") as feature_file:
+            return hashlib.blake2b(feature_file.read(), digest_size=16).hexdigest()
+
+
+class StepMatchCache:
+    """Remembers the index of the step definition that matched a step text"""
+
+    def __init__(self, find_match, directory=None):
+        self.find_match = find_match
+        self.registry = None
+        self.path = (Path(directory) if directory else cache_dir()) / "step-matches.pickle"
+        self.layout = None
+        self.signature = None
+        self.matches = {}
+        self.dirty = False
+        self.stored = {}
+        try:
+            with open(self.path, "rb") as cache_file:
+                self.stored = pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+    def _candidates(self, step_type):
+        candidates = self.registry.steps[step_type]
+        more_steps = self.registry.steps["step"]
+        if step_type != "step" and more_steps:
+            candidates = list(candidates) + more_steps
+        return candidates
+
+    def _check_registry(self):
+        """Recompute the signature when step definitions were added or replaced"""
+        layout = tuple((id(definitions), len(definitions)) for definitions in self.registry.steps.values())
+        if layout == self.layout:
+            return
+        self.layout = layout
+        parts = []
+        for step_type, definitions in sorted(self.registry.steps.items()):
+            for definition in definitions:
+                parts.append(f"{step_type}|{definition.pattern}|{definition.location}")
+        signature = hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+        if signature != self.signature:
+            self.signature = signature
+            self.matches = dict(self.stored.get(signature, {}))
+
+    def cached_find_match(self, registry, step):
+        """Drop-in replacement for StepRegistry.find_match; only the first
+        registry that is asked is cached (behave runs with a single one)"""
+        if self.registry is None:
+            self.registry = registry
+        elif registry is not self.registry:
+            return self.find_match(registry, step)
+        self._check_registry()
+        key = (step.step_type, step.name)
+        index = self.matches.get(key)
+        if index is not None:
+            candidates = self._candidates(step.step_type)
+            if index < 0:
+                return None
+            if index < len(candidates):
+                result = candidates[index].match(step.name)
+                if result:
+                    return result
+
+        result = self.find_match(registry, step)
+        index = -1
+        if result is not None:
+            for position, definition in enumerate(self._candidates(step.step_type)):
+                if definition.func is result.func:
+                    index = position
+                    break
+        self.matches[key] = index
+        self.dirty = True
+        return result
+
+    def save(self):
+        if not self.dirty or self.signature is None:
+            return
+        # Keep only the current registry layout; others belong to older step code
+        data = {self.signature: self.matches}
+        try:
+            _write_atomic(self.path, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+        self.dirty = False
+
+
+_installed = None
+
+
+def install():
+    """Route behave's feature parsing and step matching through the caches (once per process)"""
+    global _installed
+    if _installed is not None or os.environ.get("BEHAVE_FEATURE_CACHE") == "0":
+        return _installed
+    from behave import parser
+    from behave.step_registry import StepRegistry
+
+    feature_cache = FeatureCache()
+    parser.parse_file = feature_cache.parse_file
+    # Patched on the class: behave.runner holds its own reference to the registry
+    match_cache = StepMatchCache(StepRegistry.find_match, feature_cache.directory)
+
+    def find_match(registry, step):
+        return match_cache.cached_find_match(registry, step)
+
+    StepRegistry.find_match = find_match
+    atexit.register(match_cache.save)
+    _installed = (feature_cache, match_cache)
+    return _installed
+
+
+def parse_file(filename, language=None):
+    """Parse a feature file through the cache (used by the runner outside behave)"""
+    return FeatureCache().parse_file(filename, language=language)
+
+
+class StartupProbeFormatter(Formatter):
+    """Writes the seconds from BEHAVE_STARTUP_T0 to the first scenario"""
+
+    name = "startup-probe"
+    description = "Time to first scenario"
+
+    def __init__(self, stream_opener, config):
+        super().__init__(stream_opener, config)
+        self.reported = False
+
+    def scenario(self, scenario):
+        if self.reported:
+            return
+        self.reported = True
+        elapsed = time.time() - float(os.environ["BEHAVE_STARTUP_T0"])
+        stream = self.open()
+        stream.write(f"{elapsed:.6f}\n")
+        stream.flush()
+
+
+def _build_corpus(root, copies):
+    """Copy features/ (environment, steps and fixtures) with every feature file repeated"""
+    target = Path(root) / "features"
+    shutil.copytree("features", target, ignore=shutil.ignore_patterns("*.feature", "generated", "__pycache__"))
+    for feature_file in sorted(Path("features").glob("*.feature")):
+        text = feature_file.read_text(encoding="utf-8")
+        for copy in range(copies):
+            (target / f"{feature_file.stem}_{copy:04d}.feature").write_text(text, encoding="utf-8")
+    return target
+
+
+def _time_to_first_scenario(features_dir, cache, enabled):
+    probe = Path(cache).parent / "probe.txt"
+    # PYTHONPATH lets the copied environment.py import testkit from this checkout
+    env = dict(os.environ, BEHAVE_CACHE_DIR=str(cache), BEHAVE_FEATURE_CACHE="1" if enabled else "0",
+               PYTHONPATH=os.pathsep.join(filter(None, (os.getcwd(), os.environ.get("PYTHONPATH")))),
+               BEHAVE_STARTUP_T0=repr(time.time()))
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "behave", "--dry-run", "--no-summary", "--no-snippets",
+         "--format=testkit.feature_cache:StartupProbeFormatter", f"--outfile={probe}", str(features_dir)],
+        cwd=Path(features_dir).parent, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+    )
+    total = time.perf_counter() - started
+    first = float(probe.read_text(encoding="utf-8").strip() or "nan") if probe.exists() else float("nan")
+    return first, total
+
+
+def benchmark(copies=100, repeat=3):
+    """Time-to-first-scenario and total dry-run time with no cache, a cold and a warm cache.
+    The corpus is features/ with every feature file repeated `copies` times."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        features_dir = _build_corpus(tmp, copies)
+        cache = Path(tmp) / "cache"
+        samples = {"no-cache": [], "cold": [], "warm": []}
+        for _ in range(repeat):
+            samples["no-cache"].append(_time_to_first_scenario(features_dir, cache, enabled=False))
+            shutil.rmtree(cache, ignore_errors=True)
+            samples["cold"].append(_time_to_first_scenario(features_dir, cache, enabled=True))
+            samples["warm"].append(_time_to_first_scenario(features_dir, cache, enabled=True))
+        for name, runs in samples.items():
+            first, total = min(runs, key=lambda run: run[1])
+            results[name] = {"seconds": total, "first_scenario_ms": first * 1000}
+    return results
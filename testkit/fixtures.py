@@ -0,0 +1,113 @@
+"""
+Streaming readers for user fixture files (JSON lines or CSV, optionally gzipped).
+Files are read one record at a time and handed out in validated batches, so
+memory use does not depend on the size of the file.
+"""
+
+import csv
+import gzip
+import json
+from pathlib import Path
+
+from testkit.email_validation import validate_emails
+
+DEFAULT_BATCH_SIZE = 1000
+USER_FIELDS = ("email", "name", "role")
+FEATURES_DIR = Path(__file__).resolve().parents[1] / "features"
+
+
+def resolve_fixture_path(path):
+    """Resolve fixture paths used in steps relative to the features directory"""
+    path = Path(path)
+    return path if path.is_absolute() else FEATURES_DIR / path
+
+
+def _open_text(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _fixture_format(path):
+    suffixes = Path(str(path).replace(".gz", "")).suffixes
+    return suffixes[-1].lstrip(".") if suffixes else ""
+
+
+def iter_fixture_records(path):
+    """Yield one dict per user record of a .jsonl or .csv fixture file"""
+    kind = _fixture_format(path)
+    with _open_text(path) as fixture:
+        if kind in ("jsonl", "ndjson"):
+            for line in fixture:
+                if line.strip():
+                    yield json.loads(line)
+        elif kind == "csv":
+            yield from csv.DictReader(fixture)
+        else:
+            raise ValueError(f"Unsupported fixture format: {path}")
+
+
+def batched(records, size=DEFAULT_BATCH_SIZE):
+    """Group an iterable into lists of at most size items"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class LoadStats:
+    """Counts of accepted and rejected fixture rows"""
+
+    def __init__(self):
+        self.loaded = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def __repr__(self):
+        return f"<LoadStats loaded={self.loaded} rejected={self.rejected} batches={self.batches}>"
+
+
+def iter_valid_user_batches(path, stats, batch_size=DEFAULT_BATCH_SIZE, exists=None):
+    """Yield batches of valid user dicts; invalid emails and duplicates count as rejected.
+    `exists` is an optional callable telling whether an email is already known."""
+    for batch in batched(iter_fixture_records(path), batch_size):
+        emails = [record.get("email") or "" for record in batch]
+        # Only duplicates inside the batch are tracked here, to keep memory flat;
+        # earlier batches are covered by `exists` once they have been stored
+        seen = set()
+        valid = []
+        for record, email, ok in zip(batch, emails, validate_emails(emails)):
+            if not ok or email in seen or (exists is not None and exists(email)):
+                stats.rejected += 1
+                continue
+            seen.add(email)
+            valid.append({key: record[key] for key in USER_FIELDS if record.get(key)})
+        stats.loaded += len(valid)
+        stats.batches += 1
+        if valid:
+            yield valid
+
+
+def write_generated_fixture(path, count, role="user"):
+    """Write a fixture file with count unique users, streaming row by row"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tenant = path.stem
+    rows = (
+        {"email": f"user{i}@{tenant}.example.com", "name": f"Tenant User {i}", "role": role}
+        for i in range(count)
+    )
+    kind = _fixture_format(path)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8", newline="") as fixture:
+        if kind == "csv":
+            writer = csv.DictWriter(fixture, fieldnames=USER_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            fixture.writelines(json.dumps(row) + "\n" for row in rows)
+    return path
@@ -0,0 +1,53 @@
+"""
+The pooled HTTP session shared by the API steps, created on first use.
+
+Importing requests (and urllib3, http.client, ssl, ...) costs about 100 ms,
+which runs that only exercise user_management.feature never need to pay.
+"""
+
+import threading
+
+POOL_SIZE = 10
+
+
+def new_session(pool_size=POOL_SIZE):
+    """requests.Session with a connection pool of pool_size per host"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return session
+
+
+class LazySession:
+    """Stands in for a requests.Session and creates it on the first request"""
+
+    def __init__(self, factory=new_session):
+        self._factory = factory
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            # Concurrent request steps may race for the first request
+            with self._lock:
+                if self._session is None:
+                    self._session = self._factory()
+        return self._session
+
+    @property
+    def created(self):
+        return self._session is not None
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
@@ -0,0 +1,114 @@
+"""
+Start-up import cost of the runner and of a behave process, for
+`python run_tests.py imports`.
+
+Every behave process (each parallel shard, each perf-check run) pays for its
+imports before the first scenario starts: behave itself, environment.py,
+the testkit modules it pulls in and the step modules. That cost is measured
+with `python -X importtime -m behave --dry-run`, which loads the hooks and
+step modules like a real run but executes no steps, so imports deferred to a
+step body are not counted. run_tests.py is measured the same way with its
+help command; it imports testkit modules only inside the commands that use
+them, so its start-up stays small and works before behave is installed.
+
+Each measurement is taken `runs` times and the run with the lowest total is
+kept, since import time only ever gets slower through noise. The report
+lists the total, the cost per top-level package and the slowest modules by
+cumulative time, and the check fails when a total exceeds its budget.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPORT_PATH = Path("test-reports") / "import-time.json"
+DEFAULT_BUDGET_MS = 400.0
+DEFAULT_RUNNER_BUDGET_MS = 100.0
+DEFAULT_RUNS = 3
+TOP_MODULES = 15
+
+
+def parse_importtime(text):
+    """Entries of `-X importtime` output as dicts of name, depth, self_us and cumulative_us"""
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|", 2)
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The "self [us] | cumulative | imported package" header
+            continue
+        name = fields[2].rstrip()
+        # One space separates the column from the name, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append({
+            "name": name.strip(),
+            "depth": depth,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+        })
+    return entries
+
+
+def behave_command(paths=()):
+    return [sys.executable, "-X", "importtime", "-m", "behave", "--dry-run", "--format=null", *paths]
+
+
+def runner_command(runner="run_tests.py"):
+    return [sys.executable, "-X", "importtime", runner, "help"]
+
+
+def measure_once(command):
+    result = subprocess.run(command, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return parse_importtime(result.stderr)
+
+
+def total_us(entries):
+    return sum(entry["self_us"] for entry in entries)
+
+
+def measure(command, runs=DEFAULT_RUNS):
+    """Import entries of the fastest of `runs` start-ups of command"""
+    best = None
+    for _ in range(max(1, runs)):
+        entries = measure_once(command)
+        if best is None or total_us(entries) < total_us(best):
+            best = entries
+    return best or []
+
+
+def summarize(entries, top=TOP_MODULES):
+    packages = {}
+    for entry in entries:
+        package = entry["name"].split(".", 1)[0]
+        packages[package] = packages.get(package, 0) + entry["self_us"]
+    slowest = sorted(entries, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us(entries) / 1000, 3),
+        "modules": len(entries),
+        "packages": {package: round(us / 1000, 3)
+                     for package, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)},
+        "slowest": [{"name": entry["name"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 3),
+                     "self_ms": round(entry["self_us"] / 1000, 3)} for entry in slowest],
+    }
+
+
+def format_summary(summary, budget_ms, title="Start-up imports", packages=10):
+    lines = [f"{title}: {summary['total_ms']:.1f} ms for {summary['modules']} modules "
+             f"(budget {budget_ms:g} ms)", "", "By package:"]
+    for package, ms in list(summary["packages"].items())[:packages]:
+        lines.append(f"  {ms:8.1f} ms  {package}")
+    lines += ["", "Slowest modules (cumulative):"]
+    for entry in summary["slowest"]:
+        lines.append(f"  {entry['cumulative_ms']:8.1f} ms  {entry['name']}")
+    return "\n".join(lines)
+
+
+def write_report(results, path=REPORT_PATH):
+    """Write {"behave": ..., "runner": ...}, each a summary with its budget_ms"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {"python": sys.version.split()[0], **results}
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
@@ -0,0 +1,262 @@
+"""
+Replay the When-steps of API scenarios as a load test.
+Each virtual user walks through every scenario's requests in a loop with its
+own pooled session, and latencies are aggregated per endpoint.
+
+A scenario that starts from 'a user with ID "N" exists' gets a user of its
+own on every pass: the virtual user creates it first, sends the scenario's
+requests to its id instead of N and deletes it afterwards, so one user's
+DELETE never turns the others' requests into 404s. These set-up requests
+are not measured. An endpoint whose responses mostly have a status other
+than the scenario expects is flagged: its latencies are those of the error
+path, not of the endpoint.
+"""
+
+import json
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_FEATURE = "features/api_integration.feature"
+INVALID_API_KEY = "invalid-api-key"
+
+# Step text patterns mirrored from features/steps/api_integration_steps.py
+REQUEST_STEPS = [
+    ('I send a GET request to "{endpoint}"', "GET"),
+    ('I send a POST request to "{endpoint}" with the following data', "POST"),
+    ('I send a PUT request to "{endpoint}" with updated name "{new_name}"', "PUT"),
+    ('I send a DELETE request to "{endpoint}"', "DELETE"),
+]
+EXPECTED_STATUS_STEP = "the response status should be {status_code:d}"
+INVALID_KEY_STEP = "I have an invalid API key"
+EXISTING_USER_STEP = 'a user with ID "{user_id:d}" exists'
+USERS_ENDPOINT = "/api/users"
+NUMERIC_ID = re.compile(r"/\d+")
+# Share of an endpoint's responses with an unexpected status above which it is flagged
+UNEXPECTED_LIMIT = 0.5
+
+
+class LoadRequest:
+    """One request of the load profile, derived from a scenario's When-step"""
+
+    __slots__ = ("scenario", "method", "endpoint", "body", "invalid_key", "expected_status", "user_id")
+
+    def __init__(self, scenario, method, endpoint, body=None, invalid_key=False, expected_status=None,
+                 user_id=None):
+        self.scenario = scenario
+        self.method = method
+        self.endpoint = endpoint
+        self.body = body
+        self.invalid_key = invalid_key
+        self.expected_status = expected_status
+        # Set when the endpoint addresses the user a Given-step says exists
+        self.user_id = user_id
+
+    def target(self, user_id=None):
+        """Endpoint with the scenario's user id replaced by the one created for this pass"""
+        if user_id is None or self.user_id is None:
+            return self.endpoint
+        return self.endpoint.replace(f"{USERS_ENDPOINT}/{self.user_id}", f"{USERS_ENDPOINT}/{user_id}", 1)
+
+    @property
+    def label(self):
+        """Endpoint label with numeric IDs collapsed, e.g. "PUT /api/users/{id}" """
+        return f"{self.method} {NUMERIC_ID.sub('/{id}', self.endpoint)}"
+
+
+def build_profile(feature_file=DEFAULT_FEATURE):
+    """Turn every scenario of a feature file into a list of LoadRequests"""
+    from behave.parser import parse_file
+    from parse import parse
+
+    profile = []
+    feature = parse_file(feature_file)
+    for scenario in feature.walk_scenarios():
+        steps = list(scenario.steps)
+        invalid_key = any(step.name == INVALID_KEY_STEP for step in steps)
+        expected = [parse(EXPECTED_STATUS_STEP, step.name) for step in steps if step.step_type == "then"]
+        expected_status = next((match["status_code"] for match in expected if match), None)
+        existing = [parse(EXISTING_USER_STEP, step.name) for step in steps if step.step_type == "given"]
+        existing_ids = {match["user_id"] for match in existing if match}
+
+        for step in steps:
+            if step.step_type != "when":
+                continue
+            for pattern, method in REQUEST_STEPS:
+                match = parse(pattern, step.name)
+                if not match:
+                    continue
+                body = None
+                if method == "POST" and step.table:
+                    body = {row["Field"]: row["Value"] for row in step.table}
+                elif method == "PUT":
+                    body = {"name": match["new_name"]}
+                endpoint = match["endpoint"]
+                user_id = next((user_id for user_id in existing_ids
+                                if endpoint.startswith(f"{USERS_ENDPOINT}/{user_id}")), None)
+                profile.append(LoadRequest(scenario.name, method, endpoint, body, invalid_key, expected_status,
+                                           user_id))
+                break
+    return profile
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """Thread-safe per-endpoint latency and error collector"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, label, seconds, error, unexpected):
+        with self.lock:
+            entry = self.samples.setdefault(label, {"latencies": [], "errors": 0, "unexpected_status": 0})
+            entry["latencies"].append(seconds)
+            entry["errors"] += error
+            entry["unexpected_status"] += unexpected
+
+    def report(self, elapsed):
+        """Summarize throughput, latency percentiles and error rate per endpoint"""
+        endpoints = {}
+        total_requests = total_errors = 0
+        for label, entry in sorted(self.samples.items()):
+            latencies = sorted(entry["latencies"])
+            count = len(latencies)
+            total_requests += count
+            total_errors += entry["errors"]
+            endpoints[label] = {
+                "requests": count,
+                "throughput_rps": count / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+                "error_rate": entry["errors"] / count if count else 0.0,
+                "unexpected_status": entry["unexpected_status"],
+                "unexpected_rate": entry["unexpected_status"] / count if count else 0.0,
+            }
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": total_requests,
+            "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+            "error_rate": total_errors / total_requests if total_requests else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def scenario_passes(profile):
+    """Group the profile into consecutive (scenario, requests) runs"""
+    passes = []
+    for request in profile:
+        if not passes or passes[-1][0] != request.scenario:
+            passes.append((request.scenario, []))
+        passes[-1][1].append(request)
+    return passes
+
+
+def virtual_user(profile, base_url, api_key, stats, deadline, iterations, timeout, number=0):
+    """Loop over the profile until the deadline or iteration count is reached"""
+    import requests
+
+    session = requests.Session()
+    valid_headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    passes = scenario_passes(profile)
+    created = 0
+    try:
+        iteration = 0
+        while (iterations is None or iteration < iterations) and (deadline is None or time.monotonic() < deadline):
+            for scenario, requests_of_scenario in passes:
+                user_id = None
+                if any(request.user_id is not None for request in requests_of_scenario):
+                    created += 1
+                    user = {"email": f"load-{number}-{created}@example.com", "name": f"Load User {number}"}
+                    try:
+                        response = session.post(base_url + USERS_ENDPOINT, headers=valid_headers, json=user,
+                                                timeout=timeout)
+                        user_id = response.json()["id"]
+                    except (requests.RequestException, ValueError, KeyError, TypeError):
+                        # Measured against the scenario's own id; the unexpected statuses will show it
+                        user_id = None
+                for request in requests_of_scenario:
+                    key = INVALID_API_KEY if request.invalid_key else api_key
+                    headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+                    started = time.perf_counter()
+                    try:
+                        response = session.request(request.method, base_url + request.target(user_id),
+                                                   headers=headers, json=request.body, timeout=timeout)
+                        status = response.status_code
+                    except requests.RequestException:
+                        stats.add(request.label, time.perf_counter() - started, 1, 0)
+                        continue
+                    elapsed = time.perf_counter() - started
+                    unexpected = request.expected_status is not None and status != request.expected_status
+                    stats.add(request.label, elapsed, int(status >= 500), int(unexpected))
+                if user_id is not None:
+                    try:
+                        session.delete(f"{base_url}{USERS_ENDPOINT}/{user_id}", headers=valid_headers,
+                                       timeout=timeout)
+                    except requests.RequestException:
+                        pass
+            iteration += 1
+    finally:
+        session.close()
+
+
+def run_load(profile, base_url, api_key, users=10, duration=None, iterations=None, timeout=30):
+    """Run the profile with concurrent virtual users and return the report dict"""
+    stats = LoadStats()
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        futures = [pool.submit(virtual_user, profile, base_url, api_key, stats, deadline, iterations, timeout, number)
+                   for number in range(users)]
+        for future in futures:
+            future.result()
+    report = stats.report(time.monotonic() - started)
+    report.update({"base_url": base_url, "users": users, "duration": duration, "iterations": iterations})
+    return report
+
+
+def format_summary(report):
+    """Render the load report as a fixed-width text table"""
+    lines = [
+        f"Load test against {report['base_url']} with {report['users']} virtual user(s)",
+        f"{report['requests']} requests in {report['elapsed_seconds']:.2f}s "
+        f"({report['throughput_rps']:.1f} req/s), error rate {report['error_rate']:.2%}",
+        "",
+        f"{'Endpoint':<28}{'Requests':>10}{'Req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Errors':>9}{'Unexp.':>8}",
+    ]
+    for label, entry in report["endpoints"].items():
+        lines.append(
+            f"{label:<28}{entry['requests']:>10}{entry['throughput_rps']:>10.1f}{entry['p50_ms']:>10.2f}"
+            f"{entry['p95_ms']:>10.2f}{entry['p99_ms']:>10.2f}{entry['error_rate']:>9.2%}{entry['unexpected_status']:>8}"
+        )
+    suspect = suspect_endpoints(report)
+    if suspect:
+        lines += ["", f"Mostly unexpected statuses (over {UNEXPECTED_LIMIT:.0%}), latencies are of the error path:"]
+        lines += [f"  {label}" for label in suspect]
+    return "\n".join(lines) + "\n"
+
+
+def suspect_endpoints(report, limit=UNEXPECTED_LIMIT):
+    """Endpoints whose responses mostly had a status the scenario did not expect"""
+    return [label for label, entry in report["endpoints"].items() if entry["unexpected_rate"] > limit]
+
+
+def write_report(report, reports_dir="test-reports", name="load-report"):
+    """Write the JSON report and text summary, returning the summary text"""
+    reports_dir = Path(reports_dir)
+    (reports_dir / f"{name}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    summary = format_summary(report)
+    (reports_dir / f"{name}.txt").write_text(summary, encoding="utf-8")
+    return summary
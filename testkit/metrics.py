@@ -0,0 +1,258 @@
+"""
+Suite metrics in the OpenMetrics text format, fed by the environment hooks.
+
+    behave_scenarios_total{feature,status}                 finished scenarios
+    behave_steps_total{feature,status}                     executed steps
+    behave_scenario_duration_seconds{feature,tag}          histogram
+    behave_feature_duration_seconds{feature,tag}           histogram
+    behave_step_duration_seconds{feature,tag}              histogram
+    behave_stub_request_duration_seconds{method,route,status}
+                                                           stub server latency
+A scenario or step is observed once per tag it carries (tag="" without
+tags), so per-tag series add up to more than the suite; sum over the
+feature label of one tag, or use the counters, for suite totals.
+
+The file (test-reports/metrics.txt, or BEHAVE_METRICS_FILE) is rewritten
+after every feature and at the end of the run. With BEHAVE_METRICS_PORT the
+same text is served at http://localhost:<port>/metrics while the run lasts.
+Parallel shards each write their own file and merge_files() adds them up.
+"""
+
+import bisect
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_METRICS_FILE = Path("test-reports") / "metrics.txt"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}_total{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS, unit="seconds"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.unit = unit
+        self.values = {}
+
+    def observe(self, value, *labels):
+        series = self.values.get(labels)
+        if series is None:
+            # One count per bucket plus +Inf, then the sum
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        bounds = [f'le="{float(bound)!r}"' for bound in self.buckets] + ['le="+Inf"']
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, bound)} {cumulative}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+
+
+class MetricsRegistry:
+    """Metric families rendered together; safe to update from several threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self.families.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.families.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric in self.families:
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                if getattr(metric, "unit", None):
+                    lines.append(f"# UNIT {metric.name} {metric.unit}")
+                lines.append(f"# HELP {metric.name} {metric.documentation}")
+                lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Replace the file atomically so a scraper never reads half of it"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".tmp")
+        partial.write_text(self.render(), encoding="utf-8")
+        os.replace(partial, path)
+        return path
+
+
+def route_label(path):
+    """Collapse ids so the stub server's routes stay a small label set"""
+    return "/" + "/".join("{id}" if part.isdigit() else part for part in path.split("/") if part)
+
+
+class SuiteMetrics:
+    """The suite's metric families and the hook-side helpers that update them"""
+
+    def __init__(self, path=DEFAULT_METRICS_FILE):
+        self.path = Path(path)
+        self.registry = MetricsRegistry()
+        self.scenarios = self.registry.counter(
+            "behave_scenarios", "Finished scenarios by final status", ("feature", "status"))
+        self.steps = self.registry.counter(
+            "behave_steps", "Executed steps by status", ("feature", "status"))
+        self.scenario_seconds = self.registry.histogram(
+            "behave_scenario_duration_seconds", "Scenario duration", ("feature", "tag"))
+        self.feature_seconds = self.registry.histogram(
+            "behave_feature_duration_seconds", "Feature duration", ("feature", "tag"))
+        self.step_seconds = self.registry.histogram(
+            "behave_step_duration_seconds", "Step duration", ("feature", "tag"))
+        self.request_seconds = self.registry.histogram(
+            "behave_stub_request_duration_seconds", "Stub API server request handling time",
+            ("method", "route", "status"), REQUEST_BUCKETS)
+
+    def _observe_tagged(self, histogram, seconds, feature, tags):
+        with self.registry.lock:
+            for tag in sorted(tags) or [""]:
+                histogram.observe(seconds, feature, tag)
+
+    def scenario(self, scenario, status, seconds):
+        feature = scenario.feature.filename
+        with self.registry.lock:
+            self.scenarios.inc(feature, status)
+        self._observe_tagged(self.scenario_seconds, seconds, feature, scenario.effective_tags)
+
+    def step(self, scenario, step, seconds):
+        feature = scenario.feature.filename
+        with self.registry.lock:
+            self.steps.inc(feature, step.status.name)
+        self._observe_tagged(self.step_seconds, seconds, feature, scenario.effective_tags)
+
+    def feature(self, feature, seconds):
+        self._observe_tagged(self.feature_seconds, seconds, feature.filename, feature.tags)
+
+    def stub_request(self, method, path, status, seconds):
+        """Request observer for StubApiServer; called on the server thread"""
+        with self.registry.lock:
+            self.request_seconds.observe(seconds, method, route_label(path), str(status))
+
+    def write(self):
+        return self.registry.write(self.path)
+
+
+class MetricsServer:
+    """Serves the registry at /metrics from a daemon thread"""
+
+    def __init__(self, registry, port, host="localhost"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def merge_files(paths, output_file):
+    """Add up the counters and histograms of several metrics files (one per shard)"""
+    families = {}
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        family = None
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line == "# EOF" or not line:
+                continue
+            if line.startswith("#"):
+                _, keyword, name = line.split(" ", 3)[:3]
+                family = families.setdefault(name, {"meta": {}, "samples": {}})
+                family["meta"].setdefault(keyword, line)
+                continue
+            series, _, value = line.rpartition(" ")
+            number = int(value) if value.lstrip("-").isdigit() else float(value)
+            samples = family["samples"]
+            samples[series] = samples.get(series, 0) + number
+    lines = []
+    for family in families.values():
+        lines.extend(family["meta"].values())
+        lines.extend(f"{series} {_number(value)}" for series, value in family["samples"].items())
+    lines.append("# EOF")
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return output_file
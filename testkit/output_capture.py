@@ -0,0 +1,165 @@
+"""
+Failure-only output capture for the behave suite.
+
+With BEHAVE_CAPTURE=1 (`python run_tests.py <command> --capture`) everything
+printed while a scenario runs (steps, before/after step hooks and the
+scenario hooks) goes to an in-memory buffer instead of the console. The
+buffer is written out only when the scenario fails; passing scenarios leave
+their name and status line. Each buffer keeps the first and the last
+limit/2 characters and counts what it dropped in between, so a chatty loop
+cannot grow it without bound.
+
+behave's own per-step capture is switched off in this mode: it would hold a
+second, unbounded copy of the same output and copy it into the JUnit XML of
+every scenario.
+
+The capture also writes a compact event log, one JSON object per line
+(run start, one line per scenario with its steps and status, run end), to
+test-reports/events.jsonl or BEHAVE_EVENT_LOG. Failed scenarios carry the
+error message and their captured output for post-mortem use.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+DEFAULT_LIMIT = 64 * 1024
+DEFAULT_EVENT_LOG = Path("test-reports") / "events.jsonl"
+ERROR_LIMIT = 2000
+
+
+def enabled():
+    return os.environ.get("BEHAVE_CAPTURE") == "1"
+
+
+class CappedBuffer:
+    """Text stream that keeps the head and tail of what is written to it"""
+
+    def __init__(self, limit=DEFAULT_LIMIT):
+        self.half = max(limit // 2, 1)
+        self.head = []
+        self.head_size = 0
+        self.tail = deque()
+        self.tail_size = 0
+        self.dropped = 0
+        self.written = 0
+
+    def write(self, text):
+        self.written += len(text)
+        if self.head_size < self.half:
+            part = text[:self.half - self.head_size]
+            self.head.append(part)
+            self.head_size += len(part)
+            text = text[len(part):]
+        if not text:
+            return
+        self.tail.append(text)
+        self.tail_size += len(text)
+        while self.tail_size > self.half:
+            excess = self.tail_size - self.half
+            oldest = self.tail[0]
+            if len(oldest) <= excess:
+                self.tail.popleft()
+                self.tail_size -= len(oldest)
+                self.dropped += len(oldest)
+            else:
+                self.tail[0] = oldest[excess:]
+                self.tail_size -= excess
+                self.dropped += excess
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def getvalue(self):
+        head = "".join(self.head)
+        tail = "".join(self.tail)
+        if self.dropped:
+            return f"{head}\n... {self.dropped} characters dropped ...\n{tail}"
+        return head + tail
+
+
+def _step_entry(step):
+    return [f"{step.keyword} {step.name}", step.status.name, round(step.duration * 1000, 3)]
+
+
+class OutputCapture:
+    """Buffers the output of each scenario and keeps the event log"""
+
+    def __init__(self, event_log=DEFAULT_EVENT_LOG, limit=DEFAULT_LIMIT):
+        self.limit = limit
+        self.path = Path(event_log)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.events = open(self.path, "w", encoding="utf-8")
+        self.buffer = None
+        self.saved_streams = None
+        self.scenarios = 0
+        self.replayed = 0
+        self.chars_suppressed = 0
+        self._event("run_start", pid=os.getpid())
+
+    def _event(self, event, **fields):
+        fields = {"t": round(time.time(), 3), "event": event, **fields}
+        self.events.write(json.dumps(fields, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def start(self):
+        """Route stdout and stderr to a fresh buffer for the scenario about to run"""
+        if self.buffer is not None:
+            self.stop()
+        self.buffer = CappedBuffer(self.limit)
+        self.saved_streams = (sys.stdout, sys.stderr)
+        sys.stdout = sys.stderr = self.buffer
+
+    def stop(self):
+        """Restore the console streams and return the buffer"""
+        buffer = self.buffer
+        if buffer is not None:
+            sys.stdout, sys.stderr = self.saved_streams
+            self.buffer = None
+            self.saved_streams = None
+        return buffer
+
+    def finish(self, scenario, location, seconds):
+        """End the scenario: log it, and print its output if it failed"""
+        buffer = self.stop()
+        if buffer is None:
+            return
+        self.scenarios += 1
+        failed = scenario.status.name in ("failed", "error")
+        fields = {
+            "location": location,
+            "scenario": scenario.name,
+            "status": scenario.status.name,
+            "attempt": getattr(scenario, "attempt", 1),
+            "seconds": round(seconds, 4),
+            "steps": [_step_entry(step) for step in scenario.all_steps if step.status.name != "untested"],
+            "output_chars": buffer.written,
+        }
+        if failed:
+            failing = next((step for step in scenario.all_steps if step.error_message), None)
+            if failing is not None:
+                fields["error"] = failing.error_message[-ERROR_LIMIT:]
+            fields["output"] = buffer.getvalue()
+            fields["dropped_chars"] = buffer.dropped
+            self.replayed += 1
+            output = fields["output"]
+            if output:
+                sys.stdout.write(output if output.endswith("\n") else output + "\n")
+        else:
+            self.chars_suppressed += buffer.written
+        self._event("scenario", **fields)
+
+    def close(self):
+        self.stop()
+        if self.events.closed:
+            return None
+        self._event("run_end", scenarios=self.scenarios, failed_output_shown=self.replayed,
+                    suppressed_chars=self.chars_suppressed)
+        self.events.close()
+        return (f"Captured output: shown for {self.replayed} failed scenario(s), "
+                f"{self.chars_suppressed} characters suppressed; event log {self.path}")
@@ -0,0 +1,159 @@
+"""
+Timing regression gate for `python run_tests.py perf-check`.
+
+The suite is run several times, each run recorded with the JSON lines
+formatter. Every passed scenario, and every step within it, gets the median
+of its durations over the runs and the median absolute deviation (MAD) as
+its noise estimate. Those are compared with perf-baseline.json, which is
+committed to the repository and refreshed with --update-baseline.
+
+A scenario or step regresses when its median grew by more than all of:
+    - threshold x the baseline median (default 50%)
+    - min_delta, so sub-millisecond steps do not trip on timer noise
+    - 3 x the larger scaled MAD of the baseline and the current runs
+Failed scenarios are left out; they are the test run's problem, not a timing.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from testkit.record import read_records
+
+DEFAULT_BASELINE = Path("perf-baseline.json")
+RUNS_DIR = Path("test-reports") / "perf"
+REPORT_PATH = Path("test-reports") / "perf-check.json"
+DEFAULT_RUNS = 5
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_DELTA = 0.010
+NOISE_FACTOR = 3.0
+# Scales the MAD to a standard deviation for normally distributed timings
+MAD_SCALE = 1.4826
+
+
+def scenario_key(record):
+    return f"{record['feature_file']}: {record['scenario']}"
+
+
+def step_key(record, index, step):
+    return f"{scenario_key(record)} #{index + 1} {step['keyword']} {step['name']}"
+
+
+def record_runs(runs, output_dir=RUNS_DIR, paths=()):
+    """Run the suite `runs` times and return the JSON lines record of each run"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    records = []
+    for run in range(1, runs + 1):
+        record_path = output_dir / f"run-{run:02d}.jsonl"
+        record_path.unlink(missing_ok=True)
+        command = [sys.executable, "-m", "behave", "--format=testkit.record:JsonLinesFormatter",
+                   f"--outfile={record_path}", *paths]
+        subprocess.run(command, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if record_path.exists():
+            records.append(record_path)
+        print(f"  run {run}/{runs} recorded")
+    return records
+
+
+def collect_samples(record_paths):
+    """Durations per scenario and per step over several recorded runs; returns (samples, failed scenarios)"""
+    samples = {"scenarios": {}, "steps": {}}
+    failed = set()
+    for record_path in record_paths:
+        for record in read_records(record_path):
+            key = scenario_key(record)
+            if record["status"] != "passed":
+                if record["status"] != "skipped":
+                    failed.add(key)
+                continue
+            samples["scenarios"].setdefault(key, []).append(record["duration"])
+            for index, step in enumerate(record["steps"]):
+                samples["steps"].setdefault(step_key(record, index, step), []).append(step["duration"])
+    return samples, failed
+
+
+def describe(durations):
+    """Median, scaled MAD and sample count of a list of durations"""
+    median = statistics.median(durations)
+    mad = statistics.median(abs(duration - median) for duration in durations)
+    return {"median": round(median, 6), "mad": round(mad * MAD_SCALE, 6), "runs": len(durations)}
+
+
+def summarize_samples(samples):
+    return {kind: {key: describe(durations) for key, durations in sorted(entries.items())}
+            for kind, entries in samples.items()}
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """Return {"regressions", "improvements", "new", "missing"} between two summaries"""
+    result = {"regressions": [], "improvements": [], "new": [], "missing": []}
+    for kind in ("scenarios", "steps"):
+        before = baseline.get(kind, {})
+        after = current.get(kind, {})
+        for key, stats in after.items():
+            reference = before.get(key)
+            if reference is None:
+                result["new"].append({"kind": kind, "key": key})
+                continue
+            allowed = max(threshold * reference["median"], min_delta,
+                          NOISE_FACTOR * max(reference["mad"], stats["mad"]))
+            delta = stats["median"] - reference["median"]
+            entry = {
+                "kind": kind,
+                "key": key,
+                "baseline": reference["median"],
+                "current": stats["median"],
+                "ratio": stats["median"] / reference["median"] if reference["median"] else float("inf"),
+                "allowed": allowed,
+            }
+            if delta > allowed:
+                result["regressions"].append(entry)
+            elif -delta > allowed:
+                result["improvements"].append(entry)
+        result["missing"] += [{"kind": kind, "key": key} for key in before if key not in after]
+    result["regressions"].sort(key=lambda entry: entry["current"] - entry["baseline"], reverse=True)
+    return result
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def write_baseline(summary, runs, path=DEFAULT_BASELINE):
+    baseline = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "runs": runs,
+        **summary,
+    }
+    Path(path).write_text(json.dumps(baseline, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def format_comparison(result, limit=20):
+    lines = []
+    for title, entries in (("Regressions", result["regressions"]), ("Improvements", result["improvements"])):
+        lines.append(f"{title}: {len(entries)}")
+        for entry in entries[:limit]:
+            lines.append(f"  {entry['baseline'] * 1000:9.2f} ms -> {entry['current'] * 1000:9.2f} ms "
+                         f"(x{entry['ratio']:.2f})  [{entry['kind'][:-1]}] {entry['key']}")
+        if len(entries) > limit:
+            lines.append(f"  ... {len(entries) - limit} more")
+    if result["new"]:
+        lines.append(f"Not in baseline: {len(result['new'])}")
+    if result["missing"]:
+        lines.append(f"In baseline but not measured: {len(result['missing'])}")
+    return "\n".join(lines)
+
+
+def write_report(result, path=REPORT_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return path
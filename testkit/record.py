@@ -0,0 +1,77 @@
+"""
+Behave formatter that records a run as JSON lines, one scenario per line.
+Reports in every other format are rendered from this record afterwards
+(see testkit.render), so the suite only has to run once.
+
+Usage:
+    python -m behave --format=testkit.record:JsonLinesFormatter --outfile=test-reports/results.jsonl
+"""
+
+import json
+
+from behave.formatter.base import Formatter
+
+
+def _status_name(status):
+    """Return a plain string for behave's Status enum (or legacy string status)"""
+    return getattr(status, "name", status)
+
+
+def _step_record(step):
+    """Build the JSON-serializable record of a single step"""
+    record = {
+        "keyword": step.keyword,
+        "name": step.name,
+        "status": _status_name(step.status),
+        "duration": step.duration,
+    }
+    if step.error_message:
+        record["error_message"] = step.error_message
+    return record
+
+
+def scenario_record(feature, scenario):
+    """Build the JSON-serializable record of a finished scenario"""
+    return {
+        "feature": feature.name,
+        "feature_file": feature.filename,
+        "scenario": scenario.name,
+        "location": f"{scenario.filename}:{scenario.line}",
+        "tags": list(feature.tags) + list(scenario.tags),
+        "status": _status_name(scenario.status),
+        "duration": scenario.duration,
+        "attempts": getattr(scenario, "attempt", 1),
+        "steps": [_step_record(step) for step in scenario.all_steps],
+    }
+
+
+class JsonLinesFormatter(Formatter):
+    """Write one JSON object per executed scenario"""
+
+    name = "jsonl"
+    description = "JSON lines record of scenario results"
+
+    def __init__(self, stream_opener, config):
+        super().__init__(stream_opener, config)
+        self.current_feature = None
+
+    def feature(self, feature):
+        self.current_feature = feature
+
+    def eof(self):
+        """Write the records of the feature that just finished"""
+        if self.current_feature is None:
+            return
+        stream = self.open()
+        for scenario in self.current_feature.walk_scenarios():
+            stream.write(json.dumps(scenario_record(self.current_feature, scenario)) + "\n")
+        stream.flush()
+        self.current_feature = None
+
+
+def read_records(path):
+    """Yield scenario records from a JSON lines file"""
+    with open(path, encoding="utf-8") as record_file:
+        for line in record_file:
+            if line.strip():
+                yield json.loads(line)
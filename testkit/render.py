@@ -0,0 +1,180 @@
+"""
+Render pretty text, JUnit XML and HTML reports from a JSON lines run record.
+Records are grouped by feature in the order they were written, so every
+renderer streams through the file instead of loading the whole run.
+"""
+
+import html
+import itertools
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+from testkit.record import read_records
+
+FAILED_STATUSES = ("failed", "error", "hook_error", "cleanup_error", "undefined")
+SKIPPED_STATUSES = ("skipped", "untested")
+
+
+def group_by_feature(records):
+    """Yield (feature_file, feature_name, records) for consecutive records of a feature"""
+    for (feature_file, feature_name), group in itertools.groupby(
+        records, key=lambda record: (record["feature_file"], record["feature"])
+    ):
+        yield feature_file, feature_name, group
+
+
+def is_flaky(record):
+    """A scenario that passed only after being retried"""
+    return record.get("attempts", 1) > 1 and record["status"] not in FAILED_STATUSES
+
+
+def summarize(records):
+    """Count scenarios by passed/failed/skipped; flaky ones are also counted as passed"""
+    counts = {"passed": 0, "failed": 0, "skipped": 0, "flaky": 0}
+    for record in records:
+        if record["status"] in FAILED_STATUSES:
+            counts["failed"] += 1
+        elif record["status"] in SKIPPED_STATUSES:
+            counts["skipped"] += 1
+        else:
+            counts["passed"] += 1
+            if is_flaky(record):
+                counts["flaky"] += 1
+    return counts
+
+
+def render_pretty(record_path, output_file):
+    """Render a plain text report similar to behave's pretty formatter"""
+    counts = {"passed": 0, "failed": 0, "skipped": 0, "flaky": 0}
+    with open(output_file, "w", encoding="utf-8") as out:
+        for _, feature_name, records in group_by_feature(read_records(record_path)):
+            out.write(f"Feature: {feature_name}\n\n")
+            for record in records:
+                tags = " ".join(f"@{tag}" for tag in record["tags"])
+                if tags:
+                    out.write(f"  {tags}\n")
+                out.write(f"  Scenario: {record['scenario']}  # {record['location']}\n")
+                if is_flaky(record):
+                    out.write(f"    (flaky: passed on attempt {record['attempts']})\n")
+                for step in record["steps"]:
+                    out.write(f"    {step['keyword']} {step['name']} ... {step['status']} in {step['duration']:.3f}s\n")
+                    if step.get("error_message"):
+                        for line in step["error_message"].splitlines():
+                            out.write(f"      {line}\n")
+                out.write("\n")
+                for status, count in summarize([record]).items():
+                    counts[status] += count
+        out.write(
+            f"{counts['passed']} scenarios passed ({counts['flaky']} flaky), "
+            f"{counts['failed']} failed, {counts['skipped']} skipped\n"
+        )
+    return counts
+
+
+def _junit_testcase(suite, classname, record):
+    """Append the testcase element for one scenario record"""
+    case = ET.SubElement(suite, "testcase", {
+        "classname": classname,
+        "name": record["scenario"],
+        "status": record["status"],
+        "time": f"{record['duration']:.6f}",
+    })
+    if record.get("attempts", 1) > 1:
+        case.set("attempts", str(record["attempts"]))
+    failing = [step for step in record["steps"] if step["status"] in FAILED_STATUSES]
+    if record["status"] in FAILED_STATUSES:
+        step = failing[0] if failing else {"keyword": "", "name": "", "status": record["status"]}
+        kind = "failure" if step["status"] == "failed" else "error"
+        element = ET.SubElement(case, kind, {"type": step["status"], "message": f"{step['keyword']} {step['name']}".strip()})
+        element.text = step.get("error_message", "")
+    elif record["status"] in SKIPPED_STATUSES:
+        ET.SubElement(case, "skipped")
+    return case
+
+
+def render_junit(record_path, output_dir):
+    """Render one JUnit XML file per feature, named like behave's TESTS-<feature>.xml"""
+    written = []
+    for feature_file, feature_name, records in group_by_feature(read_records(record_path)):
+        stem = Path(feature_file).stem
+        classname = f"{stem}.{feature_name}"
+        suite = ET.Element("testsuite", {
+            "name": classname,
+            "timestamp": datetime.now().isoformat(),
+        })
+        records = list(records)
+        for record in records:
+            _junit_testcase(suite, classname, record)
+        counts = summarize(records)
+        suite.set("tests", str(len(records)))
+        suite.set("failures", str(sum(1 for record in records if record["status"] == "failed")))
+        suite.set("errors", str(counts["failed"] - int(suite.get("failures"))))
+        suite.set("skipped", str(counts["skipped"]))
+        suite.set("time", f"{sum(record['duration'] for record in records):.6f}")
+        target = Path(output_dir) / f"TESTS-{stem}.xml"
+        ET.ElementTree(suite).write(target, encoding="UTF-8", xml_declaration=True)
+        written.append(target)
+    return written
+
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Integration Test Report</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 2em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+.passed { color: #1a7f37; } .failed, .error, .undefined, .hook_error, .cleanup_error { color: #cf222e; }
+.skipped, .untested { color: #6e7781; }
+pre { margin: 0; white-space: pre-wrap; }
+</style>
+</head>
+<body>
+<h1>Integration Test Report</h1>
+"""
+
+
+def render_html(record_path, output_file):
+    """Render a self-contained HTML report"""
+    counts = {"passed": 0, "failed": 0, "skipped": 0, "flaky": 0}
+    with open(output_file, "w", encoding="utf-8") as out:
+        out.write(HTML_HEADER)
+        for _, feature_name, records in group_by_feature(read_records(record_path)):
+            out.write(f"<h2>Feature: {html.escape(feature_name)}</h2>\n")
+            out.write("<table>\n<tr><th>Scenario</th><th>Status</th><th>Duration</th><th>Steps</th></tr>\n")
+            for record in records:
+                steps = "".join(
+                    f"<div class=\"{step['status']}\">{html.escape(step['keyword'])} {html.escape(step['name'])}"
+                    f" ({step['status']})</div>"
+                    + (f"<pre>{html.escape(step['error_message'])}</pre>" if step.get("error_message") else "")
+                    for step in record["steps"]
+                )
+                status = record["status"]
+                if is_flaky(record):
+                    status += f" (flaky, {record['attempts']} attempts)"
+                out.write(
+                    f"<tr><td>{html.escape(record['scenario'])}</td>"
+                    f"<td class=\"{record['status']}\">{status}</td>"
+                    f"<td>{record['duration']:.3f}s</td><td>{steps}</td></tr>\n"
+                )
+                for status, count in summarize([record]).items():
+                    counts[status] += count
+            out.write("</table>\n")
+        out.write(
+            f"<p>{counts['passed']} passed ({counts['flaky']} flaky), {counts['failed']} failed, "
+            f"{counts['skipped']} skipped</p>\n"
+            "</body>\n</html>\n"
+        )
+    return counts
+
+
+def render_all(record_path, reports_dir="test-reports", name="behave-report"):
+    """Render every report format from one record and return the scenario counts"""
+    reports_dir = Path(reports_dir)
+    counts = render_pretty(record_path, reports_dir / f"{name}.txt")
+    render_junit(record_path, reports_dir)
+    render_html(record_path, reports_dir / f"{name}.html")
+    return counts
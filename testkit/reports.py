@@ -0,0 +1,74 @@
+"""
+Merge per-shard behave reports back into the regular test-reports/ files.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from testkit.step_timing import StepTimer
+
+
+def merge_text_reports(shard_dirs, output_file, name="pretty.txt"):
+    """Concatenate the pretty output of every shard into one file"""
+    output_file = Path(output_file)
+    with output_file.open("w", encoding="utf-8") as out:
+        for shard_dir in shard_dirs:
+            report = Path(shard_dir) / name
+            if report.exists():
+                out.write(report.read_text(encoding="utf-8"))
+    return output_file
+
+
+def _recount_testsuite(suite):
+    """Recompute the summary attributes of a JUnit testsuite element"""
+    cases = suite.findall("testcase")
+    suite.set("tests", str(len(cases)))
+    suite.set("failures", str(sum(1 for case in cases if case.find("failure") is not None)))
+    suite.set("errors", str(sum(1 for case in cases if case.find("error") is not None)))
+    suite.set("skipped", str(sum(1 for case in cases if case.find("skipped") is not None)))
+    suite.set("time", f"{sum(float(case.get('time', 0) or 0) for case in cases):.6f}")
+
+
+def merge_junit_reports(shard_dirs, output_dir):
+    """Merge JUnit files of the same feature from every shard into output_dir"""
+    grouped = {}
+    for shard_dir in shard_dirs:
+        for xml_file in sorted(Path(shard_dir).glob("*.xml")):
+            grouped.setdefault(xml_file.name, []).append(xml_file)
+
+    written = []
+    for filename, xml_files in sorted(grouped.items()):
+        tree = ET.parse(xml_files[0])
+        suite = tree.getroot()
+        for xml_file in xml_files[1:]:
+            for case in ET.parse(xml_file).getroot().findall("testcase"):
+                suite.append(case)
+        _recount_testsuite(suite)
+        target = Path(output_dir) / filename
+        tree.write(target, encoding="UTF-8", xml_declaration=True)
+        written.append(target)
+    return written
+
+
+def merge_step_profiles(shard_dirs, output_dir, name="step-profile"):
+    """Combine the step histograms and slowest-N lists of every shard; returns the table text"""
+    timer = StepTimer(step_registry=None)
+    for shard_dir in shard_dirs:
+        profile = Path(shard_dir) / f"{name}.json"
+        if profile.exists():
+            timer.add_profile(json.loads(profile.read_text(encoding="utf-8")))
+    return timer.write(output_dir, name)
+
+
+def merge_retry_reports(shard_dirs, output_dir, name="retries"):
+    """Concatenate the flaky, hard failure and timeout lists of every shard"""
+    merged = {"flaky": [], "hard_failures": [], "timeouts": []}
+    for shard_dir in shard_dirs:
+        report = Path(shard_dir) / f"{name}.json"
+        if report.exists():
+            for key, entries in json.loads(report.read_text(encoding="utf-8")).items():
+                merged.setdefault(key, []).extend(entries)
+    target = Path(output_dir) / f"{name}.json"
+    target.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+    return target
@@ -0,0 +1,94 @@
+"""
+Lightweight stand-ins for requests.Response.
+
+FakeResponse only has the attributes the API steps use (status_code,
+headers, content, text, ok and json()). It uses __slots__, so a typo such
+as response.staus_code raises AttributeError instead of quietly returning
+another Mock. The body is kept as bytes and only decoded when a step calls
+json() or reads text; the decoded value is cached.
+"""
+
+import json
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class FakeResponse:
+    """Minimal requests.Response look-alike with a lazily decoded body"""
+
+    __slots__ = ("status_code", "content", "url", "_headers", "_json")
+
+    _UNSET = object()
+
+    def __init__(self, status_code=200, content=b"", headers=None, url=""):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self._headers = headers
+        self._json = self._UNSET
+
+    @classmethod
+    def from_payload(cls, status_code, payload, headers=None, url=""):
+        """Build a JSON response; a None payload gives an empty body"""
+        content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        return cls(status_code, content, JSON_HEADERS if headers is None else headers, url)
+
+    @property
+    def headers(self):
+        from requests.structures import CaseInsensitiveDict
+
+        if not isinstance(self._headers, CaseInsensitiveDict):
+            self._headers = CaseInsensitiveDict(self._headers or {})
+        return self._headers
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        """Decode the body on first use; later calls return the same object"""
+        if self._json is self._UNSET:
+            self._json = json.loads(self.content)
+        return self._json
+
+    def __repr__(self):
+        return f"<FakeResponse [{self.status_code}]>"
+
+
+def _mock_response(status_code, payload):
+    from unittest.mock import Mock
+
+    response = Mock()
+    response.status_code = status_code
+    response.headers = dict(JSON_HEADERS)
+    response.json.return_value = payload
+    return response
+
+
+def benchmark(count=10000, repeat=3):
+    """Compare building responses with Mock and FakeResponse (best of repeat).
+    "build" only creates the responses, "build+assert" also reads status_code
+    and json() as a Then-step would."""
+    from testkit.benchmarks import timed
+
+    payload = {"id": 123, "email": "john.doe@example.com", "name": "John Doe", "role": "user"}
+    content = json.dumps(payload).encode("utf-8")
+    variants = {
+        "mock": lambda: [_mock_response(200, payload) for _ in range(count)],
+        "fake": lambda: [FakeResponse(200, content, JSON_HEADERS) for _ in range(count)],
+        "mock+assert": lambda: [_check(_mock_response(200, payload)) for _ in range(count)],
+        "fake+assert": lambda: [_check(FakeResponse(200, content, JSON_HEADERS)) for _ in range(count)],
+    }
+    results = {}
+    for name, run in variants.items():
+        best = min(timed(run) for _ in range(repeat))
+        results[name] = {"seconds": best, "responses_per_second": count / best if best else 0.0}
+    return results
+
+
+def _check(response):
+    return response.status_code == 200 and response.json()["id"] == 123
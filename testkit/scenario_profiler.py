@@ -0,0 +1,119 @@
+"""
+cProfile and tracemalloc profiling of single scenarios.
+Used for scenarios tagged @profile, or for every scenario when the runner
+sets BEHAVE_PROFILE=1 (python run_tests.py <command> --profile).
+
+For each scenario three files are written to test-reports/profiles/:
+    <name>.pstats          cProfile statistics (python -m pstats, snakeviz)
+    <name>.collapsed       collapsed stacks for flamegraph.pl / speedscope
+    <name>-memory.txt      top memory allocators from tracemalloc
+
+cProfile only sees the thread that runs the steps; work done inside the
+stub server thread shows up as time spent waiting on the socket.
+"""
+
+import re
+from pathlib import Path
+
+PROFILE_DIR = Path("test-reports") / "profiles"
+TOP_ALLOCATORS = 25
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-6
+
+
+def profile_file_stem(scenario):
+    """Build a filesystem-safe name such as api_integration-10-get-user-list"""
+    feature = Path(scenario.filename).stem
+    name = re.sub(r"[^a-z0-9]+", "-", scenario.name.lower()).strip("-")
+    return f"{feature}-{scenario.line}-{name}"
+
+
+def _frame_label(func):
+    filename, line, name = func
+    return f"{name} ({Path(filename).name}:{line})" if line else name
+
+
+def collapsed_stacks(stats):
+    """Convert pstats call-graph data into collapsed stack lines with microsecond weights.
+    Time of a function reached through several callers is split by the share of
+    cumulative time each caller accounts for."""
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge
+    roots = [func for func, (_, _, _, _, callers) in stats.stats.items() if not callers]
+
+    weights = {}
+
+    def walk(func, path, scale):
+        own_time = stats.stats[func][2] * scale
+        if own_time > 0:
+            key = ";".join(_frame_label(frame) for frame in path)
+            weights[key] = weights.get(key, 0.0) + own_time
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, (_, _, _, edge_cumulative) in callees.get(func, {}).items():
+            if callee in path:
+                continue
+            callee_cumulative = stats.stats[callee][3]
+            child_scale = scale * edge_cumulative / callee_cumulative if callee_cumulative else 0.0
+            if callee_cumulative * child_scale >= MIN_STACK_SECONDS:
+                walk(callee, path + (callee,), child_scale)
+
+    for root in roots:
+        walk(root, (root,), 1.0)
+    return [f"{key} {int(seconds * 1e6)}" for key, seconds in sorted(weights.items()) if int(seconds * 1e6) > 0]
+
+
+class ScenarioProfiler:
+    """Profile CPU time and allocations of one scenario at a time"""
+
+    def __init__(self, output_dir=PROFILE_DIR):
+        self.output_dir = Path(output_dir)
+        self.profiler = None
+        self.started_tracemalloc = False
+        self.stem = None
+
+    def start(self, scenario):
+        # Imported here: most runs profile nothing and skip the import cost
+        import cProfile
+        import tracemalloc
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.stem = profile_file_stem(scenario)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self.started_tracemalloc = True
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        """Stop profiling and write the pstats, collapsed-stack and memory files"""
+        if self.profiler is None:
+            return None
+        import pstats
+        import tracemalloc
+
+        self.profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+        base = self.output_dir / self.stem
+        self.profiler.dump_stats(f"{base}.pstats")
+        stats = pstats.Stats(self.profiler)
+        Path(f"{base}.collapsed").write_text("\n".join(collapsed_stacks(stats)) + "\n", encoding="utf-8")
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        lines = [f"Top {TOP_ALLOCATORS} memory allocators for {self.stem}", ""]
+        for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATORS]:
+            lines.append(f"{statistic.size / 1024:>10.1f} KiB  {statistic.count:>7} blocks  {statistic.traceback[0]}")
+        Path(f"{base}-memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        self.profiler = None
+        return base
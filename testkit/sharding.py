@@ -0,0 +1,123 @@
+"""
+Split the feature files into shards and run them in parallel.
+Each shard is executed by its own behave process so hooks and
+module-level step state stay isolated between workers.
+"""
+
+import os
+import heapq
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from testkit import timings
+
+FEATURES_DIR = Path("features")
+SHARDS_DIR = Path("test-reports") / "shards"
+
+
+def discover_feature_files(features_dir=FEATURES_DIR):
+    """Return all feature files in a stable order"""
+    return sorted(str(path) for path in Path(features_dir).glob("*.feature"))
+
+
+def discover_scenarios(feature_files):
+    """Return (feature_path, scenario_name, location) for every scenario"""
+    from testkit.feature_cache import parse_file
+
+    scenarios = []
+    for feature_file in feature_files:
+        feature = parse_file(feature_file)
+        if feature is None:
+            continue
+        # walk_scenarios() expands outlines so each example row is its own item
+        for scenario in feature.walk_scenarios():
+            scenarios.append((feature_file, scenario.name, f"{feature_file}:{scenario.line}"))
+    return scenarios
+
+
+def split_round_robin(items, workers):
+    """Deal items into at most `workers` non-empty shards"""
+    shards = [[] for _ in range(max(1, workers))]
+    for index, item in enumerate(items):
+        shards[index % len(shards)].append(item)
+    return [shard for shard in shards if shard]
+
+
+def split_longest_first(weighted_items, workers):
+    """Assign (item, weight) pairs longest-first to the least loaded shard"""
+    shards = [[] for _ in range(max(1, workers))]
+    loads = [(0.0, index) for index in range(len(shards))]
+    for item, weight in sorted(weighted_items, key=lambda pair: pair[1], reverse=True):
+        load, index = heapq.heappop(loads)
+        shards[index].append(item)
+        heapq.heappush(loads, (load + weight, index))
+    predicted = {index: load for load, index in loads}
+    return [(shard, predicted[index]) for index, shard in enumerate(shards) if shard]
+
+
+def build_duration_shards(workers, features_dir=FEATURES_DIR, db_path=timings.DEFAULT_DB_PATH):
+    """Build scenario shards balanced by historical durations"""
+    scenarios = discover_scenarios(discover_feature_files(features_dir))
+    durations = timings.load_durations(db_path)
+    fallback = timings.default_duration(durations)
+    weighted = [(location, durations.get((feature, name), fallback)) for feature, name, location in scenarios]
+    known = sum(1 for feature, name, _ in scenarios if (feature, name) in durations)
+    print(f"  Timing history for {known}/{len(scenarios)} scenario(s), default estimate {fallback:.2f}s")
+
+    shards = split_longest_first(weighted, workers)
+    for index, (shard, load) in enumerate(shards):
+        print(f"  shard {index:02d}: {len(shard)} scenario(s), predicted {load:.2f}s")
+    return [shard for shard, _ in shards]
+
+
+def build_shards(workers, split="feature", features_dir=FEATURES_DIR, schedule="round-robin"):
+    """Build shards of behave locations, split by feature file or scenario"""
+    if schedule == "duration":
+        return build_duration_shards(workers, features_dir)
+    feature_files = discover_feature_files(features_dir)
+    if split == "scenario":
+        locations = [location for _, _, location in discover_scenarios(feature_files)]
+    else:
+        locations = feature_files
+    return split_round_robin(locations, workers)
+
+
+def shard_command(locations, shard_dir):
+    """Build the behave command line for a single shard"""
+    return [
+        sys.executable, "-m", "behave", *locations,
+        "--format=pretty", f"--outfile={shard_dir / 'pretty.txt'}",
+        "--junit", f"--junit-directory={shard_dir}", "--no-skipped",
+    ]
+
+
+def run_shard(index, locations, shards_dir=SHARDS_DIR):
+    """Run one shard and return (index, return code, shard directory)"""
+    shard_dir = Path(shards_dir) / f"shard-{index:02d}"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for stale in shard_dir.glob("*"):
+        stale.unlink()
+    # Each shard keeps its own event log, metrics file, step profile and retry report;
+    # they cannot share a metrics port
+    env = dict(os.environ, BEHAVE_EVENT_LOG=str((shard_dir / "events.jsonl").resolve()),
+               BEHAVE_METRICS_FILE=str((shard_dir / "metrics.txt").resolve()),
+               BEHAVE_REPORTS_DIR=str(shard_dir.resolve()))
+    env.pop("BEHAVE_METRICS_PORT", None)
+    result = subprocess.run(shard_command(locations, shard_dir), capture_output=True, text=True, env=env)
+    (shard_dir / "console.log").write_text(result.stdout + result.stderr, encoding="utf-8")
+    return index, result.returncode, shard_dir
+
+
+def run_shards(shards, workers, shards_dir=SHARDS_DIR):
+    """Run all shards with a pool of `workers` behave processes"""
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(run_shard, index, shard, shards_dir) for index, shard in enumerate(shards)]
+        results = []
+        for future in futures:
+            index, returncode, shard_dir = future.result()
+            status = "✅" if returncode == 0 else "❌"
+            print(f"  {status} shard {index:02d}: {len(shards[index])} item(s), exit code {returncode}")
+            results.append((index, returncode, shard_dir))
+    return results
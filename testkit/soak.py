@@ -0,0 +1,265 @@
+"""
+Soak runner behind `python run_tests.py soak --duration 2h`.
+
+The selected features run over and over in one interpreter (the warm runner
+of testkit.watch), so anything that outlives a run - module globals, caches,
+threads, sockets - accumulates the way it would in a long-lived process.
+Between runs, once every `interval`, a sample records:
+    - the resident set size of the process
+    - memory traced by tracemalloc and its top allocation sites
+    - live objects and collections per generation from gc
+    - p50/p95/p99 of the step durations since the previous sample
+Samples are appended to test-reports/soak/soak.csv as they are taken and the
+full series, allocation sites included, is rewritten to soak.json, so an
+interrupted soak still leaves its data behind.
+
+The first WARMUP_FRACTION of the samples, at least MIN_WARMUP_SAMPLES, are
+warm-up (caches filling, first imports, the allocator growing its arenas)
+and left out. After them a metric is flagged as growing when at least
+MIN_SAMPLES samples rise in at least MIN_INCREASING of their steps and its
+last value is MIN_GROWTH above the first, and its second half of samples
+still adds at least SUSTAINED_RATIO of what the first half added. Plateaus,
+sawtooth patterns and growth that levels off are not flagged. RSS alone is
+not evidence of a leak (freed memory is often kept by the allocator), so
+rss_kb is only flagged when traced_kb or gc_objects grows as well.
+"""
+
+import contextlib
+import csv
+import gc
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+from testkit.load import percentile
+
+OUTPUT_DIR = Path("test-reports") / "soak"
+DEFAULT_DURATION = 3600.0
+DEFAULT_INTERVAL = 60.0
+TOP_ALLOCATIONS = 10
+WARMUP_FRACTION = 0.15
+MIN_WARMUP_SAMPLES = 3
+MIN_SAMPLES = 5
+MIN_INCREASING = 0.8
+MIN_GROWTH = 0.05
+SUSTAINED_RATIO = 0.25
+TREND_METRICS = ("rss_kb", "traced_kb", "gc_objects", "step_p95_ms")
+# Growth in one of these has to back up RSS growth
+RSS_EVIDENCE = ("traced_kb", "gc_objects")
+CSV_FIELDS = (
+    "elapsed_s", "iteration", "scenarios", "failed", "rss_kb", "traced_kb", "traced_peak_kb",
+    "gc_objects", "gc_gen0", "gc_gen1", "gc_gen2", "gc_uncollectable",
+    "steps", "step_p50_ms", "step_p95_ms", "step_p99_ms",
+)
+
+
+def rss_kb():
+    """Current resident set size in KiB; the peak where the current value is unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak // 1024 if os.uname().sysname == "Darwin" else peak
+
+
+def step_durations(features):
+    """Durations in seconds of every step that ran in a finished behave run"""
+    durations = []
+    for feature in features:
+        for scenario in feature.walk_scenarios():
+            for step in scenario.all_steps:
+                if step.status.name in ("passed", "failed"):
+                    durations.append(step.duration)
+    return durations
+
+
+def warmup_samples(count):
+    """How many of count samples are warm-up"""
+    return max(MIN_WARMUP_SAMPLES, int(count * WARMUP_FRACTION))
+
+
+def growth(values, min_samples=MIN_SAMPLES, min_increasing=MIN_INCREASING, min_growth=MIN_GROWTH, warmup=None):
+    """Trend of one metric series after its warm-up (warmup_samples() by default):
+    share of rising steps, relative growth and whether it is flagged"""
+    values = [value for value in values if value is not None]
+    values = values[warmup_samples(len(values)) if warmup is None else warmup:]
+    if len(values) < min_samples:
+        return {"samples": len(values), "flagged": False}
+    deltas = [after - before for before, after in zip(values, values[1:])]
+    increasing = sum(1 for delta in deltas if delta > 0) / len(deltas)
+    relative = (values[-1] - values[0]) / values[0] if values[0] else 0.0
+    middle = len(values) // 2
+    early = values[middle] - values[0]
+    late = values[-1] - values[middle]
+    # Still climbing in the second half, not levelling off after a slow warm-up
+    sustained = early <= 0 or late >= SUSTAINED_RATIO * early
+    return {
+        "samples": len(values),
+        "first": values[0],
+        "last": values[-1],
+        "increasing": round(increasing, 3),
+        "growth": round(relative, 4),
+        "flagged": increasing >= min_increasing and relative >= min_growth and sustained,
+    }
+
+
+def trends(samples):
+    """growth() of every TREND_METRICS series in the samples"""
+    result = {metric: growth([sample[metric] for sample in samples]) for metric in TREND_METRICS}
+    rss = result["rss_kb"]
+    if rss["flagged"] and not any(result[metric]["flagged"] for metric in RSS_EVIDENCE):
+        result["rss_kb"] = dict(rss, flagged=False, unconfirmed=True)
+    return result
+
+
+class SoakSampler:
+    """Takes the process samples and writes the CSV and JSON series"""
+
+    def __init__(self, output_dir=OUTPUT_DIR, top=TOP_ALLOCATIONS):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.csv_path = self.output_dir / "soak.csv"
+        self.json_path = self.output_dir / "soak.json"
+        self.top = top
+        self.samples = []
+        self.latencies = []
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.started = time.monotonic()
+        self.csv_file = open(self.csv_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.csv_file, fieldnames=CSV_FIELDS)
+        self.writer.writeheader()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add_steps(self, durations):
+        self.latencies.extend(durations)
+
+    def _top_allocations(self, snapshot):
+        return [{"site": str(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:self.top]]
+
+    def sample(self, iteration, scenarios, failed):
+        """Record one sample; step latencies since the previous sample go into its percentiles"""
+        gc.collect()
+        # The samples and snapshots kept here would otherwise show up as growth
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)))
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        collections = gc.get_stats()
+        latencies = sorted(self.latencies)
+        self.latencies = []
+        row = {
+            "elapsed_s": round(time.monotonic() - self.started, 1),
+            "iteration": iteration,
+            "scenarios": scenarios,
+            "failed": failed,
+            "rss_kb": rss_kb(),
+            "traced_kb": round(traced / 1024, 1),
+            "traced_peak_kb": round(traced_peak / 1024, 1),
+            "gc_objects": len(gc.get_objects()),
+            "gc_gen0": collections[0]["collections"],
+            "gc_gen1": collections[1]["collections"],
+            "gc_gen2": collections[2]["collections"],
+            "gc_uncollectable": sum(generation["uncollectable"] for generation in collections),
+            "steps": len(latencies),
+            "step_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "step_p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "step_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+        self.writer.writerow(row)
+        self.csv_file.flush()
+        # The warm-up ends at MIN_WARMUP_SAMPLES at the earliest; keeping a snapshot for
+        # every later sample the warm-up may grow to would cost more than the diff is worth
+        if len(self.samples) == MIN_WARMUP_SAMPLES:
+            self.first_snapshot = snapshot
+        self.last_snapshot = snapshot
+        self.samples.append(dict(row, top_allocations=self._top_allocations(snapshot)))
+        self.write_json()
+        return row
+
+    def trends(self):
+        return trends(self.samples)
+
+    def allocation_growth(self):
+        """Allocation sites that grew most between the end of the shortest warm-up and the last sample"""
+        if self.first_snapshot is None or self.last_snapshot is self.first_snapshot:
+            return []
+        return [{"site": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1),
+                 "count_diff": stat.count_diff}
+                for stat in self.last_snapshot.compare_to(self.first_snapshot, "lineno")[:self.top]]
+
+    def write_json(self):
+        report = {
+            "samples": self.samples,
+            "trends": self.trends(),
+            "allocation_growth": self.allocation_growth(),
+        }
+        self.json_path.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+    def close(self):
+        if not self.csv_file.closed:
+            self.csv_file.close()
+        tracemalloc.stop()
+
+
+def run_iteration(paths, step_modules):
+    """Run the features once in this process with their output discarded; returns (scenarios, failed, step durations)"""
+    from behave.configuration import Configuration
+
+    from testkit.watch import WarmRunner
+
+    config = Configuration(["--format=null", "--no-summary", "--no-junit", *paths])
+    runner = WarmRunner(config, step_modules)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        try:
+            runner.run()
+        except SystemExit:
+            # environment.py's after_all exits with the suite's status
+            pass
+    scenarios = [scenario for feature in runner.features for scenario in feature.walk_scenarios()]
+    failed = sum(1 for scenario in scenarios if scenario.status.name in ("failed", "error"))
+    return len(scenarios), failed, step_durations(runner.features)
+
+
+def soak(duration, interval=DEFAULT_INTERVAL, paths=(), max_iterations=None, output_dir=OUTPUT_DIR):
+    """Loop the features for `duration` seconds, sampling every `interval`; returns the sampler"""
+    from testkit.watch import StepModules
+
+    step_modules = StepModules()
+    step_modules.sync()
+    sampler = SoakSampler(output_dir)
+    deadline = time.monotonic() + duration
+    next_sample = 0.0
+    iteration = scenarios = failed = 0
+    try:
+        while time.monotonic() < deadline and (max_iterations is None or iteration < max_iterations):
+            iteration += 1
+            ran, failures, durations = run_iteration(paths, step_modules)
+            scenarios += ran
+            failed += failures
+            sampler.add_steps(durations)
+            if failures:
+                print(f"  ❌ iteration {iteration}: {failures} of {ran} scenario(s) failed")
+            if time.monotonic() >= next_sample:
+                row = sampler.sample(iteration, scenarios, failed)
+                next_sample = time.monotonic() + interval
+                print(f"  [{row['elapsed_s']:>8.1f}s] iteration {iteration}: rss {row['rss_kb']} KiB, "
+                      f"traced {row['traced_kb']} KiB, {row['gc_objects']} objects, "
+                      f"step p95 {row['step_p95_ms']} ms")
+    except KeyboardInterrupt:
+        print("\n  Interrupted, writing the samples taken so far")
+    if sampler.latencies or not sampler.samples or sampler.samples[-1]["iteration"] != iteration:
+        sampler.sample(iteration, scenarios, failed)
+    sampler.close()
+    return sampler
@@ -0,0 +1,182 @@
+"""
+Per-step timing collected from the before_step/after_step hooks.
+Durations come from the monotonic nanosecond clock and are aggregated per
+step definition into fixed histograms, so memory stays constant no matter
+how many steps run. Only the slowest individual executions are kept.
+"""
+
+import bisect
+import heapq
+import json
+import time
+from pathlib import Path
+
+# Upper bounds of the histogram buckets in milliseconds; the last bucket is open
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SLOWEST_N = 20
+
+
+def step_definition_key(step, registry):
+    """Return the step pattern that matches this step, e.g. @when('I send a GET request to "{endpoint}"')"""
+    candidates = list(registry.steps.get(step.step_type, [])) + list(registry.steps.get("step", []))
+    for matcher in candidates:
+        if matcher.match(step.name):
+            return f"@{step.step_type}('{matcher.pattern}')"
+    return f"<undefined> {step.step_type} {step.name}"
+
+
+class StepHistogram:
+    """Fixed-bucket latency histogram of one step definition"""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, duration_ns):
+        self.count += 1
+        self.total_ns += duration_ns
+        self.min_ns = duration_ns if self.min_ns is None else min(self.min_ns, duration_ns)
+        self.max_ns = max(self.max_ns, duration_ns)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ns / 1e6)] += 1
+
+    def add_dict(self, data):
+        """Fold in a histogram written by to_dict(), e.g. by another parallel shard"""
+        if not data["count"]:
+            return
+        self.count += data["count"]
+        self.total_ns += round(data["total_ms"] * 1e6)
+        min_ns = round(data["min_ms"] * 1e6)
+        self.min_ns = min_ns if self.min_ns is None else min(self.min_ns, min_ns)
+        self.max_ns = max(self.max_ns, round(data["max_ms"] * 1e6))
+        for index, count in enumerate(data["buckets_ms"].values()):
+            self.buckets[index] += count
+
+    def quantile_ms(self, fraction):
+        """Upper bound of the bucket holding the given quantile"""
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index], self.max_ns / 1e6)
+                return self.max_ns / 1e6
+        return self.max_ns / 1e6
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "min_ms": (self.min_ns or 0) / 1e6,
+            "max_ms": self.max_ns / 1e6,
+            "p50_ms": self.quantile_ms(0.50),
+            "p95_ms": self.quantile_ms(0.95),
+            "p99_ms": self.quantile_ms(0.99),
+            "buckets_ms": dict(zip([str(bound) for bound in BUCKET_BOUNDS_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+class StepTimer:
+    """Collects step histograms plus the slowest steps and scenarios of a run"""
+
+    def __init__(self, step_registry, slowest_n=SLOWEST_N):
+        self.step_registry = step_registry
+        self.slowest_n = slowest_n
+        self.histograms = {}
+        self.slowest_steps = []
+        self.slowest_scenarios = []
+        self.step_started_ns = None
+        self.sequence = 0
+
+    def start_step(self):
+        self.step_started_ns = time.perf_counter_ns()
+
+    def stop_step(self, step, scenario_location):
+        """Record the step that just finished and return its duration in ns"""
+        duration_ns = time.perf_counter_ns() - self.step_started_ns
+        key = step_definition_key(step, self.step_registry)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = StepHistogram()
+        histogram.add(duration_ns)
+        self._keep_slowest(self.slowest_steps, duration_ns, {
+            "step": f"{step.keyword} {step.name}",
+            "definition": key,
+            "scenario": scenario_location,
+        })
+        return duration_ns
+
+    def record_scenario(self, scenario_location, scenario_name, duration_ns):
+        self._keep_slowest(self.slowest_scenarios, duration_ns, {
+            "scenario": scenario_name,
+            "location": scenario_location,
+        })
+
+    def _keep_slowest(self, heap, duration_ns, details):
+        """Keep only the N slowest entries in a min-heap"""
+        self.sequence += 1
+        entry = (duration_ns, self.sequence, details)
+        if len(heap) < self.slowest_n:
+            heapq.heappush(heap, entry)
+        elif duration_ns > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def add_profile(self, profile):
+        """Fold in a profile written by another process (a parallel shard)"""
+        for key, stats in profile["step_definitions"].items():
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = StepHistogram()
+            histogram.add_dict(stats)
+        for heap, entries in ((self.slowest_steps, profile["slowest_steps"]),
+                              (self.slowest_scenarios, profile["slowest_scenarios"])):
+            for entry in entries:
+                details = dict(entry)
+                self._keep_slowest(heap, round(details.pop("duration_ms") * 1e6), details)
+
+    @staticmethod
+    def _sorted_slowest(heap):
+        return [dict(details, duration_ms=duration_ns / 1e6)
+                for duration_ns, _, details in sorted(heap, key=lambda entry: entry[0], reverse=True)]
+
+    def profile(self):
+        """Return the JSON-serializable profile of the run"""
+        definitions = sorted(self.histograms.items(), key=lambda item: item[1].total_ns, reverse=True)
+        return {
+            "step_definitions": {key: histogram.to_dict() for key, histogram in definitions},
+            "slowest_steps": self._sorted_slowest(self.slowest_steps),
+            "slowest_scenarios": self._sorted_slowest(self.slowest_scenarios),
+        }
+
+    def format_slowest(self):
+        """Render the slowest steps and scenarios as text tables"""
+        profile = self.profile()
+        lines = [f"Slowest {self.slowest_n} steps", "-" * 60]
+        for entry in profile["slowest_steps"]:
+            lines.append(f"{entry['duration_ms']:>10.2f} ms  {entry['step']}  ({entry['scenario']})")
+        lines += ["", f"Slowest {self.slowest_n} scenarios", "-" * 60]
+        for entry in profile["slowest_scenarios"]:
+            lines.append(f"{entry['duration_ms']:>10.2f} ms  {entry['scenario']}  ({entry['location']})")
+        lines += ["", "Step definitions by total time", "-" * 60]
+        for key, stats in list(profile["step_definitions"].items())[:self.slowest_n]:
+            lines.append(
+                f"{stats['total_ms']:>10.2f} ms  n={stats['count']:<5} p95<={stats['p95_ms']:.2f} ms  {key}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, reports_dir, name="step-profile"):
+        """Write the JSON profile and the slowest-N table, returning the table text"""
+        reports_dir = Path(reports_dir)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        (reports_dir / f"{name}.json").write_text(json.dumps(self.profile(), indent=2), encoding="utf-8")
+        table = self.format_slowest()
+        (reports_dir / f"{name}.txt").write_text(table, encoding="utf-8")
+        return table
@@ -0,0 +1,236 @@
+"""
+In-process asyncio HTTP stub of the users API.
+The server runs its own event loop in a background thread, so behave steps
+can talk to it over a real socket with a normal requests.Session.
+
+Endpoints:
+    GET    /api/users          list users
+    GET    /api/users/<id>     fetch one user (404 if missing)
+    POST   /api/users          create a user, or a JSON list of users (201)
+    PUT    /api/users/<id>     update a user (404 if missing)
+    DELETE /api/users/<id>     delete a user (204, 404 if missing)
+
+Every request must carry "Authorization: Bearer <VALID_API_KEY>", otherwise
+the server answers 401.
+
+Set request_observer to a callable(method, path, status, seconds) to time
+every request; it is called on the server thread.
+
+asyncio is imported when the server starts: it costs about 30 ms, which
+runs without an @api feature never need to pay.
+"""
+
+import copy
+import json
+import socket
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+VALID_API_KEY = "valid-api-key-12345"
+
+SEED_USERS = {
+    1: {"id": 1, "email": "user1@example.com", "name": "User One", "role": "user"},
+    2: {"id": 2, "email": "user2@example.com", "name": "User Two", "role": "admin"},
+    123: {"id": 123, "email": "test@example.com", "name": "Test User", "role": "user"},
+}
+FIRST_CREATED_ID = 456
+
+
+class StubApiServer:
+    """Users API stub served by asyncio on a background thread"""
+
+    def __init__(self, host="localhost", port=8000, api_key=VALID_API_KEY):
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        self.lock = threading.Lock()
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.request_observer = None
+        self.reset()
+
+    @classmethod
+    def from_url(cls, base_url, **kwargs):
+        """Create a server listening on the host and port of base_url"""
+        parts = urlsplit(base_url)
+        return cls(parts.hostname or "localhost", parts.port or 80, **kwargs)
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def reset(self):
+        """Restore the seed users so every scenario starts from the same data"""
+        with self.lock:
+            self.users = copy.deepcopy(SEED_USERS)
+            self.next_id = FIRST_CREATED_ID
+
+    def snapshot(self):
+        """Return a token that restore() can roll back to; user records are replaced,
+        never mutated, so a shallow copy is enough"""
+        with self.lock:
+            return dict(self.users), self.next_id
+
+    def restore(self, token):
+        users, next_id = token
+        with self.lock:
+            self.users = dict(users)
+            self.next_id = next_id
+
+    # -- Lifecycle
+
+    def start(self):
+        """Start serving; uses a free port if none is configured or it is taken"""
+        ready = threading.Event()
+        errors = []
+
+        import asyncio
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.server = self.loop.run_until_complete(self._bind())
+            except OSError as error:
+                errors.append(error)
+                ready.set()
+                return
+            ready.set()
+            self.loop.run_forever()
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, name="stub-api-server", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self.base_url
+
+    async def _bind(self):
+        import asyncio
+
+        if self.port:
+            try:
+                return await asyncio.start_server(self._handle_connection, self.host, self.port)
+            except OSError:
+                # Another worker already owns the configured port
+                pass
+        # An ephemeral port differs per address family, so bind a single IPv4 address
+        self.host = socket.gethostbyname(self.host)
+        server = await asyncio.start_server(self._handle_connection, self.host, 0)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    def stop(self):
+        """Stop the event loop and wait for the server thread to exit"""
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self.thread = None
+
+    # -- HTTP handling
+
+    async def _handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests until the client closes"""
+        import asyncio
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                started = time.perf_counter()
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                path = urlsplit(target).path
+                status, payload = self.handle(method, path, headers, body)
+                writer.write(self._encode_response(status, payload))
+                await writer.drain()
+                if self.request_observer is not None:
+                    self.request_observer(method, path, status, time.perf_counter() - started)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _encode_response(status, payload):
+        """Build the raw HTTP response bytes"""
+        reason = HTTPStatus(status).phrase
+        if status == 204:
+            return f"HTTP/1.1 {status} {reason}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1")
+        content = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        return head.encode("latin-1") + content
+
+    def handle(self, method, path, headers, body):
+        """Route one request and return (status code, JSON payload)"""
+        if headers.get("authorization") != f"Bearer {self.api_key}":
+            return 401, {"error": "Invalid API key"}
+
+        parts = [part for part in path.split("/") if part]
+        if parts[:2] != ["api", "users"] or len(parts) > 3:
+            return 404, {"error": "Not found"}
+
+        user_id = None
+        if len(parts) == 3:
+            if not parts[2].isdigit():
+                return 404, {"error": "User not found"}
+            user_id = int(parts[2])
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+
+        with self.lock:
+            if user_id is None:
+                if method == "GET":
+                    return 200, list(self.users.values())
+                if method == "POST" and isinstance(data, list):
+                    first_id = self.next_id
+                    for item in data:
+                        self.users[self.next_id] = {"role": "user", **item, "id": self.next_id}
+                        self.next_id += 1
+                    return 201, {"created": len(data), "first_id": first_id, "last_id": self.next_id - 1}
+                if method == "POST":
+                    user = {"role": "user", **data, "id": self.next_id}
+                    self.users[self.next_id] = user
+                    self.next_id += 1
+                    return 201, user
+                return 405, {"error": "Method not allowed"}
+
+            if user_id not in self.users:
+                return 404, {"error": "User not found"}
+            if method == "GET":
+                return 200, self.users[user_id]
+            if method == "PUT":
+                updates = {key: value for key, value in data.items() if key != "id"}
+                self.users[user_id] = {**self.users[user_id], **updates}
+                return 200, self.users[user_id]
+            if method == "DELETE":
+                del self.users[user_id]
+                return 204, None
+            return 405, {"error": "Method not allowed"}
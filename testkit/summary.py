@@ -0,0 +1,185 @@
+"""
+Compact CI summary built from the JUnit XML reports of every matrix job.
+
+The reports are read with iterparse and each testcase is dropped as soon as
+it has been counted, so memory stays flat however large the reports are.
+Per Python version the summary keeps the pass/fail/skip counts and total
+duration, the first MAX_FAILURES failures and the SLOWEST slowest scenarios
+(a fixed-size heap); the markdown it produces is cut to fit max_chars, which
+defaults to below GitHub's 65536 character comment limit.
+
+Layouts understood by collect():
+    all-test-results/test-results-<version>/test-reports/*.xml   (CI artifacts)
+    test-reports/*.xml                                            (a local run)
+"""
+
+import heapq
+import platform
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+ARTIFACT_PREFIX = "test-results-"
+MAX_FAILURES = 20
+SLOWEST = 10
+MESSAGE_LIMIT = 300
+MAX_CHARS = 60000
+
+
+class VersionSummary:
+    """Counts, durations, first failures and slowest scenarios of one Python version"""
+
+    def __init__(self, version, max_failures=MAX_FAILURES, slowest=SLOWEST):
+        self.version = version
+        self.max_failures = max_failures
+        self.slowest_count = slowest
+        self.counts = {"passed": 0, "failed": 0, "skipped": 0}
+        self.seconds = 0.0
+        self.files = 0
+        self.failures = []
+        self.slowest = []
+        self._sequence = 0
+
+    def add(self, case):
+        self.counts[case["outcome"]] += 1
+        self.seconds += case["time"]
+        if case["outcome"] == "failed" and len(self.failures) < self.max_failures:
+            self.failures.append(case)
+        # The sequence number breaks ties so dicts are never compared
+        self._sequence += 1
+        entry = (case["time"], self._sequence, case)
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, entry)
+        elif entry[0] > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def slowest_cases(self):
+        return [case for _, _, case in sorted(self.slowest, key=lambda entry: entry[0], reverse=True)]
+
+
+def _first_line(text, limit=MESSAGE_LIMIT):
+    line = next((line.strip() for line in (text or "").splitlines() if line.strip()), "")
+    return line if len(line) <= limit else line[:limit - 1] + "…"
+
+
+def iter_testcases(xml_path):
+    """Yield one small dict per testcase of a JUnit file, discarding each element after use"""
+    parents = []
+    for event, element in ET.iterparse(str(xml_path), events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag in ("system-out", "system-err"):
+            # Captured output can be large and is never summarized
+            element.clear()
+        elif element.tag == "testcase":
+            outcome, message = "passed", ""
+            for child in element:
+                if child.tag in ("failure", "error"):
+                    outcome = "failed"
+                    message = child.get("message") or _first_line(child.text)
+                    break
+                if child.tag == "skipped":
+                    outcome = "skipped"
+            yield {
+                "classname": element.get("classname", ""),
+                "name": element.get("name", ""),
+                "time": float(element.get("time") or 0),
+                "outcome": outcome,
+                "message": _first_line(message),
+            }
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+
+def _report_files(directory):
+    directory = Path(directory)
+    reports = directory / "test-reports"
+    return sorted((reports if reports.is_dir() else directory).glob("*.xml"))
+
+
+def collect(paths, max_failures=MAX_FAILURES, slowest=SLOWEST):
+    """Summaries per Python version for report directories or a downloaded artifacts directory"""
+    summaries = {}
+    for path in paths:
+        path = Path(path)
+        artifacts = sorted(child for child in path.glob(ARTIFACT_PREFIX + "*") if child.is_dir())
+        if artifacts:
+            sources = [(child.name[len(ARTIFACT_PREFIX):], child) for child in artifacts]
+        else:
+            sources = [(platform.python_version(), path)]
+        for version, directory in sources:
+            summary = summaries.get(version)
+            if summary is None:
+                summary = summaries[version] = VersionSummary(version, max_failures, slowest)
+            for xml_file in _report_files(directory):
+                summary.files += 1
+                for case in iter_testcases(xml_file):
+                    summary.add(case)
+    return [summaries[version] for version in sorted(summaries, key=_version_key)]
+
+
+def _version_key(version):
+    return [int(part) if part.isdigit() else part for part in version.replace("-", ".").split(".")]
+
+
+def _cell(text):
+    return str(text).replace("|", "\\|").replace("\n", " ")
+
+
+def render_markdown(summaries, max_chars=MAX_CHARS, title="Integration Test Summary"):
+    """Markdown with a per-version table, failures and slowest scenarios, at most max_chars long"""
+    lines = [f"## {title}", ""]
+    if not summaries or not any(summary.total for summary in summaries):
+        lines.append("No JUnit reports found.")
+        return "\n".join(lines) + "\n"
+
+    lines += ["| Python | Result | Passed | Failed | Skipped | Duration |",
+              "|---|---|---:|---:|---:|---:|"]
+    for summary in summaries:
+        result = "❌" if summary.counts["failed"] else "✅"
+        lines.append(f"| {summary.version} | {result} | {summary.counts['passed']} | {summary.counts['failed']} "
+                     f"| {summary.counts['skipped']} | {summary.seconds:.2f}s |")
+    head = "\n".join(lines) + "\n"
+
+    sections = []
+    for summary in summaries:
+        if summary.failures:
+            section = [f"### Failures on Python {summary.version}", "",
+                       "| Scenario | Feature | Message |", "|---|---|---|"]
+            section += [f"| {_cell(case['name'])} | {_cell(case['classname'])} | {_cell(case['message'])} |"
+                        for case in summary.failures]
+            hidden = summary.counts["failed"] - len(summary.failures)
+            if hidden:
+                section.append(f"\n…and {hidden} more failure(s).")
+            sections.append("\n".join(section) + "\n")
+    for summary in summaries:
+        cases = summary.slowest_cases()
+        if cases:
+            section = [f"### Slowest scenarios on Python {summary.version}", "",
+                       "| Scenario | Feature | Duration |", "|---|---|---:|"]
+            section += [f"| {_cell(case['name'])} | {_cell(case['classname'])} | {case['time']:.2f}s |"
+                        for case in cases]
+            sections.append("\n".join(section) + "\n")
+
+    text = head
+    truncated = "\n_Summary truncated to fit; see the test-results artifacts for the full reports._\n"
+    for section in sections:
+        if len(text) + 1 + len(section) + len(truncated) > max_chars:
+            return text + truncated
+        text += "\n" + section
+    return text
+
+
+def write_summary(paths, output_file, max_chars=MAX_CHARS):
+    """Collect the reports under paths, write the markdown summary and return the summaries"""
+    summaries = collect(paths)
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(render_markdown(summaries, max_chars), encoding="utf-8")
+    return summaries
@@ -0,0 +1,81 @@
+"""
+On-disk history of scenario durations, used to balance parallel shards.
+Durations are kept as an exponential moving average per scenario so the
+history follows real changes without being thrown off by a single slow run.
+"""
+
+import sqlite3
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_DB_PATH = Path(".behave-timings.db")
+DEFAULT_SCENARIO_SECONDS = 1.0
+SMOOTHING = 0.3
+
+
+class TimingDatabase:
+    """SQLite store of scenario durations keyed by feature path and scenario name"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        # Parallel shards write concurrently, so wait on the lock instead of failing
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS scenario_timings (
+                   feature TEXT NOT NULL,
+                   scenario TEXT NOT NULL,
+                   runs INTEGER NOT NULL,
+                   mean_seconds REAL NOT NULL,
+                   last_seconds REAL NOT NULL,
+                   updated_at TEXT NOT NULL,
+                   PRIMARY KEY (feature, scenario)
+               )"""
+        )
+
+    def record_many(self, timings):
+        """Record an iterable of (feature, scenario, seconds) in one transaction"""
+        now = datetime.now().isoformat()
+        with self.connection:
+            self.connection.executemany(
+                """INSERT INTO scenario_timings (feature, scenario, runs, mean_seconds, last_seconds, updated_at)
+                   VALUES (?, ?, 1, ?, ?, ?)
+                   ON CONFLICT (feature, scenario) DO UPDATE SET
+                       runs = runs + 1,
+                       mean_seconds = mean_seconds * (1 - ?) + excluded.last_seconds * ?,
+                       last_seconds = excluded.last_seconds,
+                       updated_at = excluded.updated_at""",
+                [(feature, scenario, seconds, seconds, now, SMOOTHING, SMOOTHING)
+                 for feature, scenario, seconds in timings],
+            )
+
+    def record(self, feature, scenario, seconds):
+        """Record a single scenario duration"""
+        self.record_many([(feature, scenario, seconds)])
+
+    def durations(self):
+        """Return {(feature, scenario): mean seconds} for every known scenario"""
+        rows = self.connection.execute("SELECT feature, scenario, mean_seconds FROM scenario_timings")
+        return {(feature, scenario): seconds for feature, scenario, seconds in rows}
+
+    def close(self):
+        """Close the underlying connection"""
+        self.connection.close()
+
+
+def load_durations(path=DEFAULT_DB_PATH):
+    """Return the recorded durations, or an empty dict when there is no history"""
+    if not Path(path).exists():
+        return {}
+    database = TimingDatabase(path)
+    try:
+        return database.durations()
+    finally:
+        database.close()
+
+
+def default_duration(durations):
+    """Estimate for scenarios without history: the median of known scenarios"""
+    if not durations:
+        return DEFAULT_SCENARIO_SECONDS
+    return statistics.median(durations.values())
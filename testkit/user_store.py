@@ -0,0 +1,272 @@
+"""
+In-memory user store with secondary indexes, used by the user management steps.
+
+Users are plain dicts keyed by email, with indexes by id, role and
+created_at. Stored records are never mutated in place - updates replace the
+record - so snapshots only need to remember which operations to undo:
+snapshot() is O(1) and restore() costs O(changes since the snapshot), which
+keeps per-scenario resets cheap even with millions of seeded users.
+"""
+
+import bisect
+from datetime import datetime
+
+COMPACT_MIN_STALE = 1024
+RECORD_FIELDS = frozenset(("id", "email", "name", "role", "created_at"))
+
+
+def _timestamp(value):
+    """Normalize datetimes to the ISO strings stored in records"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class UserStore:
+    """Users keyed by email with id, role and created_at indexes"""
+
+    def __init__(self):
+        self._by_email = {}
+        self._by_id = {}
+        self._by_role = {}
+        # (created_at, id) pairs; deleted or updated entries are skipped lazily
+        self._created = []
+        self._created_sorted = True
+        self._created_stale = 0
+        self._next_id = 1
+        self._journal = None
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def __contains__(self, email):
+        return email in self._by_email
+
+    def __iter__(self):
+        return iter(self._by_email.values())
+
+    # -- Lookups
+
+    def get(self, email):
+        return self._by_email.get(email)
+
+    def get_by_id(self, user_id):
+        return self._by_id.get(user_id)
+
+    def by_role(self, role):
+        """Return all users with the given role"""
+        by_email = self._by_email
+        return [by_email[email] for email in self._by_role.get(role, ())]
+
+    def count_by_role(self, role):
+        return len(self._by_role.get(role, ()))
+
+    def created_between(self, start=None, end=None):
+        """Return users with start <= created_at < end, oldest first"""
+        self._ensure_created_index()
+        created = self._created
+        low = 0 if start is None else bisect.bisect_left(created, (_timestamp(start),))
+        high = len(created) if end is None else bisect.bisect_left(created, (_timestamp(end),))
+        by_id = self._by_id
+        users = []
+        previous = None
+        for entry in created[low:high]:
+            # An updated or restored user is indexed again under the same entry;
+            # the sort puts the copies next to each other
+            if entry == previous:
+                continue
+            previous = entry
+            created_at, user_id = entry
+            user = by_id.get(user_id)
+            if user is not None and user["created_at"] == created_at:
+                users.append(user)
+        return users
+
+    def _ensure_created_index(self):
+        if not self._created_sorted:
+            self._created.sort()
+            self._created_sorted = True
+
+    # -- Mutations
+
+    def add(self, user):
+        """Insert one user dict (email required; id, role and created_at are filled in)"""
+        record = self._build_record(user)
+        self._insert(record)
+        self._log(("add", record["email"]))
+        return record
+
+    def bulk_add(self, users):
+        """Insert many users at once and return how many were added.
+        Same result as calling add() for each user, with the index updates inlined.
+        The whole batch is checked first, so a duplicate email or id leaves the store unchanged."""
+        by_email = self._by_email
+        by_id = self._by_id
+        now = datetime.now().isoformat()
+        next_id = self._next_id
+        records = []
+        records_append = records.append
+        seen = set()
+        seen_ids = set()
+        for user in users:
+            email = user["email"]
+            if email in by_email or email in seen:
+                raise ValueError(f"User {email} already exists")
+            seen.add(email)
+            user_id = user.get("id") or next_id
+            if user_id in by_id or user_id in seen_ids:
+                raise ValueError(f"User id {user_id} already exists")
+            seen_ids.add(user_id)
+            record = {"id": user_id, "email": email, "name": user.get("name", ""),
+                      "role": user.get("role", "user"),
+                      "created_at": _timestamp(user.get("created_at")) or now}
+            if not user.keys() <= RECORD_FIELDS:
+                for key, value in user.items():
+                    record.setdefault(key, value)
+            if user_id >= next_id:
+                next_id = user_id + 1
+            records_append(record)
+
+        by_role = self._by_role
+        created = self._created
+        created_append = created.append
+        last_created = created[-1] if created else None
+        in_order = self._created_sorted
+        emails = []
+        emails_append = emails.append
+        for record in records:
+            email = record["email"]
+            user_id = record["id"]
+            by_email[email] = record
+            by_id[user_id] = record
+            role_index = by_role.get(record["role"])
+            if role_index is None:
+                role_index = by_role[record["role"]] = {}
+            role_index[email] = None
+            entry = (record["created_at"], user_id)
+            if in_order and last_created is not None and entry < last_created:
+                in_order = False
+            last_created = entry
+            created_append(entry)
+            emails_append(email)
+        self._next_id = next_id
+        self._created_sorted = in_order
+        self._log(("bulk_add", emails))
+        return len(emails)
+
+    def update(self, email, **changes):
+        """Replace a user's record with the given fields changed"""
+        old = self._by_email[email]
+        new = dict(old, **changes)
+        new["id"] = old["id"]
+        new["email"] = old["email"]
+        new["created_at"] = _timestamp(new["created_at"])
+        self._remove(old)
+        self._insert(new)
+        self._log(("update", old))
+        return new
+
+    def delete(self, email):
+        """Remove a user and return the removed record"""
+        record = self._by_email[email]
+        self._remove(record)
+        self._log(("delete", [record]))
+        return record
+
+    def bulk_delete(self, emails):
+        """Remove every existing user in emails and return how many were removed"""
+        removed = []
+        for email in emails:
+            record = self._by_email.get(email)
+            if record is not None:
+                self._remove(record)
+                removed.append(record)
+        self._log(("delete", removed))
+        return len(removed)
+
+    def clear(self):
+        self.bulk_delete(list(self._by_email))
+
+    def _build_record(self, user):
+        if user["email"] in self._by_email:
+            raise ValueError(f"User {user['email']} already exists")
+        if user.get("id") in self._by_id:
+            raise ValueError(f"User id {user['id']} already exists")
+        record = {
+            "id": user.get("id") or self._next_id,
+            "email": user["email"],
+            "name": user.get("name", ""),
+            "role": user.get("role", "user"),
+            "created_at": _timestamp(user.get("created_at")) or datetime.now().isoformat(),
+        }
+        for key, value in user.items():
+            record.setdefault(key, value)
+        self._next_id = max(self._next_id, record["id"] + 1)
+        return record
+
+    def _insert(self, record):
+        self._by_email[record["email"]] = record
+        self._by_id[record["id"]] = record
+        role_index = self._by_role.get(record["role"])
+        if role_index is None:
+            role_index = self._by_role[record["role"]] = {}
+        role_index[record["email"]] = None
+        entry = (record["created_at"], record["id"])
+        if self._created_sorted and self._created and entry < self._created[-1]:
+            self._created_sorted = False
+        self._created.append(entry)
+
+    def _remove(self, record):
+        del self._by_email[record["email"]]
+        del self._by_id[record["id"]]
+        del self._by_role[record["role"]][record["email"]]
+        self._created_stale += 1
+        if self._created_stale > max(COMPACT_MIN_STALE, len(self._by_id)):
+            self._compact_created_index()
+
+    def _remove_many(self, emails):
+        """Bulk form of _remove() with the index updates inlined"""
+        by_email_pop = self._by_email.pop
+        by_id = self._by_id
+        by_role = self._by_role
+        for email in emails:
+            record = by_email_pop(email)
+            del by_id[record["id"]]
+            del by_role[record["role"]][email]
+        self._created_stale += len(emails)
+        if self._created_stale > max(COMPACT_MIN_STALE, len(by_id)):
+            self._compact_created_index()
+
+    def _compact_created_index(self):
+        """Drop stale created_at entries once they outnumber live users"""
+        self._created = [(user["created_at"], user["id"]) for user in self._by_id.values()]
+        self._created_sorted = False
+        self._created_stale = 0
+
+    # -- Snapshots
+
+    def snapshot(self):
+        """Return a token that restore() can roll back to"""
+        if self._journal is None:
+            self._journal = []
+        return len(self._journal), self._next_id
+
+    def restore(self, token):
+        """Undo every change made since the snapshot was taken"""
+        length, next_id = token
+        journal = self._journal or []
+        while len(journal) > length:
+            action, payload = journal.pop()
+            if action == "add":
+                self._remove(self._by_email[payload])
+            elif action == "bulk_add":
+                self._remove_many(payload)
+            elif action == "update":
+                self._remove(self._by_email[payload["email"]])
+                self._insert(payload)
+            elif action == "delete":
+                for record in reversed(payload):
+                    self._insert(record)
+        self._next_id = next_id
+
+    def _log(self, entry):
+        if self._journal is not None:
+            self._journal.append(entry)
@@ -0,0 +1,213 @@
+"""
+Warm runner behind `python run_tests.py watch`.
+
+One interpreter keeps behave, requests and the step definitions loaded and
+polls features/ for changes. After a save only the affected features are run,
+in-process:
+    - a changed .feature file runs that feature
+    - a changed step module has its step definitions dropped from behave's
+      registry and is executed again; features using it (before or after the
+      change) are run
+    - a changed environment.py runs every feature (hooks are re-read each run)
+Modules imported by the steps (testkit/) and behave.ini cannot be reloaded
+safely, so a change to them restarts the watcher process.
+"""
+
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from behave import matchers
+from behave.configuration import Configuration
+from behave.parser import parse_file
+from behave.runner import Runner
+from behave.runner_util import PathManager, exec_file
+from behave.step_registry import registry, setup_step_decorators
+
+FEATURES_DIR = Path("features")
+STEPS_DIR = FEATURES_DIR / "steps"
+ENVIRONMENT_FILE = FEATURES_DIR / "environment.py"
+RESTART_PATTERNS = ("testkit/*.py", "behave.ini")
+POLL_INTERVAL = 0.3
+
+
+def scan(patterns):
+    """Map every file matching the glob patterns to its modification time"""
+    mtimes = {}
+    for pattern in patterns:
+        for path in Path(".").glob(pattern):
+            try:
+                mtimes[str(path)] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+    return mtimes
+
+
+def changed_files(before, after):
+    """Paths added, removed or modified between two scans"""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+class StepModules:
+    """Step modules loaded into behave's global step registry, reloadable one by one"""
+
+    def __init__(self, steps_dir=STEPS_DIR):
+        self.steps_dir = Path(steps_dir)
+        self.loaded = {}
+
+    def sync(self):
+        """(Re)load new or modified step modules, unload removed ones; returns changed paths"""
+        current = {str(path): path.stat().st_mtime_ns for path in sorted(self.steps_dir.glob("*.py"))}
+        changed = changed_files(self.loaded, current)
+        for path in sorted(changed):
+            self._unload(path)
+            if path in current:
+                self._load(path)
+        self.loaded = current
+        return changed
+
+    def _unload(self, path):
+        target = os.path.abspath(path)
+        for step_type, definitions in registry.steps.items():
+            registry.steps[step_type] = [
+                definition for definition in definitions
+                if os.path.abspath(definition.location.filename) != target
+            ]
+
+    def _load(self, path):
+        step_globals = {"use_step_matcher": matchers.use_step_matcher, "step_matcher": matchers.step_matcher}
+        setup_step_decorators(step_globals)
+        default_matcher = matchers.current_matcher
+        try:
+            with PathManager([str(self.steps_dir.resolve())]):
+                exec_file(path, step_globals)
+        except Exception:
+            print(f"❌ Could not load {path}:")
+            traceback.print_exc()
+        finally:
+            matchers.current_matcher = default_matcher
+
+
+class WarmRunner(Runner):
+    """behave Runner that reuses the step definitions already in the registry"""
+
+    def __init__(self, config, step_modules):
+        super().__init__(config)
+        self.step_modules = step_modules
+
+    def load_step_definitions(self, extra_step_paths=None):
+        self.step_modules.sync()
+
+
+class FeatureIndex:
+    """Parsed features (cached by mtime) and the step modules each one uses"""
+
+    def __init__(self, features_dir=FEATURES_DIR):
+        self.features_dir = Path(features_dir)
+        self.parsed = {}
+
+    def feature_files(self):
+        return sorted(str(path) for path in self.features_dir.rglob("*.feature"))
+
+    def _feature(self, path):
+        mtime = Path(path).stat().st_mtime_ns
+        cached = self.parsed.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, parse_file(path))
+            except Exception as error:
+                print(f"❌ Could not parse {path}: {error}")
+                cached = (mtime, None)
+            self.parsed[path] = cached
+        return cached[1]
+
+    def step_files(self, path):
+        """Step modules matched by the steps of a feature; None stands for undefined steps"""
+        feature = self._feature(path)
+        used = set()
+        if feature is None:
+            return used
+        for scenario in feature.walk_scenarios():
+            for step in scenario.all_steps:
+                match = registry.find_match(step)
+                used.add(os.path.abspath(match.location.filename) if match else None)
+        return used
+
+    def usage(self):
+        return {path: self.step_files(path) for path in self.feature_files()}
+
+
+def run_features(paths, step_modules):
+    """Run features in this process and return (passed, seconds)"""
+    started = time.perf_counter()
+    config = Configuration(["--format=pretty", "--no-skipped", *paths])
+    runner = WarmRunner(config, step_modules)
+    try:
+        failed = runner.run()
+    except SystemExit as exit_:
+        # environment.py's after_all exits with the suite's status
+        failed = bool(exit_.code)
+    except Exception:
+        traceback.print_exc()
+        failed = True
+    return not failed, time.perf_counter() - started
+
+
+def select_features(changed, index, usage_before):
+    """Features to run for a set of changed files; usage_before is taken before step modules reloaded"""
+    features = set(index.feature_files())
+    if str(ENVIRONMENT_FILE) in changed:
+        return sorted(features)
+    selected = {path for path in changed if path in features}
+    step_changes = {os.path.abspath(path) for path in changed if path.endswith(".py")}
+    if step_changes:
+        usage_after = index.usage()
+        for path in features:
+            used = usage_before.get(path, set()) | usage_after.get(path, set())
+            if used & step_changes or None in used:
+                selected.add(path)
+    return sorted(selected)
+
+
+def watch(interval=POLL_INTERVAL, run_first=True):
+    """Poll for changes forever, running affected features after each save"""
+    step_modules = StepModules()
+    step_modules.sync()
+    index = FeatureIndex()
+    watched = ("features/**/*.feature", "features/*.py", "features/steps/*.py")
+    mtimes = scan(watched)
+    restart_mtimes = scan(RESTART_PATTERNS)
+    usage = index.usage()
+
+    if run_first:
+        passed, seconds = run_features(index.feature_files(), step_modules)
+        print(f"\n{'✅' if passed else '❌'} Initial run finished in {seconds:.2f}s")
+    print(f"\n👀 Watching {FEATURES_DIR}/ for changes (Ctrl+C to stop)")
+
+    while True:
+        time.sleep(interval)
+        if changed_files(restart_mtimes, scan(RESTART_PATTERNS)):
+            print("\n🔁 testkit/ or behave.ini changed, restarting the watcher")
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        current = scan(watched)
+        changed = changed_files(mtimes, current)
+        if not changed:
+            continue
+        mtimes = current
+
+        reloaded = step_modules.sync()
+        features = select_features(changed, index, usage)
+        usage = index.usage()
+        print(f"\n{'='*60}")
+        print(f"Changed: {', '.join(sorted(changed))}")
+        if reloaded:
+            print(f"Reloaded step modules: {', '.join(sorted(reloaded))}")
+        if not features:
+            print("No features affected")
+            continue
+        print(f"Running: {', '.join(features)}")
+        print(f"{'='*60}\n")
+        passed, seconds = run_features(features, step_modules)
+        print(f"\n{'✅' if passed else '❌'} {len(features)} feature(s) finished in {seconds:.2f}s")
@@ -0,0 +1,174 @@
+"""
+Per-scenario timeouts and retries for the behave suite.
+
+The watchdog arms a SIGALRM timer when a scenario starts; if the scenario
+is still running when it fires, ScenarioTimeout is raised in the step that
+hangs (including blocking socket reads), so the scenario fails instead of
+stalling the whole job. It is only raised inside a step body: behave does
+not expect exceptions from its own bookkeeping, so a timer that fires in a
+hook, between steps or after the last step only marks the scenario as timed
+out (the next step, if any, fails from before_step), and one that fires in
+behave's code around a running step is retried moments later. The timeout comes from context.config["test_timeout"],
+multiplied for @slow scenarios, or is set per scenario with @timeout=<seconds>.
+SIGALRM only exists on POSIX; elsewhere scenarios run without a watchdog.
+
+Failed scenarios are re-run with exponential backoff up to
+context.config["retry_attempts"] more times, the same way
+behave.contrib.scenario_autoretry patches Scenario.run. A scenario that
+passes on a later attempt is reported as flaky; one that fails every
+attempt is a hard failure. Both lists are written to test-reports/retries.json.
+"""
+
+import functools
+import json
+import signal
+import threading
+import time
+from pathlib import Path
+
+SLOW_TIMEOUT_FACTOR = 4
+TIMEOUT_TAG_PREFIX = "timeout="
+DEFAULT_BACKOFF = 0.5
+# Delay before retrying an alarm that fired in behave's code during a step
+REARM_SECONDS = 0.01
+
+
+class ScenarioTimeout(Exception):
+    """Raised inside a scenario that ran past its timeout"""
+
+
+def scenario_timeout(tags, default, slow_factor=SLOW_TIMEOUT_FACTOR):
+    """Timeout in seconds for a scenario with the given effective tags"""
+    for tag in tags:
+        if tag.startswith(TIMEOUT_TAG_PREFIX):
+            return float(tag[len(TIMEOUT_TAG_PREFIX):])
+    if "slow" in tags:
+        return default * slow_factor
+    return default
+
+
+class Watchdog:
+    """Aborts the running scenario with ScenarioTimeout once its time is up"""
+
+    def __init__(self):
+        self.available = hasattr(signal, "setitimer")
+        self.label = None
+        self.seconds = None
+        self.expired = False
+        self.in_step = False
+        self.previous_handler = None
+
+    def start(self, seconds, label):
+        self.label = label
+        self.seconds = seconds
+        self.expired = False
+        self.in_step = False
+        if not self.available or seconds <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+        self.previous_handler = signal.signal(signal.SIGALRM, self._expire)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+    def cancel(self):
+        """Disarm the timer and return whether it fired"""
+        if self.previous_handler is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.previous_handler)
+            self.previous_handler = None
+        return self.expired
+
+    def step_started(self):
+        """Called from before_step; fails the step when the time ran out between steps"""
+        if self.expired:
+            raise ScenarioTimeout(self._message())
+        self.in_step = True
+
+    def step_finished(self):
+        """Called from after_step"""
+        self.in_step = False
+
+    def _message(self):
+        return f"{self.label} exceeded its {self.seconds:g}s timeout"
+
+    def _expire(self, signum, frame):
+        self.expired = True
+        if not self.in_step:
+            return
+        if frame is not None and frame.f_globals.get("__name__", "").startswith("behave."):
+            signal.setitimer(signal.ITIMER_REAL, REARM_SECONDS)
+            return
+        raise ScenarioTimeout(self._message())
+
+
+class RetryTracker:
+    """Re-runs failed scenarios with backoff and records flaky and hard failures"""
+
+    def __init__(self, retries, backoff=DEFAULT_BACKOFF, sleep=time.sleep):
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.runner = None
+        self.flaky = []
+        self.hard_failures = []
+        self.timeouts = []
+
+    def patch(self, scenario):
+        """Wrap scenario.run (an expanded scenario, not an outline) with retries"""
+        if self.retries > 0 and not hasattr(scenario, "attempt"):
+            scenario.attempt = 1
+            scenario.run = functools.partial(self._run_with_retries, scenario, scenario.run)
+
+    def _run_with_retries(self, scenario, run, runner):
+        self.runner = runner
+        for attempt in range(1, self.retries + 2):
+            scenario.attempt = attempt
+            failed = run(runner)
+            if not failed:
+                return False
+            if self.will_retry(scenario):
+                delay = self.backoff * 2 ** (attempt - 1)
+                print(f"    ↻ RETRY {attempt}/{self.retries} of {scenario.name} in {delay:g}s")
+                self.sleep(delay)
+        return True
+
+    def will_retry(self, scenario):
+        """Whether a failed scenario will be run again; undefined steps or an
+        aborted run are not worth retrying"""
+        if getattr(scenario, "attempt", 1) > self.retries:
+            return False
+        if self.runner is not None and self.runner.aborted:
+            return False
+        return not any(step.status == "undefined" for step in scenario.all_steps)
+
+    def record(self, scenario, location, timed_out):
+        """Record the outcome of one attempt; returns "flaky", "hard", "retry" or None"""
+        attempt = getattr(scenario, "attempt", 1)
+        entry = {"location": location, "scenario": scenario.name, "attempts": attempt}
+        if timed_out:
+            self.timeouts.append(dict(entry))
+        if scenario.status == "failed":
+            if self.will_retry(scenario):
+                return "retry"
+            self.hard_failures.append(entry)
+            return "hard"
+        if scenario.status == "passed" and attempt > 1:
+            self.flaky.append(entry)
+            return "flaky"
+        return None
+
+    def summary(self):
+        lines = [f"Flaky scenarios (passed after retry): {len(self.flaky)}"]
+        lines += [f"  {entry['location']}  {entry['scenario']} ({entry['attempts']} attempts)" for entry in self.flaky]
+        lines.append(f"Hard failures: {len(self.hard_failures)}")
+        lines += [f"  {entry['location']}  {entry['scenario']}" for entry in self.hard_failures]
+        if self.timeouts:
+            lines.append(f"Timed out attempts: {len(self.timeouts)}")
+            lines += [f"  {entry['location']}  {entry['scenario']} (attempt {entry['attempts']})" for entry in self.timeouts]
+        return "\n".join(lines)
+
+    def write(self, reports_dir, name="retries"):
+        """Write the flaky/hard-failure report as JSON and return its summary text"""
+        reports_dir = Path(reports_dir)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        report = {"flaky": self.flaky, "hard_failures": self.hard_failures, "timeouts": self.timeouts}
+        (reports_dir / f"{name}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return self.summary()
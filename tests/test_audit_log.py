@@ -0,0 +1,40 @@
+import os
+
+from testkit.audit_log import AuditLog
+
+
+def small_log(directory):
+    return AuditLog(directory, capacity=3, batch_size=2, segment_entries=4)
+
+
+def test_query_reads_spilled_segments_and_the_ring(tmp_path):
+    log = small_log(tmp_path)
+    for index in range(10):
+        log.append("update_user" if index % 2 else "create_user", "admin@example.com", target=index)
+
+    assert len(list(tmp_path.glob("*.jsonl"))) == 3
+    assert [entry["target"] for entry in log.query(action="update_user")] == [1, 3, 5, 7, 9]
+    assert log.count("create_user") == 5
+
+
+def test_close_removes_the_segments(tmp_path):
+    log = small_log(tmp_path)
+    for index in range(10):
+        log.append("create_user", "admin@example.com", target=index)
+
+    log.close()
+
+    assert list(tmp_path.glob("*.jsonl")) == []
+    assert [entry["target"] for entry in log.query()] == [7, 8, 9]
+
+
+def test_leftover_segments_of_the_same_pid_are_cleared_on_start(tmp_path):
+    stale = tmp_path / f"audit-{os.getpid()}-00000.jsonl"
+    stale.write_text('{"seq": 0, "action": "delete_user", "timestamp": "2000-01-01T00:00:00"}\n', encoding="utf-8")
+    other = tmp_path / "audit-1-00000.jsonl"
+    other.write_text("", encoding="utf-8")
+
+    small_log(tmp_path)
+
+    assert not stale.exists()
+    assert other.exists()
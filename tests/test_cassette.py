@@ -0,0 +1,109 @@
+from testkit.cassette import Cassette, CassetteWriter, RecordingSession, ReplaySession, request_key
+from testkit.responses import FakeResponse
+
+API_KEY = "test-key"
+URL = "http://api.test/api/users"
+
+
+class FakeApi:
+    """Stands in for requests.Session: answers with the user count it was given"""
+
+    def __init__(self):
+        self.users = 0
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        return FakeResponse.from_payload(200, {"count": self.users}, url=url)
+
+    def close(self):
+        pass
+
+
+def record_two_scenarios(path):
+    api = FakeApi()
+    recorder = RecordingSession(api, path, API_KEY)
+    for scope, users in (("users.feature:Empty list", 0), ("users.feature:After a signup", 1)):
+        api.users = users
+        recorder.new_scenario()
+        recorder.enter(scope)
+        recorder.request("GET", URL)
+    recorder.close()
+
+
+def test_same_request_in_two_scenarios_replays_each_response(tmp_path):
+    path = tmp_path / "api.cassette"
+    record_two_scenarios(path)
+
+    replay = ReplaySession(path, API_KEY)
+    try:
+        assert len(replay.cassette) == 2
+        counts = []
+        for scope in ("users.feature:Empty list", "users.feature:After a signup"):
+            replay.new_scenario()
+            replay.enter(scope)
+            counts.append(replay.request("GET", URL).json()["count"])
+    finally:
+        replay.close()
+
+    assert counts == [0, 1]
+
+
+def colliding_key(slot, suffix):
+    """Keys whose first 8 bytes (the slot hash) are equal collide in the index"""
+    return slot.to_bytes(8, "little") + suffix.to_bytes(8, "little")
+
+
+def write_cassette(path, records):
+    writer = CassetteWriter(path)
+    for key, body in records.items():
+        writer.add(key, 200, {"Content-Type": "text/plain"}, body)
+    writer.close()
+
+
+def test_colliding_keys_probe_to_their_own_records(tmp_path):
+    path = tmp_path / "collide.cassette"
+    # Slot 7 is the last of 8 slots, so the probe wraps around to the start
+    records = {colliding_key(7, suffix): f"record {suffix}".encode() for suffix in range(1, 5)}
+    write_cassette(path, records)
+
+    cassette = Cassette(path)
+    try:
+        assert cassette.slots == 8
+        for key, body in records.items():
+            assert cassette.lookup(key) == (200, {"Content-Type": "text/plain"}, body)
+        assert cassette.lookup(colliding_key(7, 99)) is None
+    finally:
+        cassette.close()
+
+
+def test_index_grows_to_keep_load_at_most_half(tmp_path):
+    path = tmp_path / "large.cassette"
+    records = {request_key("GET", f"/api/users/{index}", None, True, 0): str(index).encode()
+               for index in range(300)}
+    write_cassette(path, records)
+
+    cassette = Cassette(path)
+    try:
+        assert cassette.slots == 1024
+        assert len(cassette) == 300
+        assert all(cassette.lookup(key)[2] == body for key, body in records.items())
+    finally:
+        cassette.close()
+
+
+def test_reopened_and_rewritten_cassettes(tmp_path):
+    path = tmp_path / "api.cassette"
+    first, second = colliding_key(1, 1), colliding_key(2, 2)
+    write_cassette(path, {first: b"one"})
+
+    reopened = Cassette(path)
+    assert reopened.lookup(first)[2] == b"one"
+    reopened.close()
+
+    write_cassette(path, {second: b"two"})
+    rewritten = Cassette(path)
+    try:
+        assert rewritten.lookup(first) is None
+        assert rewritten.lookup(second)[2] == b"two"
+        assert not path.with_name(path.name + ".tmp").exists()
+    finally:
+        rewritten.close()
@@ -0,0 +1,24 @@
+from testkit.feature_cache import FeatureCache
+
+FEATURE = """@api
+Feature: Tagged
+
+  @slow @timeout=5
+  Scenario: Tagged scenario
+    Given a step
+"""
+
+
+def test_tagged_features_load_back_from_the_cache(tmp_path):
+    feature_file = tmp_path / "tagged.feature"
+    feature_file.write_text(FEATURE, encoding="utf-8")
+
+    parsed = FeatureCache(tmp_path / "cache").parse_file(str(feature_file))
+    cache = FeatureCache(tmp_path / "cache")
+    cached = cache.parse_file(str(feature_file))
+
+    assert cache.hits == 1
+    assert cached.tags == parsed.tags == ["api"]
+    scenario = cached.scenarios[0]
+    assert scenario.tags == ["slow", "timeout=5"]
+    assert [tag.line for tag in scenario.tags] == [4, 4]
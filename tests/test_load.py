@@ -0,0 +1,26 @@
+from testkit.load import DEFAULT_FEATURE, build_profile, format_summary, suspect_endpoints
+
+
+def test_requests_to_an_existing_user_are_retargeted_per_pass():
+    profile = {request.scenario: request for request in build_profile(DEFAULT_FEATURE)}
+
+    delete = profile["Delete user via API"]
+    assert delete.user_id == 123
+    assert delete.target(789) == "/api/users/789"
+    assert delete.target() == "/api/users/123"
+    missing = profile["Handle non-existent resource"]
+    assert missing.user_id is None
+    assert missing.target(789) == "/api/users/999999"
+
+
+def test_endpoints_with_mostly_unexpected_statuses_are_flagged():
+    endpoint = {"requests": 80, "throughput_rps": 1.0, "p50_ms": 1.0, "p95_ms": 1.0, "p99_ms": 1.0,
+                "max_ms": 1.0, "error_rate": 0.0}
+    report = {"base_url": "http://stub", "users": 4, "requests": 160, "elapsed_seconds": 1.0,
+              "throughput_rps": 160.0, "error_rate": 0.0, "endpoints": {
+                  "DELETE /api/users/{id}": dict(endpoint, unexpected_status=79, unexpected_rate=79 / 80),
+                  "GET /api/users": dict(endpoint, unexpected_status=1, unexpected_rate=1 / 80),
+              }}
+
+    assert suspect_endpoints(report) == ["DELETE /api/users/{id}"]
+    assert "latencies are of the error path" in format_summary(report)
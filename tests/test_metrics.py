@@ -0,0 +1,69 @@
+from testkit.metrics import MetricsRegistry, merge_files, route_label
+
+
+def sample_lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    scenarios = registry.counter("behave_scenarios", "Finished scenarios", ("feature",))
+    scenarios.inc('say "hi"\\now\nthen')
+
+    assert sample_lines(registry.render(), "behave_scenarios_total") == [
+        'behave_scenarios_total{feature="say \\"hi\\"\\\\now\\nthen"} 1']
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry()
+    durations = registry.histogram("behave_step_duration_seconds", "Step duration", ("tag",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        durations.observe(value, "smoke")
+
+    text = registry.render()
+
+    assert sample_lines(text, "behave_step_duration_seconds") == [
+        'behave_step_duration_seconds_bucket{tag="smoke",le="0.1"} 2',
+        'behave_step_duration_seconds_bucket{tag="smoke",le="1.0"} 3',
+        'behave_step_duration_seconds_bucket{tag="smoke",le="+Inf"} 4',
+        'behave_step_duration_seconds_count{tag="smoke"} 4',
+        'behave_step_duration_seconds_sum{tag="smoke"} 3.65',
+    ]
+    assert "# TYPE behave_step_duration_seconds histogram" in text
+    assert "# UNIT behave_step_duration_seconds seconds" in text
+
+
+def test_exposition_ends_with_eof():
+    registry = MetricsRegistry()
+    registry.counter("behave_steps", "Executed steps").inc()
+
+    text = registry.render()
+
+    assert text.endswith("\n# EOF\n")
+    assert text.count("# EOF") == 1
+    assert MetricsRegistry().render() == "# EOF\n"
+
+
+def test_shard_files_are_added_up(tmp_path):
+    paths = []
+    for shard, (passed, seconds) in enumerate(((2, 0.5), (3, 1.5))):
+        registry = MetricsRegistry()
+        scenarios = registry.counter("behave_scenarios", "Finished scenarios", ("status",))
+        scenarios.inc("passed", amount=passed)
+        durations = registry.histogram("behave_scenario_duration_seconds", "Scenario duration", buckets=(1.0,))
+        durations.observe(seconds)
+        paths.append(registry.write(tmp_path / f"shard-{shard}.txt"))
+
+    merged = merge_files(paths + [tmp_path / "missing.txt"], tmp_path / "metrics.txt").read_text(encoding="utf-8")
+
+    assert 'behave_scenarios_total{status="passed"} 5' in merged
+    assert 'behave_scenario_duration_seconds_bucket{le="1.0"} 1' in merged
+    assert 'behave_scenario_duration_seconds_bucket{le="+Inf"} 2' in merged
+    assert "behave_scenario_duration_seconds_sum 2.0" in merged
+    assert merged.count("# TYPE behave_scenarios counter") == 1
+    assert merged.endswith("\n# EOF\n")
+
+
+def test_route_label_collapses_ids():
+    assert route_label("/api/users/123") == "/api/users/{id}"
+    assert route_label("/api/users") == "/api/users"
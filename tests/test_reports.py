@@ -0,0 +1,47 @@
+import json
+
+from testkit.reports import merge_retry_reports, merge_step_profiles
+from testkit.step_timing import StepHistogram, StepTimer
+
+DEFINITION = "@given('a step')"
+
+
+def write_shard(shard_dir, durations_ms, hard_failures=()):
+    shard_dir.mkdir()
+    timer = StepTimer(step_registry=None)
+    histogram = timer.histograms[DEFINITION] = StepHistogram()
+    for index, duration_ms in enumerate(durations_ms):
+        histogram.add(round(duration_ms * 1e6))
+        timer._keep_slowest(timer.slowest_steps, round(duration_ms * 1e6),
+                            {"step": f"Given a step {index}", "definition": DEFINITION, "scenario": shard_dir.name})
+    timer.write(shard_dir)
+    (shard_dir / "retries.json").write_text(json.dumps(
+        {"flaky": [], "hard_failures": list(hard_failures), "timeouts": []}), encoding="utf-8")
+
+
+def test_step_profiles_of_all_shards_are_combined(tmp_path):
+    write_shard(tmp_path / "shard-00", [1.0, 3.0])
+    write_shard(tmp_path / "shard-01", [0.2])
+
+    merge_step_profiles([tmp_path / "shard-00", tmp_path / "shard-01", tmp_path / "missing"], tmp_path)
+
+    profile = json.loads((tmp_path / "step-profile.json").read_text(encoding="utf-8"))
+    stats = profile["step_definitions"][DEFINITION]
+    assert stats["count"] == 3
+    assert stats["total_ms"] == 4.2
+    assert stats["min_ms"] == 0.2
+    assert stats["max_ms"] == 3.0
+    assert sum(stats["buckets_ms"].values()) == 3
+    assert [entry["duration_ms"] for entry in profile["slowest_steps"]] == [3.0, 1.0, 0.2]
+    assert (tmp_path / "step-profile.txt").exists()
+
+
+def test_retry_reports_of_all_shards_are_concatenated(tmp_path):
+    write_shard(tmp_path / "shard-00", [], [{"location": "a.feature:3", "scenario": "A", "attempts": 4}])
+    write_shard(tmp_path / "shard-01", [], [{"location": "b.feature:7", "scenario": "B", "attempts": 4}])
+
+    merge_retry_reports([tmp_path / "shard-00", tmp_path / "shard-01"], tmp_path)
+
+    report = json.loads((tmp_path / "retries.json").read_text(encoding="utf-8"))
+    assert [entry["scenario"] for entry in report["hard_failures"]] == ["A", "B"]
+    assert report["flaky"] == [] and report["timeouts"] == []
@@ -0,0 +1,44 @@
+from testkit.soak import growth, trends
+
+# RSS of a short soak: the allocator grows through the warm-up, then barely moves
+WARMING_UP = [1000, 1100, 1130, 1140, 1150, 1160, 1170, 1180]
+
+
+def samples(rss, traced=None, objects=None):
+    return [{"rss_kb": value, "traced_kb": traced[index] if traced else 500.0,
+             "gc_objects": objects[index] if objects else 20000, "step_p95_ms": 1.0}
+            for index, value in enumerate(rss)]
+
+
+def test_growth_after_a_plateau_following_warm_up_is_not_flagged():
+    trend = growth(WARMING_UP)
+
+    assert trend["samples"] == 5
+    assert trend["first"] == 1140
+    assert not trend["flagged"]
+    # Counting only the first sample as warm-up mistakes the warm-up for a leak
+    assert growth(WARMING_UP, warmup=1)["flagged"]
+
+
+def test_warm_up_is_a_share_of_long_series():
+    series = [100] * 6 + [200] * 34
+
+    assert growth(series)["samples"] == 34
+    assert growth(series)["growth"] == 0.0
+    assert growth(series, warmup=0)["growth"] == 1.0
+
+
+def test_steady_growth_after_warm_up_is_flagged():
+    assert growth([1000 + 20 * index for index in range(20)])["flagged"]
+
+
+def test_rss_growth_needs_traced_or_gc_growth():
+    rss = [1000 + 20 * index for index in range(20)]
+
+    rss_only = trends(samples(rss))
+    assert not rss_only["rss_kb"]["flagged"]
+    assert rss_only["rss_kb"]["unconfirmed"]
+
+    leaking = trends(samples(rss, traced=[500 + 10 * index for index in range(20)]))
+    assert leaking["rss_kb"]["flagged"] and leaking["traced_kb"]["flagged"]
+    assert "unconfirmed" not in leaking["rss_kb"]
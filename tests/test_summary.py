@@ -0,0 +1,72 @@
+from testkit.summary import collect, iter_testcases, render_markdown
+
+
+def junit(*cases):
+    body = "".join(cases)
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuite name="suite">{body}</testsuite>\n'
+
+
+def case(name, seconds, child=""):
+    return f'<testcase classname="users.Users" name="{name}" time="{seconds}">{child}</testcase>'
+
+
+def write_reports(directory, files):
+    reports = directory / "test-reports"
+    reports.mkdir(parents=True)
+    for name, text in files.items():
+        (reports / name).write_text(text, encoding="utf-8")
+
+
+def make_artifacts(root):
+    write_reports(root / "test-results-3.10", {
+        "TESTS-users.xml": junit(
+            case("Create user", 0.5, "<system-out>" + "x" * 10000 + "</system-out>"),
+            case("Delete user", 2.0, '<failure message="expected 204">Traceback</failure>'),
+        ),
+        "TESTS-api.xml": junit(
+            case("Get users", 1.0),
+            case("Bulk import", 0.0, "<skipped />"),
+            case("Update user", 3.0, '<error>KeyError: name\nmore</error>'),
+        ),
+    })
+    write_reports(root / "test-results-3.9", {
+        "TESTS-users.xml": junit(case("Create user", 0.25)),
+    })
+
+
+def test_multi_file_report_is_summarized_per_version(tmp_path):
+    make_artifacts(tmp_path)
+
+    summaries = collect([tmp_path], slowest=2)
+
+    assert [summary.version for summary in summaries] == ["3.9", "3.10"]
+    latest = summaries[1]
+    assert latest.files == 2
+    assert latest.counts == {"passed": 2, "failed": 2, "skipped": 1}
+    assert latest.seconds == 6.5
+    assert [(failure["name"], failure["message"]) for failure in latest.failures] == [
+        ("Update user", "KeyError: name"), ("Delete user", "expected 204")]
+    assert [slow["name"] for slow in latest.slowest_cases()] == ["Update user", "Delete user"]
+    assert summaries[0].counts == {"passed": 1, "failed": 0, "skipped": 0}
+
+
+def test_testcases_are_yielded_as_small_dicts(tmp_path):
+    make_artifacts(tmp_path)
+    path = tmp_path / "test-results-3.10" / "test-reports" / "TESTS-users.xml"
+
+    cases = list(iter_testcases(path))
+
+    assert [item["outcome"] for item in cases] == ["passed", "failed"]
+    assert all(set(item) == {"classname", "name", "time", "outcome", "message"} for item in cases)
+
+
+def test_markdown_is_cut_to_max_chars(tmp_path):
+    make_artifacts(tmp_path)
+    summaries = collect([tmp_path])
+
+    full = render_markdown(summaries)
+    short = render_markdown(summaries, max_chars=len(full) - 1)
+
+    assert "### Failures on Python 3.10" in full and "| Delete user |" in full
+    assert len(short) < len(full)
+    assert short.endswith("see the test-results artifacts for the full reports._\n")
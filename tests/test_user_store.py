@@ -0,0 +1,82 @@
+import pytest
+
+from testkit.user_store import UserStore
+
+
+def make_store():
+    store = UserStore()
+    store.add({"email": "existing@example.com", "name": "Existing"})
+    return store
+
+
+def test_failed_bulk_add_leaves_no_rows_behind():
+    store = make_store()
+    batch = [{"email": "new1@example.com"}, {"email": "new2@example.com"}, {"email": "existing@example.com"}]
+
+    with pytest.raises(ValueError):
+        store.bulk_add(batch)
+
+    assert len(store) == 1
+    assert "new1@example.com" not in store
+    assert store.by_role("user") == [store.get("existing@example.com")]
+    assert store.add({"email": "next@example.com"})["id"] == 2
+
+
+def test_bulk_add_rejects_duplicates_within_the_batch():
+    store = make_store()
+
+    with pytest.raises(ValueError):
+        store.bulk_add([{"email": "twice@example.com"}, {"email": "twice@example.com"}])
+
+    assert "twice@example.com" not in store
+    assert len(store) == 1
+
+
+def test_snapshot_restore_round_trips_around_a_failed_bulk_add():
+    store = make_store()
+    baseline = store.snapshot()
+    store.bulk_add([{"email": "a@example.com"}, {"email": "b@example.com", "role": "admin"}])
+    with pytest.raises(ValueError):
+        store.bulk_add([{"email": "c@example.com"}, {"email": "a@example.com"}])
+
+    store.restore(baseline)
+
+    assert [user["email"] for user in store] == ["existing@example.com"]
+    assert store.count_by_role("admin") == 0
+    assert [user["email"] for user in store.created_between()] == ["existing@example.com"]
+    added = store.add({"email": "c@example.com"})
+    assert added["id"] == 2
+    assert store.get_by_id(1)["email"] == "existing@example.com"
+
+
+def test_created_between_lists_an_updated_user_once():
+    store = make_store()
+    store.update("existing@example.com", name="Renamed")
+
+    assert [user["name"] for user in store.created_between()] == ["Renamed"]
+
+
+def test_created_between_lists_a_restored_deletion_once():
+    store = make_store()
+    baseline = store.snapshot()
+    store.delete("existing@example.com")
+
+    store.restore(baseline)
+
+    assert [user["email"] for user in store.created_between()] == ["existing@example.com"]
+
+
+def test_explicit_ids_must_be_unique():
+    store = make_store()
+
+    with pytest.raises(ValueError):
+        store.add({"email": "clash@example.com", "id": 1})
+    with pytest.raises(ValueError):
+        store.bulk_add([{"email": "a@example.com", "id": 1}])
+    with pytest.raises(ValueError):
+        store.bulk_add([{"email": "a@example.com"}, {"email": "b@example.com", "id": 2}])
+
+    assert len(store) == 1
+    store.delete("existing@example.com")
+    assert store.get_by_id(1) is None
+    assert store.add({"email": "a@example.com"})["id"] == 2
@@ -0,0 +1,50 @@
+import signal
+import time
+
+import pytest
+
+from testkit.watchdog import ScenarioTimeout, Watchdog
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="SIGALRM is POSIX only")
+
+
+def wait(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_timeout_inside_a_step_body_raises():
+    watchdog = Watchdog()
+    watchdog.start(0.05, "Scenario 'hangs'")
+    watchdog.step_started()
+    try:
+        with pytest.raises(ScenarioTimeout, match="exceeded its 0.05s timeout"):
+            wait(1)
+    finally:
+        watchdog.step_finished()
+        assert watchdog.cancel()
+
+
+def test_timeout_after_the_last_step_only_marks_the_scenario():
+    watchdog = Watchdog()
+    watchdog.start(0.05, "Scenario 'slow teardown'")
+    watchdog.step_started()
+    watchdog.step_finished()
+
+    # after_step, after_scenario and the retry bookkeeping run here
+    wait(0.2)
+
+    assert watchdog.cancel()
+
+
+def test_timeout_between_steps_fails_the_next_step():
+    watchdog = Watchdog()
+    watchdog.start(0.05, "Scenario 'slow hook'")
+    wait(0.2)
+
+    try:
+        with pytest.raises(ScenarioTimeout):
+            watchdog.step_started()
+    finally:
+        assert watchdog.cancel()